@@ -1,16 +1,20 @@
 import os
-import sys
-import subprocess
 
 from app import timeline_base_item
 
 class AudioItem(timeline_base_item.TimelineBaseItem):
-    def __init__(self, audio_path):
+    def __init__(self, audio_path, probe=None):
+        """ Create new audio item.
+            args:
+                audio_path(str): audio path.
+                probe(dict): probe result of audio from probe.MediaProber.
+        """
         super(AudioItem, self).__init__()
         self.media_reference = audio_path
         self.name = os.path.basename(
             self.media_reference
         )
+        self.probe = probe or {}
         self.get_start_frame()
         self.get_end_frame()
         self.get_frame_rate()
@@ -27,8 +31,7 @@ class AudioItem(timeline_base_item.TimelineBaseItem):
     def get_frame_rate(self):
         """ Get frame rate from media.
         """
-        # TODO : Need to implement.
-        self.frame_rate = 24.0
+        self.frame_rate = self.probe.get("frame_rate", 24.0)
 
     @property
     def start_frame(self):
@@ -41,8 +44,7 @@ class AudioItem(timeline_base_item.TimelineBaseItem):
     def get_start_frame(self):
         """ Get start frame from media.
         """
-        # TODO : Need to implement.
-        self.start_frame = 0
+        self.start_frame = self.probe.get("start_frame", 0)
 
     @property
     def end_frame(self):
@@ -55,5 +57,4 @@ class AudioItem(timeline_base_item.TimelineBaseItem):
     def get_end_frame(self):
         """ Get end frame from media.
         """
-        # TODO : Need to implement.
-        self.end_frame = 50
+        self.end_frame = self.probe.get("end_frame", 50)
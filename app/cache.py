@@ -0,0 +1,111 @@
+import collections
+import hashlib
+import os
+
+# Root of all caches, media trees are never written to.
+CACHE_ROOT = os.environ.get(
+    "TIMELINE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "timeline")
+)
+
+
+def cache_dir(name):
+    """ Directory of a named cache, created if missing.
+        args:
+            name(str): cache name, like "thumbnails".
+    """
+    directory = os.path.join(CACHE_ROOT, name)
+    if not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    return directory
+
+
+def cache_key(path, *extra):
+    """ Key of a media file, changes when the file is replaced or modified.
+        args:
+            path(str): media file path.
+            extra: values the cached data also depends on, like a size.
+
+        return: hex digest, None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+
+    except OSError:
+        return None
+
+    content = "|".join(
+        str(value) for value in
+        (os.path.abspath(path), stat.st_size, stat.st_mtime_ns) + extra
+    )
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def cache_path(name, key, extension):
+    """ Path of a cached file, files are spread over sub directories by key.
+        args:
+            name(str): cache name.
+            key(str): key from cache_key.
+            extension(str): file extension, like ".png".
+    """
+    directory = os.path.join(cache_dir(name), key[:2])
+    if not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    return os.path.join(directory, key + extension)
+
+
+def write_atomic(path, write):
+    """ Write a cache file so readers never see a partial file.
+        args:
+            path(str): final path.
+            write(callable): called with a temporary path to write to.
+    """
+    base, extension = os.path.splitext(path)
+    temporary = "{}.{}.tmp{}".format(base, os.getpid(), extension)
+    try:
+        write(temporary)
+        os.replace(temporary, path)
+
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+class LRUCache(object):
+    """ Mapping which keeps only the most recently used values.
+    """
+    def __init__(self, capacity):
+        """ Create new cache.
+            args:
+                capacity(int): number of values kept.
+        """
+        self.capacity = capacity
+        self._values = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def get(self, key, default=None):
+        """ Value of key, marked as most recently used.
+        """
+        if key not in self._values:
+            return default
+
+        self._values.move_to_end(key)
+        return self._values[key]
+
+    def put(self, key, value):
+        """ Add value, least recently used values are dropped beyond capacity.
+        """
+        self._values[key] = value
+        self._values.move_to_end(key)
+        while len(self._values) > self.capacity:
+            self._values.popitem(last=False)
+
+    def clear(self):
+        self._values.clear()
@@ -0,0 +1,351 @@
+import json
+import os
+import re
+
+import numpy as np
+import opentimelineio as otio
+
+from app import matrix, media, sweep
+
+# Placeholder of a list field written by the exporter, see _shell.
+CHILDREN = "__children__"
+# Name of exported track of each kind in resolved only mode.
+RESOLVED_TRACKS = {
+    "video" : "V1",
+    "audio" : "A1",
+    "data" : "D1",
+}
+OTIO_KINDS = {
+    "video" : otio.schema.TrackKind.Video,
+    "audio" : otio.schema.TrackKind.Audio,
+    "data" : "Data",
+}
+EDL_CHANNELS = {
+    "video" : "V",
+    "audio" : "A",
+}
+
+
+def _shell(otio_object, *field):
+    """ Serialized otio object split around a list field, so its children can
+        be written between both parts one at a time.
+        args:
+            otio_object(otio.core.SerializableObject): object with an empty list field.
+            field: keys leading to the list field, like "tracks", "children".
+
+        return: text before and text after the children.
+    """
+    data = json.loads(otio.adapters.write_to_string(otio_object, "otio_json"))
+    parent = data
+    for key in field[:-1]:
+        parent = parent[key]
+
+    parent[field[-1]] = CHILDREN
+    prefix, suffix = json.dumps(data, indent=4).split('"{}"'.format(CHILDREN))
+
+    return prefix + "[\n", "\n]" + suffix
+
+
+def _write_children(stream, children):
+    """ Write serialized children separated by commas.
+        args:
+            stream(file): text stream.
+            children(iterable): serialized children.
+    """
+    for index, child in enumerate(children):
+        if index:
+            stream.write(",\n")
+
+        stream.write(child)
+
+
+def _gap(frames, rate):
+    return otio.adapters.write_to_string(
+        otio.schema.Gap(
+            source_range=otio.opentime.TimeRange(
+                otio.opentime.RationalTime(0, rate), otio.opentime.RationalTime(frames, rate)
+            )
+        ),
+        "otio_json"
+    )
+
+
+def _record_ranges(timeline_matrix):
+    """ Record start and end frame of every context in logical order.
+    """
+    contexts = timeline_matrix.storage.contexts
+    order = contexts.order()
+
+    return contexts.columns["record_start"][order], contexts.columns["record_end"][order]
+
+
+def _item_ranges(record_starts, record_ends, starts, spans):
+    """ Record range of items from the contexts they span. Contexts without a
+        record range, like contexts added by hand, are left out.
+        args:
+            record_starts(numpy.ndarray): record start of every context.
+            record_ends(numpy.ndarray): record end of every context.
+            starts(numpy.ndarray): first context index of each item.
+            spans(numpy.ndarray): number of contexts of each item.
+
+        return: record start and record end of each item, NaN for items without
+                any context with a record range, and item and context index of
+                every spanned context having a record range.
+    """
+    clips, contexts = sweep.expand(starts, starts + spans)
+    ranged = ~(np.isnan(record_starts[contexts]) | np.isnan(record_ends[contexts]))
+    clips, contexts = clips[ranged], contexts[ranged]
+
+    item_starts = np.full(starts.shape[0], np.nan)
+    item_ends = np.full(starts.shape[0], np.nan)
+    np.fmin.at(item_starts, clips, record_starts[contexts])
+    np.fmax.at(item_ends, clips, record_ends[contexts])
+
+    return item_starts, item_ends, clips, contexts
+
+
+def _tracks(timeline_matrix):
+    """ Name, kind, enabled and active state of every track in logical order.
+        Tracks of unknown kind have no otio kind and can not be exported.
+    """
+    tracks = timeline_matrix.storage.tracks
+    order = tracks.order()
+    for name, kind, enabled, active in zip(
+        tracks.names[order].tolist(), tracks.columns["kind"][order].tolist(),
+        tracks.columns["enabled"][order].tolist(), tracks.columns["active"][order].tolist()
+    ):
+        if not 0 <= kind < len(matrix.TRACK_KINDS):
+            raise Exception("Sorry, track {} has an unknown kind.".format(name))
+
+        yield name, matrix.TRACK_KINDS[kind], enabled, active
+
+
+def track_events(timeline_matrix, track):
+    """ Items of a track with their record range, in record order.
+        args:
+            timeline_matrix(matrix.Matrix): matrix to export.
+            track(str): track name.
+
+        return: generator of item, record start, record end and enabled state.
+    """
+    record_starts, record_ends = _record_ranges(timeline_matrix)
+    items, starts, spans = timeline_matrix.get_track_spans(track)
+    if not items.shape[0]:
+        return
+
+    enabled, _ = timeline_matrix.cell_states(track, starts)
+    item_starts, item_ends, _, _ = _item_ranges(record_starts, record_ends, starts, spans)
+    previous = None
+    for item, start, end, _enabled in zip(
+        items, item_starts.tolist(), item_ends.tolist(), enabled.tolist()
+    ):
+        # An item cut by a removed context shows up once per span, items only in
+        # contexts without a record range have no place in record time.
+        if item is previous or np.isnan(start):
+            continue
+
+        previous = item
+        yield item, start, end, _enabled
+
+
+def resolved_events(timeline_matrix, kind):
+    """ Topmost items of a track kind, cut to the contexts where they are on top.
+        args:
+            timeline_matrix(matrix.Matrix): matrix to export.
+            kind(str): "video", "audio" or "data".
+
+        return: list of item, record start, record end and offset of record start
+                from record start of item, in record order.
+    """
+    record_starts, record_ends = _record_ranges(timeline_matrix)
+    resolved = timeline_matrix.resolved[kind]
+    events = []
+    for index, (name, _kind, _, _) in enumerate(_tracks(timeline_matrix)):
+        if _kind != kind or not (resolved == index).any():
+            continue
+
+        items, starts, spans = timeline_matrix.get_track_spans(name)
+        item_starts, _, clips, contexts = _item_ranges(
+            record_starts, record_ends, starts, spans
+        )
+        on_top = resolved[contexts] == index
+        clips, contexts = clips[on_top], contexts[on_top]
+        if not clips.shape[0]:
+            continue
+
+        # A run is a context range where the same item stays on top.
+        first = np.flatnonzero(np.r_[
+            True, (np.diff(contexts) != 1) | (np.diff(clips) != 0)
+        ])
+        last = np.r_[first[1:], clips.shape[0]] - 1
+        for clip, run_start, run_end in zip(
+            clips[first].tolist(), contexts[first].tolist(), contexts[last].tolist()
+        ):
+            events.append((
+                record_starts[run_start], items[clip], record_ends[run_end],
+                record_starts[run_start] - item_starts[clip]
+            ))
+
+    events.sort(key=lambda event: event[0])
+
+    return [(item, start, end, offset) for start, item, end, offset in events]
+
+
+def _trimmed(item, offset, frames, rate):
+    """ Copy of an item showing given frames of it.
+        args:
+            item(otio.core.Item): otio item.
+            offset(float): first frame shown, from start of item.
+            frames(float): number of frames shown.
+            rate(float): frame rate of offset and frames.
+    """
+    trimmed_range = item.trimmed_range()
+    item_rate = trimmed_range.start_time.rate
+    clone = item.clone()
+    clone.source_range = otio.opentime.TimeRange(
+        trimmed_range.start_time +
+        otio.opentime.RationalTime(offset, rate).rescaled_to(item_rate),
+        otio.opentime.RationalTime(frames, rate).rescaled_to(item_rate)
+    )
+
+    return clone
+
+
+def _track_children(events, rate):
+    """ Serialized items of a track with gaps between them.
+        args:
+            events(iterable): item, record start, record end and serialized item.
+            rate(float): frame rate of record frames.
+    """
+    position = 0.0
+    for start, end, serialized in events:
+        if start > position:
+            yield _gap(start - position, rate)
+
+        yield serialized
+        position = end
+
+
+def _serialize(item, enabled=True):
+    serialized = otio.adapters.write_to_string(item, "otio_json")
+    if enabled or not item.enabled:
+        return serialized
+
+    data = json.loads(serialized)
+    data["enabled"] = False
+
+    return json.dumps(data, indent=4)
+
+
+def export_otio(timeline_matrix, stream, name="", resolved_only=False):
+    """ Write matrix as an otio json timeline. Items are serialized one at a time
+        straight to the stream, no timeline is built in memory. Tracks are written
+        in track order, disabled tracks and cells are written disabled and locked
+        tracks are marked in track metadata.
+        args:
+            timeline_matrix(matrix.Matrix): matrix to export.
+            stream(file): text stream.
+            name(str): timeline name.
+            resolved_only(bool): write one track per kind with the topmost items only.
+    """
+    rate = timeline_matrix.rate
+    prefix, suffix = _shell(otio.schema.Timeline(name=name), "tracks", "children")
+    stream.write(prefix)
+
+    tracks = []
+    if resolved_only:
+        for kind in matrix.TRACK_KINDS:
+            events = resolved_events(timeline_matrix, kind)
+            if not events:
+                continue
+
+            tracks.append((RESOLVED_TRACKS[kind], kind, True, True, (
+                (start, end, _serialize(_trimmed(item, offset, end - start, rate)))
+                for item, start, end, offset in events
+            )))
+
+    else:
+        for track, kind, enabled, active in _tracks(timeline_matrix):
+            tracks.append((track, kind, enabled, active, (
+                (start, end, _serialize(item, _enabled or not enabled))
+                for item, start, end, _enabled in track_events(timeline_matrix, track)
+            )))
+
+    for index, (track, kind, enabled, active, events) in enumerate(tracks):
+        otio_track = otio.schema.Track(name=track, kind=OTIO_KINDS[kind])
+        otio_track.enabled = enabled
+        if not active:
+            otio_track.metadata["timeline"] = {"locked": True}
+
+        track_prefix, track_suffix = _shell(otio_track, "children")
+        if index:
+            stream.write(",\n")
+
+        stream.write(track_prefix)
+        _write_children(stream, _track_children(events, rate))
+        stream.write(track_suffix)
+
+    stream.write(suffix)
+
+
+def _timecode(frames, rate):
+    return otio.opentime.to_timecode(otio.opentime.RationalTime(round(frames), rate), rate)
+
+
+def _reel(item):
+    """ Reel name of an item, file name of its media without extension.
+    """
+    path = media.media_path(item)
+    name = os.path.splitext(os.path.basename(path))[0] if path else ""
+    name = name or getattr(getattr(item, "media_reference", None), "name", "")
+
+    return re.sub(r"[^A-Za-z0-9_]", "_", name) or "AX"
+
+
+def export_edl(timeline_matrix, stream, name=""):
+    """ Write matrix as a CMX3600 edl, events are written as they are found. An
+        edl has a single layer, so the topmost video and audio items are written.
+        args:
+            timeline_matrix(matrix.Matrix): matrix to export.
+            stream(file): text stream.
+            name(str): edl title.
+    """
+    rate = timeline_matrix.rate
+    stream.write("TITLE: {}\nFCM: NON-DROP FRAME\n\n".format(name))
+
+    number = 0
+    for kind, channel in sorted(EDL_CHANNELS.items(), key=lambda entry: entry[1], reverse=True):
+        for item, start, end, offset in resolved_events(timeline_matrix, kind):
+            number += 1
+            item_range = item.trimmed_range()
+            source_start = item_range.start_time.rescaled_to(rate).value + offset
+            stream.write(
+                "{:03d}  {:<8} {:<5} C        {} {} {} {}\n".format(
+                    number, _reel(item)[:8], channel,
+                    _timecode(source_start, rate),
+                    _timecode(source_start + end - start, rate),
+                    _timecode(start, rate), _timecode(end, rate)
+                )
+            )
+            stream.write("* FROM CLIP NAME: {}\n".format(item.name))
+            path = media.media_path(item)
+            if path:
+                stream.write("* SOURCE FILE: {}\n".format(path))
+
+            stream.write("\n")
+
+
+def export_file(timeline_matrix, path, name="", resolved_only=False):
+    """ Export matrix to an otio or edl file, format follows file extension.
+        args:
+            timeline_matrix(matrix.Matrix): matrix to export.
+            path(str): output path, ".edl" for an edl, otio json otherwise.
+            name(str): timeline name.
+            resolved_only(bool): export topmost items only, edl files always are.
+    """
+    with open(path, "w") as stream:
+        if os.path.splitext(path)[1].lower() == ".edl":
+            export_edl(timeline_matrix, stream, name)
+
+        else:
+            export_otio(timeline_matrix, stream, name, resolved_only)
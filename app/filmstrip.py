@@ -0,0 +1,173 @@
+import functools
+import math
+import subprocess
+
+from PySide2 import QtGui, QtCore
+
+from app import cache, thumbnails
+
+# Frames in a tile, a tile is one row of frames.
+TILE_FRAMES = 8
+FRAME_WIDTH = 96
+FRAME_HEIGHT = 54
+# Number of decoded tiles kept in memory.
+TILE_CAPACITY = 256
+# Level n samples every 2 ** n frames.
+MAX_LEVEL = 20
+
+
+def ffmpeg_tile(path, output, times):
+    """ Write frames of a video at given times side by side as png with ffmpeg.
+        Every frame is seeked to, frames between them are not decoded.
+        args:
+            path(str): video path.
+            output(str): png path.
+            times(list): seconds from media start of each frame.
+    """
+    inputs = []
+    filters = []
+    for index, time in enumerate(times):
+        inputs += ["-ss", "{:.3f}".format(time), "-i", path]
+        filters.append(
+            "[{index}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            "pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1[f{index}]".format(
+                index=index, width=FRAME_WIDTH, height=FRAME_HEIGHT
+            )
+        )
+
+    filters.append(
+        "{}hstack=inputs={}".format(
+            "".join("[f{}]".format(index) for index in range(len(times))), len(times)
+        )
+    )
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-y"] + inputs +
+        ["-filter_complex", ";".join(filters), "-frames:v", "1", output],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        timeout=thumbnails.FFMPEG_TIMEOUT * len(times), check=True
+    )
+
+
+def locate(frame, step):
+    """ Tile holding the sample nearest to a frame, at the level sampling at
+        least every step frames.
+        args:
+            frame(float): media frame from media start.
+            step(float): frames between neighbouring samples on screen.
+
+        return: level, tile index and column of sample in tile.
+    """
+    level = min(max(int(math.ceil(math.log(max(step, 1.0), 2))), 0), MAX_LEVEL)
+    sample = int(max(frame, 0)) >> level
+
+    return level, sample // TILE_FRAMES, sample % TILE_FRAMES
+
+
+class FilmstripService(QtCore.QObject):
+    """ Filmstrip tiles of videos. Frames are sampled at several levels, each
+        level twice as sparse as the one below, and stored on disk as a pyramid
+        of tiles keyed by path, size and modification time. Tiles are generated
+        on a bounded thread pool when they are first painted, decoded tiles are
+        kept in a LRU. tile_ready is emitted when a requested tile is available.
+    """
+    # Media path.
+    tile_ready = QtCore.Signal(str)
+
+    def __init__(self, generator=ffmpeg_tile, max_jobs=thumbnails.MAX_JOBS, *args, **kwargs):
+        """ Create new filmstrip service.
+            args:
+                generator(callable): called with media path, output png path and
+                                     seconds of each frame.
+                max_jobs(int): number of tiles generated at the same time.
+        """
+        super(FilmstripService, self).__init__(*args, **kwargs)
+        self.generator = generator
+        self.thread_pool = QtCore.QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(max_jobs)
+        self.tiles = cache.LRUCache(TILE_CAPACITY)
+        # Media path against cache key, files are only stat'ed once.
+        self._keys = {}
+        # Tile key against queued or running job.
+        self._pending = {}
+        self._failed = set()
+
+        self._job_signals = thumbnails.ThumbnailJobSignals()
+        self._job_signals.finished.connect(self._job_finished)
+
+    def _key(self, path):
+        if path not in self._keys:
+            self._keys[path] = cache.cache_key(
+                path, FRAME_WIDTH, FRAME_HEIGHT, TILE_FRAMES
+            )
+
+        return self._keys[path]
+
+    def tile(self, path, rate, last_frame, level, index):
+        """ Tile of a video. When it is not in memory a job is queued and
+            tile_ready is emitted once it is done.
+            args:
+                path(str): media path.
+                rate(float): frame rate of media.
+                last_frame(int): last frame of media from media start.
+                level(int): sampling level.
+                index(int): tile index in level.
+
+            return: QtGui.QPixmap or None if not available yet.
+        """
+        key = self._key(path)
+        if key is None:
+            return None
+
+        key = "{}_{}_{}".format(key, level, index)
+        pixmap = self.tiles.get(key)
+        if pixmap is not None or key in self._pending or key in self._failed:
+            return pixmap
+
+        times = [
+            min((index * TILE_FRAMES + column) << level, max(last_frame, 0)) / float(rate)
+            for column in range(TILE_FRAMES)
+        ]
+        job = thumbnails.ThumbnailJob(
+            path, key, functools.partial(self.generator, times=times),
+            self._job_signals, "filmstrips"
+        )
+        job.setAutoDelete(False)
+        self._pending[key] = job
+        self.thread_pool.start(job)
+
+    def clear_queue(self):
+        """ Drop tiles queued but not started, called when the visible range or
+            zoom changes so only tiles still on screen are generated.
+        """
+        for key, job in list(self._pending.items()):
+            if self.thread_pool.tryTake(job):
+                del self._pending[key]
+
+    def _job_finished(self, path, key, image):
+        """ Convert decoded image to a pixmap on the GUI thread.
+        """
+        self._pending.pop(key, None)
+        if image.isNull():
+            self._failed.add(key)
+            return
+
+        self.tiles.put(key, QtGui.QPixmap.fromImage(image))
+        self.tile_ready.emit(path)
+
+    def wait(self):
+        """ Wait for queued jobs, results are delivered by the event loop.
+        """
+        self.thread_pool.waitForDone()
+
+
+_service = None
+
+
+def filmstrip_service():
+    """ Filmstrip service shared by all scenes, created on first use.
+    """
+    global _service
+    if _service is None:
+        _service = FilmstripService()
+
+    return _service
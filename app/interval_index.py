@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class IntervalIndex(object):
+    """ Record ranges of contexts sorted by start frame. Contexts of a matrix do
+        not overlap, so the context under a frame is found with a single binary
+        search. Ranges are inserted and removed in place, the index is never
+        rebuilt from scratch.
+    """
+    def __init__(self):
+        self.starts = np.zeros(0, float)
+        self.ends = np.zeros(0, float)
+        self.names = np.empty(0, object)
+
+    def __len__(self):
+        return self.starts.shape[0]
+
+    def insert(self, names, starts, ends):
+        """ Add record ranges, ranges without a start or end are ignored.
+            args:
+                names(list): context names.
+                starts(numpy.ndarray): record start frame of each context.
+                ends(numpy.ndarray): record end frame (exclusive) of each context.
+        """
+        names = np.array(names, object).reshape(-1)
+        starts = np.asarray(starts, float).reshape(-1)
+        ends = np.asarray(ends, float).reshape(-1)
+        valid = ~(np.isnan(starts) | np.isnan(ends))
+        order = np.argsort(starts[valid], kind="stable")
+        names, starts, ends = names[valid][order], starts[valid][order], ends[valid][order]
+        if not starts.shape[0]:
+            return
+
+        positions = np.searchsorted(self.starts, starts, "right")
+        self.starts = np.insert(self.starts, positions, starts)
+        self.ends = np.insert(self.ends, positions, ends)
+        self.names = np.insert(self.names, positions, names)
+
+    def remove(self, name, start):
+        """ Remove record range of a context.
+            args:
+                name(str): context name.
+                start(float): record start frame of context.
+        """
+        first = np.searchsorted(self.starts, start, "left")
+        last = np.searchsorted(self.starts, start, "right")
+        matches = first + np.flatnonzero(self.names[first:last] == name)
+        if not matches.shape[0]:
+            return
+
+        self.starts = np.delete(self.starts, matches)
+        self.ends = np.delete(self.ends, matches)
+        self.names = np.delete(self.names, matches)
+
+    def find(self, frame):
+        """ Name of context whose record range holds given frame, None if no
+            context is present at that frame.
+            args:
+                frame(float): record frame.
+        """
+        index = np.searchsorted(self.starts, frame, "right") - 1
+        if index < 0 or frame >= self.ends[index]:
+            return None
+
+        return self.names[index]
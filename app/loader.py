@@ -0,0 +1,128 @@
+import opentimelineio as otio
+from PySide2 import QtCore
+
+from app import matrix, probe
+
+
+class LoadCancelled(Exception):
+    """ Raised on the worker thread to stop a cancelled load.
+    """
+
+
+class LoaderSignals(QtCore.QObject):
+
+    # Steps done and total steps, total is 0 while the file is being read.
+    progress = QtCore.Signal(int, int)
+    # File contents and matrix.StackLayout of timeline, None for other contents.
+    finished = QtCore.Signal(object, object)
+    failed = QtCore.Signal(str)
+    cancelled = QtCore.Signal()
+
+    def __init__(self):
+        super(LoaderSignals, self).__init__()
+
+
+class TimelineLoader(QtCore.QRunnable):
+    """ Read a timeline file, lay out its tracks and fill the matrix storage on a
+        worker thread. Signals are emitted from the worker thread and delivered to
+        receivers on the GUI thread, which swaps the storage in and builds the scene.
+    """
+    def __init__(self, path):
+        """ Create new loader.
+            args:
+                path(str): timeline file path.
+        """
+        super(TimelineLoader, self).__init__()
+        self.setAutoDelete(False)
+        self.path = path
+        self.loader_signals = LoaderSignals()
+        self._cancelled = False
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        """ Stop loading, cancelled signal is emitted once the worker stops.
+        """
+        self._cancelled = True
+
+    def _check_cancelled(self):
+        """ Raise LoadCancelled if loading was cancelled.
+        """
+        if self._cancelled:
+            raise LoadCancelled()
+
+    def _progress(self, done, total):
+        """ Report progress of layout, raise LoadCancelled if loading was cancelled.
+        """
+        self._check_cancelled()
+        self.loader_signals.progress.emit(done, total)
+
+    def start(self, thread_pool=None):
+        """ Start loading on given thread pool.
+            args:
+                thread_pool(QtCore.QThreadPool): global thread pool if None.
+        """
+        (thread_pool or QtCore.QThreadPool.globalInstance()).start(self)
+
+    def read(self):
+        """ Read contents to load, called on the worker thread.
+
+            return: otio contents.
+        """
+        self.loader_signals.progress.emit(0, 0)
+
+        return otio.adapters.read_from_file(self.path)
+
+    def run(self):
+        """ Overriding run of QtCore.QRunnable.
+        """
+        try:
+            file_contents = self.read()
+            self._check_cancelled()
+
+            layout = None
+            if isinstance(file_contents, otio.schema.Timeline):
+                layout = matrix.StackLayout(file_contents.tracks, self._progress)
+                self._check_cancelled()
+                layout.fill()
+
+            self._check_cancelled()
+
+        except LoadCancelled:
+            self.loader_signals.cancelled.emit()
+
+        except Exception as error:
+            self.loader_signals.failed.emit(
+                "Sorry, {} could not be loaded: {}".format(self.path, error)
+            )
+
+        else:
+            self.loader_signals.finished.emit(file_contents, layout)
+
+
+class ClipsLoader(TimelineLoader):
+    """ Build a timeline from media clips on a worker thread. Clips are probed
+        in parallel for frame rate and frame range, one clip after the other in
+        selection order.
+    """
+    def __init__(self, paths, name="Clips", prober=None):
+        """ Create new loader.
+            args:
+                paths(list): media paths.
+                name(str): timeline name.
+                prober(probe.MediaProber): prober to use, a new one when None.
+        """
+        super(ClipsLoader, self).__init__(name)
+        self.paths = list(paths)
+        self.prober = prober
+
+    def read(self):
+        """ Overriding read of TimelineLoader.
+        """
+        items = probe.media_items(self.paths, self.prober, self._progress)
+        if not items:
+            raise Exception("Sorry, none of the clips could be probed.")
+
+        return probe.timeline_from_items(items, self.path)
@@ -1,6 +1,229 @@
+import contextlib
+
 import numpy as np
+import opentimelineio as otio
 from PySide2 import QtCore
 
+from app import interval_index, matrix_storage, resolver, sweep
+
+# Track name prefix of each track kind, "V1", "A1", "D1"...
+TRACK_PREFIXES = {
+    "video" : "V",
+    "audio" : "A",
+    "data" : "D",
+}
+
+# Kind codes stored in the matrix, position in tuple is the code.
+TRACK_KINDS = ("video", "audio", "data")
+
+# Per cell states, "enabled" for hide/mute and "active" for lock.
+CELL_STATES = ("enabled", "active")
+
+# Frame rate used when a stack has no timed items.
+DEFAULT_RATE = 24.0
+
+
+def track_kind(otio_track):
+    """ Timeline track kind of given otio track.
+        args:
+            otio_track(otio.schema.Track): otio track.
+    """
+    if otio_track.kind == otio.schema.TrackKind.Video:
+        return "video"
+
+    elif otio_track.kind == otio.schema.TrackKind.Audio:
+        return "audio"
+
+    return "data"
+
+
+def stack_rate(stack):
+    """ Frame rate of first item with a duration in given stack.
+        args:
+            stack(otio.schema.Stack): otio stack.
+    """
+    for _track in stack:
+        for item in _track:
+            if isinstance(item, otio.core.Item):
+                return item.duration().rate
+
+    return DEFAULT_RATE
+
+
+def track_clips(otio_track, rate):
+    """ Items of a track with their record range in frames. Gaps and transitions
+        are left out.
+        args:
+            otio_track(otio.schema.Track): otio track.
+            rate(float): frame rate of record range.
+
+        return: list of items, start frames and end frames (exclusive).
+    """
+    ranges = otio_track.range_of_all_children()
+    items, starts, ends = [], [], []
+    for item in otio_track:
+        if (
+            not isinstance(item, otio.core.Item) or
+            isinstance(item, otio.schema.Gap)
+        ):
+            continue
+
+        record_range = ranges[item]
+        items.append(item)
+        starts.append(record_range.start_time.rescaled_to(rate).value)
+        ends.append(record_range.end_time_exclusive().rescaled_to(rate).value)
+
+    return items, np.array(starts, float), np.array(ends, float)
+
+
+def kind_from_name(track):
+    """ Track kind from a track name like "V1", None for unknown names.
+        args:
+            track(str): track name.
+    """
+    prefix = track.rstrip("0123456789")
+    for kind, _prefix in TRACK_PREFIXES.items():
+        if _prefix == prefix:
+            return kind
+
+
+def resolved_column(kind):
+    """ Name of context column holding resolved track index of given kind.
+    """
+    return "resolved_{}".format(kind)
+
+
+class StackLayout(object):
+    """ Tracks and contexts of an otio stack. Nothing here touches the matrix or
+        creates cells, so a layout can be computed on a worker thread and handed
+        to Matrix.populate. A filled layout also carries the storage built from
+        it, which Matrix.populate of an empty matrix swaps in.
+    """
+    def __init__(self, stack, progress=None):
+        """ Lay out an otio stack.
+            args:
+                stack(otio.schema.Stack): composition to be loaded.
+                progress(callable): called with number of tracks done and total.
+        """
+        self.rate = stack_rate(stack)
+        self.tracks = []
+        total = len(stack)
+        for index, _track in enumerate(stack):
+            items, starts, ends = track_clips(_track, self.rate)
+            if items:
+                self.tracks.append((track_kind(_track), items, starts, ends))
+
+            if progress:
+                progress(index + 1, total)
+
+        self.context_starts, self.context_ends, first, last = sweep.sweep(
+            np.concatenate([starts for _, _, starts, _ in self.tracks] or [[]]),
+            np.concatenate([ends for _, _, _, ends in self.tracks] or [[]])
+        )
+
+        # First and last (exclusive) context of every item, per track.
+        self.spans = []
+        offset = 0
+        for _, items, _, _ in self.tracks:
+            count = len(items)
+            self.spans.append((first[offset:offset + count], last[offset:offset + count]))
+            offset += count
+
+        # Storage, interval index and track names set by fill, given up to the
+        # first matrix populated from the layout.
+        self.sparse = False
+        self.storage = None
+        self.intervals = None
+        self.track_names = []
+        self.track_counters = {}
+
+    def fill(self, sparse=False):
+        """ Build the storage of a matrix holding the otio items of the layout,
+            called on the worker thread so populating a matrix on the GUI thread
+            only swaps storage.
+            args:
+                sparse(bool): keep only occupied cells.
+        """
+        filled = Matrix(sparse)
+        self.track_names, _ = filled._fill(self)
+        self.sparse = sparse
+        self.storage, self.intervals = filled.storage, filled.intervals
+        self.track_counters = filled._track_counters
+
+
+class ChangeSet(object):
+    """ Changes made to a matrix in a batch, emitted at once by the changed signal.
+        Names are kept in the order of changes, a track added and removed again
+        in the same batch is in both lists, so receivers compare with the matrix.
+    """
+    # List of names recorded for each signal carrying a name.
+    _lists = {
+        "add_new_track" : "added_tracks",
+        "remove_track" : "removed_tracks",
+        "swap_track" : "moved_tracks",
+        "add_new_context" : "added_contexts",
+        "remove_context" : "removed_contexts",
+        "swap_context" : "moved_contexts",
+    }
+
+    def __init__(self):
+        self.added_tracks = []
+        self.removed_tracks = []
+        self.moved_tracks = []
+        self.added_contexts = []
+        self.removed_contexts = []
+        self.moved_contexts = []
+        # (cell, context, track) of every added cell.
+        self.cells = []
+        # [items, enabled, active, tracks, contexts] of every state change.
+        self.states = []
+        # Matrix is resolved once when the batch is done.
+        self.resolve = False
+
+    def record(self, name, *args):
+        """ Record a change instead of emitting its signal.
+            args:
+                name(str): name of signal in MatrixSignals.
+                args: arguments of signal.
+        """
+        if name == "populated":
+            track_names, context_names = args[0]
+            self.added_tracks.extend(track_names)
+            self.added_contexts.extend(context_names)
+
+        elif name == "add_cell":
+            self.cells.append(tuple(args[0]))
+
+        elif name == "state_changed":
+            self.states.append(args[0])
+
+        else:
+            getattr(self, self._lists[name]).append(args[0])
+
+    def tracks_changed(self):
+        return bool(self.added_tracks or self.removed_tracks or self.moved_tracks)
+
+    def contexts_changed(self):
+        return bool(self.added_contexts or self.removed_contexts or self.moved_contexts)
+
+    def empty(self):
+        return not (
+            self.tracks_changed() or self.contexts_changed() or
+            self.cells or self.states
+        )
+
+    def state_entries(self):
+        """ All state changes as one [items, enabled, active, tracks, contexts]
+            entry, later changes of a cell come after earlier ones.
+        """
+        if not self.states:
+            return None
+
+        return [
+            np.concatenate([entry[index] for entry in self.states])
+            for index in range(5)
+        ]
+
 
 class MatrixSignals(QtCore.QObject):
 
@@ -8,21 +231,354 @@ class MatrixSignals(QtCore.QObject):
     add_new_context = QtCore.Signal(str)
     remove_track = QtCore.Signal(str)
     remove_context = QtCore.Signal(str)
-    swap_track = QtCore.Signal()
-    swap_context = QtCore.Signal()
+    swap_track = QtCore.Signal(str, int)
+    swap_context = QtCore.Signal(str, int)
     add_cell = QtCore.Signal(object)
-    resolve_matrix = QtCore.Signal()
+    state_changed = QtCore.Signal(object)
+    populated = QtCore.Signal(object)
+    resolve_matrix = QtCore.Signal(object)
+    seek = QtCore.Signal(object)
+    # ChangeSet of a batch.
+    changed = QtCore.Signal(object)
 
     def __init__(self):
         super(MatrixSignals, self).__init__()
 
 
 class Matrix(object):
-    def __init__(self): 
+    def __init__(self, sparse=False): 
+        """ Create new timeline matrix.
+            args:
+                sparse(bool): keep only occupied cells, for wide and sparse timelines.
+        """
         self.matrix_signals = MatrixSignals()
-        self.matrix = np.empty((0,0), object)
-        self._context_dict = {}
-        self.track_dict = {}
+        self.sparse = sparse
+        # ChangeSet of the open batch, None outside of a batch.
+        self._batch = None
+        # Increased on every change, lets cached views of the matrix tell they are stale.
+        self.revision = 0
+        # Increased on every edit of tracks, contexts and cells, states are
+        # compared by value instead, see edit_state.
+        self.edits = 0
+        self.clear()
+
+    def clear(self):
+        """ Drop every track, context and item. Storage is replaced, so memory
+            of the previous contents is released.
+        """
+        if self.sparse:
+            self.storage = matrix_storage.SparseStorage()
+
+        else:
+            self.storage = matrix_storage.DenseStorage()
+
+        self._track_counters = dict((kind, 0) for kind in TRACK_PREFIXES)
+        self.rate = DEFAULT_RATE
+        # Contexts sorted by record range, for frame lookups.
+        self.intervals = interval_index.IntervalIndex()
+        self.revision += 1
+        self.edits += 1
+        # Record range of each context in frames.
+        self.storage.contexts.add_column("record_start", float, np.nan)
+        self.storage.contexts.add_column("record_end", float, np.nan)
+        self.storage.tracks.add_column("kind", np.int8, -1)
+        self.storage.tracks.add_column("dirty", bool, True)
+        # New contexts are dirty until they are resolved.
+        self.storage.contexts.add_column("dirty", bool, True)
+        # The state of each cell is the state of its track and of its context.
+        for state in CELL_STATES:
+            self.storage.add_state(state)
+
+        for kind in TRACK_KINDS:
+            self.storage.contexts.add_column(resolved_column(kind), np.int32, -1)
+
+    @classmethod
+    def from_stack(cls, stack, cell_factory=None, sparse=False):
+        """ Create a matrix from an otio stack.
+            args:
+                stack(otio.schema.Stack): composition to be loaded.
+                cell_factory(callable): called with track kind and otio item, returns
+                                        the cell. Otio items are stored when None.
+                sparse(bool): keep only occupied cells.
+
+            return: Matrix
+        """
+        timeline_matrix = cls(sparse)
+        timeline_matrix.populate(stack, cell_factory)
+
+        return timeline_matrix
+
+    @property
+    def matrix(self):
+        """ Logical matrix of contexts x tracks.
+        """
+        return self.storage.to_array()
+
+    @property
+    def resolved(self):
+        """ Last resolved track index per context of each track kind,
+            -1 where nothing is resolved.
+        """
+        return dict(
+            (kind, self.storage.contexts.logical(resolved_column(kind)))
+            for kind in TRACK_KINDS
+        )
+
+    @property
+    def track_dict(self):
+        """ Track name against storage slot.
+        """
+        return self.storage.tracks.slots
+
+    @property
+    def _context_dict(self):
+        """ Context name against storage slot.
+        """
+        return self.storage.contexts.slots
+
+    def new_track_name(self, kind):
+        """ Next free track name of given kind.
+            args:
+                kind(str): "video", "audio" or "data".
+        """
+        self._track_counters[kind] += 1
+        return "{}{}".format(TRACK_PREFIXES[kind], self._track_counters[kind])
+
+    def populate(self, stack, cell_factory=None, layout=None):
+        """ Fill the matrix from an otio stack in one pass. Storage is sized up front
+            and a single populated signal is emitted instead of one signal per track,
+            context and cell.
+            Contexts are the intervals between the record boundaries of all clips
+            in the stack, each clip is added to every context it spans.
+            args:
+                stack(otio.schema.Stack): composition to be loaded.
+                cell_factory(callable): called with track kind and otio item, returns
+                                        the cell. Otio items are stored when None.
+                layout(StackLayout): layout of stack if already computed. Storage of
+                                     a filled layout is swapped into an empty matrix.
+
+            return: list of added track names.
+        """
+        if layout is None:
+            layout = StackLayout(stack)
+
+        filled = layout.storage is not None and layout.sparse == self.sparse
+        if filled and cell_factory is None and not self._context_dict and not self.track_dict:
+            track_names, new_contexts = self._swap(layout)
+
+        else:
+            track_names, new_contexts = self._fill(layout, cell_factory)
+
+        self._emit("populated", [track_names, new_contexts])
+        self.resolve_matrix()
+
+        return track_names
+
+    def _swap(self, layout):
+        """ Take the storage of a filled layout, the layout gives it up.
+            args:
+                layout(StackLayout): layout filled by StackLayout.fill.
+
+            return: added track names and added context names.
+        """
+        self.storage, self.intervals = layout.storage, layout.intervals
+        self._track_counters = layout.track_counters
+        self.rate = layout.rate
+        layout.storage = layout.intervals = None
+        self.revision += 1
+        self.edits += 1
+        contexts = self.storage.contexts
+
+        return list(layout.track_names), list(contexts.names[contexts.order()])
+
+    def _fill(self, layout, cell_factory=None):
+        """ Add tracks, contexts and cells of a layout to storage, nothing is
+            emitted or resolved.
+            args:
+                layout(StackLayout): layout of stack.
+                cell_factory(callable): called with track kind and otio item, returns
+                                        the cell. Otio items are stored when None.
+
+            return: added track names and added context names.
+        """
+        self.rate = layout.rate
+        contexts = np.array(
+            ["context_{}".format(index) for index in range(layout.context_starts.shape[0])],
+            object
+        )
+        new_contexts = [
+            context for context in contexts if context not in self._context_dict
+        ]
+
+        self.storage.reserve(len(new_contexts), len(layout.tracks))
+        for context in new_contexts:
+            self._add_context(context)
+
+        self._set_context_ranges(contexts, layout.context_starts, layout.context_ends)
+
+        track_names = []
+        for (kind, items, _, _), (first, last) in zip(layout.tracks, layout.spans):
+            track = self.new_track_name(kind)
+            self._add_track(track, kind)
+
+            clips, context_index = sweep.expand(first, last)
+            cell_items = np.empty(len(items), object)
+            for index, item in enumerate(items):
+                cell_items[index] = cell_factory(kind, item) if cell_factory else item
+
+            self.storage.set_cells(
+                contexts[context_index], track, cell_items[clips]
+            )
+            self._mark_tracks_dirty(self.track_dict[track])
+            track_names.append(track)
+
+        return track_names, new_contexts
+
+    def _add_track(self, track, kind):
+        """ Add track to storage with its kind.
+        """
+        slot = self.storage.add_track(track)
+        columns = self.storage.tracks.columns
+        columns["kind"][slot] = TRACK_KINDS.index(kind) if kind in TRACK_KINDS else -1
+        self.storage.sync_track(slot)
+
+    def _add_context(self, context):
+        """ Add context to storage, cell states follow state of tracks.
+        """
+        slot = self.storage.add_context(context)
+        self.storage.sync_context(slot)
+        self.revision += 1
+
+    def _set_context_ranges(self, contexts, starts, ends):
+        """ Set record range of contexts and update interval index.
+            args:
+                contexts(numpy.ndarray): context names.
+                starts(numpy.ndarray): record start frames.
+                ends(numpy.ndarray): record end frames (exclusive).
+        """
+        columns = self.storage.contexts.columns
+        slots = [self._context_dict[context] for context in contexts]
+        for context, start in zip(contexts, columns["record_start"][slots]):
+            if not np.isnan(start):
+                self.intervals.remove(context, start)
+
+        columns["record_start"][slots] = starts
+        columns["record_end"][slots] = ends
+        self.intervals.insert(contexts, starts, ends)
+        self.revision += 1
+        self.edits += 1
+
+    def _mark_tracks_dirty(self, slots):
+        """ Mark tracks dirty along with every context having an item on them.
+            args:
+                slots(int or numpy.ndarray): storage slots of tracks.
+        """
+        self.storage.tracks.columns["dirty"][slots] = True
+        self.storage.contexts.columns["dirty"][
+            self.storage.contexts_with_items(slots)
+        ] = True
+
+    def _emit(self, name, *args):
+        """ Emit a signal of matrix_signals, or record it in the open batch.
+            args:
+                name(str): signal name.
+                args: arguments of signal.
+        """
+        if name != "state_changed":
+            # Every other signal tells about an edit of tracks, contexts or cells.
+            self.edits += 1
+
+        if self._batch is None:
+            getattr(self.matrix_signals, name).emit(*args)
+
+        else:
+            self._batch.record(name, *args)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """ Group changes, no signal is emitted for them one by one. Once the
+            outermost batch is done the matrix is resolved once and a single
+            changed signal is emitted with a ChangeSet of everything done in it.
+            Resolved values are not updated inside a batch.
+
+            with timeline_matrix.batch():
+                for context in contexts:
+                    timeline_matrix.add_cell(item, context, "V1")
+        """
+        if self._batch is not None:
+            yield self._batch
+            return
+
+        self._batch = ChangeSet()
+        try:
+            yield self._batch
+
+        finally:
+            changes, self._batch = self._batch, None
+            if changes.resolve:
+                self.resolve_matrix()
+
+            if not changes.empty():
+                self.matrix_signals.changed.emit(changes)
+
+    def _emit_state(self, entries):
+        """ Emit state_changed with given cells, their states, track names and
+            context indexes, cells are restyled by the receiver in one pass.
+            args:
+                entries(tuple): context slots, track slots and cells.
+        """
+        rows, cols, cell_items = entries
+        if not cell_items.shape[0]:
+            return
+
+        self._emit("state_changed", [
+            cell_items,
+            self.storage.state("enabled", rows, cols),
+            self.storage.state("active", rows, cols),
+            self.storage.tracks.names[cols],
+            self.storage.positions(self.storage.contexts, rows),
+        ])
+
+    def _set_track_state(self, track, state, value):
+        """ Set state of a track and of all its cells with one slice assignment.
+            args:
+                track(str): track name.
+                state(str): "enabled" or "active".
+                value(bool): new state.
+        """
+        if not track in self.track_dict:
+            raise Exception("Sorry, {} is not present in timeline matrix".format(track))
+
+        slot = self.track_dict[track]
+        self.storage.tracks.columns[state][slot] = value
+        self.storage.sync_track(slot)
+
+        self._emit_state(self.storage.track_entries(slot))
+
+    def _set_context_state(self, context, state, value):
+        """ Set state of a context and of all its cells with one slice assignment.
+            args:
+                context(str): context name.
+                state(str): "enabled" or "active".
+                value(bool): new state.
+        """
+        if not context in self._context_dict:
+            raise Exception("Sorry, {} is not present in timeline matrix".format(context))
+
+        slot = self._context_dict[context]
+        self.storage.contexts.columns[state][slot] = value
+        self.storage.sync_context(slot)
+
+        self._emit_state(self.storage.context_entries(slot))
+
+    def _mark_tracks_from_dirty(self, track):
+        """ Mark given track and every track after it dirty, logical track index
+            of all of them changes on remove or move.
+            args:
+                track(str): track name.
+        """
+        order = self.storage.tracks.order()
+        self._mark_tracks_dirty(order[self.storage.tracks.index(track):])
 
     def add_new_track(self, track):
         """ Add a new row at the end.
@@ -32,11 +588,8 @@ class Matrix(object):
         if track in self.track_dict:
             raise Exception("Sorry, {} is already present in timeline matrix".format(track))
 
-        current_shape = self.matrix.shape
-        self.matrix = np.insert(self.matrix, current_shape[1], None, axis=1)
-        self.track_dict[track] = current_shape[1]
-        self.matrix_signals.add_new_track.emit(track)
-        # TODO: Need to resolve matrix
+        self._add_track(track, kind_from_name(track))
+        self._emit("add_new_track", track)
 
     def add_new_context(self, context):
         """ Add a new column at the end.
@@ -46,11 +599,8 @@ class Matrix(object):
         if context in self._context_dict:
             raise Exception("Sorry, {} is already present in timeline matrix".format(context))
 
-        current_shape = self.matrix.shape
-        self.matrix = np.insert(self.matrix, current_shape[0], None, axis=0)
-        self._context_dict[context] = current_shape[0]
-        self.matrix_signals.add_new_context.emit(context)
-        # TODO: Need to resolve matrix
+        self._add_context(context)
+        self._emit("add_new_context", context)
 
     def remove_track(self, track):
         """ remove a row at the given index.
@@ -60,10 +610,10 @@ class Matrix(object):
         if not track in self.track_dict:
             raise Exception("Sorry, {} is not present in timeline matrix".format(track))
 
-        self.matrix = np.delete(self.matrix, self.track_dict[track], axis=1)
-        del self.track_dict[track]
-        self.matrix_signals.remove_track.emit(track)
-        # TODO: Need to resolve matrix
+        self._mark_tracks_from_dirty(track)
+        self.storage.remove_track(track)
+        self._emit("remove_track", track)
+        self.resolve_matrix()
 
     def remove_context(self, context):
         """ remove a column at the given index.
@@ -73,49 +623,81 @@ class Matrix(object):
         if not context in self._context_dict:
             raise Exception("Sorry, {} is not present in timeline matrix".format(context))
 
-        self.matrix = np.delete(self.matrix, self._context_dict[context], axis=0)
-        del self._context_dict[context]
-        self.matrix_signals.remove_context.emit(context)
-        # TODO: Need to resolve matrix
+        start = self.storage.contexts.columns["record_start"][self._context_dict[context]]
+        if not np.isnan(start):
+            self.intervals.remove(context, start)
+
+        self.storage.remove_context(context)
+        self.revision += 1
+        self._emit("remove_context", context)
+
+    def set_context_range(self, context, start, end):
+        """ Set record range of a context.
+            args:
+                context(str): context name.
+                start(float): record start frame.
+                end(float): record end frame (exclusive).
+        """
+        if not context in self._context_dict:
+            raise Exception("Sorry, {} is not present in timeline matrix".format(context))
+
+        self._set_context_ranges(
+            np.array([context], object), np.array([start], float), np.array([end], float)
+        )
 
     def lock_track(self, track):
         """ Lock the given track.
             args:
                 track(str): name of track to be locked.
         """
-        for item in self.get_track_items(track):
-            item.active = False
+        self._set_track_state(track, "active", False)
 
     def unlock_track(self, track):
         """ Unock the given track.
             args:
                 track(str): name of track to be unlocked.
         """
-        for item in self.get_track_items(track):
-            item.active = True
+        self._set_track_state(track, "active", True)
 
     def disable_track(self, track):
         """ Disable the given track.
             args:
                 track(str): name of track to be disabled.
         """
-        for item in self.get_track_items(track):
-            item.enable = False
-
-        # TODO: Need to resolve matrix
+        self._set_track_state(track, "enabled", False)
+        self._mark_tracks_dirty(self.track_dict[track])
+        self.resolve_matrix()
 
     def enable_track(self, track):
         """ Enable the given track.
             args:
                 track(str): name of track to be enabled.
         """
-        for item in self.get_track_items(track):
-            item.enable = True
+        self._set_track_state(track, "enabled", True)
+        self._mark_tracks_dirty(self.track_dict[track])
+        self.resolve_matrix()
+
+    def disable_context(self, context):
+        """ Disable the given context.
+            args:
+                context(str): name of context to be disabled.
+        """
+        self._set_context_state(context, "enabled", False)
+        self.storage.contexts.columns["dirty"][self._context_dict[context]] = True
+        self.resolve_matrix()
 
-        # TODO: Need to resolve matrix
+    def enable_context(self, context):
+        """ Enable the given context.
+            args:
+                context(str): name of context to be enabled.
+        """
+        self._set_context_state(context, "enabled", True)
+        self.storage.contexts.columns["dirty"][self._context_dict[context]] = True
+        self.resolve_matrix()
 
     def swap_track(self, track, new_index):
-        """ remove a row at the given index.
+        """ Move a row to the given index, rows in between shift by one.
+            Only the track order changes, cells are not copied.
             args:
                 track(str): name of track to be swapped.
                 new_index(int): new position of row.
@@ -123,14 +705,18 @@ class Matrix(object):
         if not track in self.track_dict:
             raise Exception("Sorry, {} is not present in timeline matrix".format(track))
 
-        _track = self.matrix[:, self.track_dict[track]]
-        self.matrix = np.delete(self.matrix, self.track_dict[track], axis=1)
-        self.matrix = np.insert(self.matrix, new_index, _track, axis=1)
-        self.matrix_signals.swap_track.emit()
-        # TODO: Need to resolve matrix
+        order = self.storage.tracks.order()
+        index = self.storage.tracks.index(track)
+        new_index = min(max(new_index, 0), order.shape[0] - 1)
+        self._mark_tracks_dirty(order[min(index, new_index):max(index, new_index) + 1])
+
+        self.storage.move_track(track, new_index)
+        self._emit("swap_track", track, new_index)
+        self.resolve_matrix()
 
     def swap_context(self, context, new_index):
-        """ remove a column at the given index.
+        """ Move a column to the given index, columns in between shift by one.
+            Only the context order changes, cells are not copied.
             args:
                 context(str): name of context to be swapped.
                 new_index(int): new position of context.
@@ -138,16 +724,15 @@ class Matrix(object):
         if not context in self._context_dict:
             raise Exception("Sorry, {} is not present in timeline matrix".format(context))
 
-        _context = self.matrix[self._context_dict[context], :]
-        self.matrix = np.delete(self.matrix, self._context_dict[context], axis=0)
-        self.matrix = np.insert(self.matrix, new_index, _context, axis=0)
-        self.matrix_signals.swap_context.emit()
-        # TODO: Need to resolve matrix
+        # Resolved values are stored per context and move along with it.
+        self.storage.move_context(context, new_index)
+        self.revision += 1
+        self._emit("swap_context", context, self.storage.contexts.index(context))
 
     def add_cell(self, cell, context, track):
         """ Add cell to given context and track.
         args:
-            cell(QtWidgets.QGraphicsRectItem): Cell item to be added to timeline.
+            cell(otio.core.Item): Item to be added to timeline.
             context(str): Track name
             track(str): Context name
         """
@@ -157,11 +742,20 @@ class Matrix(object):
         if not track in self.track_dict:
             raise Exception("Sorry, {} is not present in timeline matrix".format(track))
 
-        track_index = self.track_dict[track]
-        context_index = self._context_dict[context]
-        self.matrix[context_index, track_index] = cell
-        self.matrix_signals.add_cell.emit([cell, track])
-        # TODO: Need to resolve matrix
+        row, col = self._context_dict[context], self.track_dict[track]
+        self.storage.set_cell(context, track, cell)
+        self.storage.contexts.columns["dirty"][row] = True
+        self.storage.tracks.columns["dirty"][col] = True
+        self._emit("add_cell", [cell, context, track])
+        if not (
+            self.storage.state("enabled", row, col) and
+            self.storage.state("active", row, col)
+        ):
+            cell_items = np.empty(1, object)
+            cell_items[0] = cell
+            self._emit_state((np.array([row]), np.array([col]), cell_items))
+
+        self.resolve_matrix()
 
     def get_track_items(self, track):
         """ Get items in track.
@@ -171,7 +765,77 @@ class Matrix(object):
         if not track in self.track_dict:
             raise Exception("Sorry, {} is not present in timeline matrix".format(track))
 
-        return self.matrix[:, self.track_dict[track]]
+        return self.storage.track_items(track)
+
+    def get_track_spans(self, track):
+        """ Items of a track with the contexts they span, an item spanning more
+            than one context is present in each of them.
+            args:
+                track(str): Track name.
+
+            return: items, index of first context and number of contexts of each item.
+        """
+        if not track in self.track_dict:
+            raise Exception("Sorry, {} is not present in timeline matrix".format(track))
+
+        rows, _, cell_items = self.storage.track_entries(self.track_dict[track])
+        positions = self.storage.positions(self.storage.contexts, rows)
+        order = np.argsort(positions, kind="stable")
+        positions, cell_items = positions[order], cell_items[order]
+        if not positions.shape[0]:
+            return cell_items, positions, positions
+
+        # A new span starts where the item changes or a context is skipped.
+        starts = np.flatnonzero(np.r_[
+            True,
+            (np.diff(positions) != 1) |
+            np.not_equal(
+                [id(cell) for cell in cell_items[1:]],
+                [id(cell) for cell in cell_items[:-1]]
+            )
+        ])
+        spans = np.diff(np.r_[starts, positions.shape[0]])
+
+        return cell_items[starts], positions[starts], spans
+
+    def edit_state(self):
+        """ Value telling whether the matrix was edited, compare values taken
+            before and after. Track and context states are compared by value, so
+            a state set back to what it was is not an edit.
+        """
+        return (self.edits,) + tuple(
+            axis.logical(state).tobytes()
+            for axis in (self.storage.tracks, self.storage.contexts)
+            for state in CELL_STATES
+        )
+
+    def get_contexts(self):
+        """ Context names in logical order.
+        """
+        contexts = self.storage.contexts
+        return contexts.names[contexts.order()]
+
+    def get_tracks(self):
+        """ Track names in logical order.
+        """
+        tracks = self.storage.tracks
+        return tracks.names[tracks.order()]
+
+    def cell_states(self, track, indexes):
+        """ Enabled and active state of cells of a track.
+            args:
+                track(str): Track name.
+                indexes(list): logical context index of each cell.
+
+            return: enabled and active numpy.ndarray of bool.
+        """
+        if not track in self.track_dict:
+            raise Exception("Sorry, {} is not present in timeline matrix".format(track))
+
+        rows = self.storage.contexts.order()[np.asarray(indexes, int)]
+        cols = np.full(rows.shape[0], self.track_dict[track])
+
+        return self.storage.state("enabled", rows, cols), self.storage.state("active", rows, cols)
 
     def get_context_items(self, context):
         """ Get items in context.
@@ -181,9 +845,131 @@ class Matrix(object):
         if not context in self._context_dict:
             raise Exception("Sorry, {} is not present in timeline matrix".format(context))
 
-        return self.matrix[self._context_dict[context], :]
+        return self.storage.context_items(context)
+
+    def frame_at(self, position):
+        """ Record frame at a position measured in contexts, the fraction of position
+            is spread over the record range of the context.
+            args:
+                position(float): logical context index with fraction.
+
+            return: frame or None if there is no context with a record range there.
+        """
+        index = int(np.floor(position))
+        if index < 0 or index >= len(self.storage.contexts):
+            return None
+
+        columns = self.storage.contexts.columns
+        slot = self.storage.contexts.slot(index)
+        start, end = columns["record_start"][slot], columns["record_end"][slot]
+        if np.isnan(start):
+            return None
+
+        return start + (position - index) * (end - start)
+
+    def items_at(self, frame):
+        """ Items present at a record frame on every track.
+            args:
+                frame(float): record frame.
+
+            return: dict with "frame", "context", name of context under frame or None,
+                    "items", track name against item for tracks having an item there,
+                    and for each track kind the resolved item or None.
+        """
+        result = dict((kind, None) for kind in TRACK_KINDS)
+        result.update(frame=frame, context=self.intervals.find(frame), items={})
+        if result["context"] is None:
+            return result
+
+        slot = self._context_dict[result["context"]]
+        _, cols, cell_items = self.storage.context_entries(slot)
+        order = np.argsort(cols)
+        cols, cell_items = cols[order], cell_items[order]
+        tracks = self.storage.tracks
+        result["items"] = dict(zip(tracks.names[cols], cell_items))
+        for kind in TRACK_KINDS:
+            index = self.storage.contexts.columns[resolved_column(kind)][slot]
+            if index >= 0:
+                result[kind] = result["items"].get(tracks.names[tracks.slot(int(index))])
+
+        return result
+
+    def seek(self, frame):
+        """ Look up items at a record frame and emit seek signal with them.
+            args:
+                frame(float): record frame.
+        """
+        result = self.items_at(frame)
+        self.matrix_signals.seek.emit(result)
+
+        return result
+
+    def resolve_matrix(self, full=False):
+        """ Resolve the matrix. For every dirty context the topmost item of each
+            track kind among enabled cells is resolved, locked cells are still
+            resolved. resolve_matrix signal is emitted with the changes.
+            Inside a batch resolution waits for the end of the batch.
+            args:
+                full(bool): resolve every context instead of dirty ones only.
 
-    def resolve_matrix(self):
-        """ Resolve the matrix.
+            return: dict with "contexts", names of contexts whose resolution changed,
+                    "tracks", names of dirty tracks, and for each track kind the new
+                    track index of those contexts, -1 where nothing is resolved.
+                    None inside a batch.
         """
-        self.matrix_signals.resolve_matrix.emit()
+        contexts = self.storage.contexts
+        tracks = self.storage.tracks
+        if full:
+            contexts.columns["dirty"][:contexts.size] = True
+
+        if self._batch is not None:
+            self._batch.resolve = True
+            return None
+
+        self.revision += 1
+        live = contexts.live[:contexts.size]
+
+        dirty = np.flatnonzero(contexts.columns["dirty"][:contexts.size] & live)
+        dirty_tracks = np.flatnonzero(
+            tracks.columns["dirty"][:tracks.size] & tracks.live[:tracks.size]
+        )
+
+        track_order = tracks.order()
+        resolved = resolver.resolve(
+            self.storage.block("occupied", dirty, track_order),
+            self.storage.block("enabled", dirty, track_order),
+            tracks.columns["kind"][track_order],
+            TRACK_KINDS
+        )
+
+        changed = np.zeros(dirty.shape[0], bool)
+        for kind in TRACK_KINDS:
+            column = contexts.columns[resolved_column(kind)]
+            changed |= column[dirty] != resolved[kind]
+            column[dirty] = resolved[kind]
+
+        contexts.columns["dirty"][:contexts.size] = False
+        tracks.columns["dirty"][:tracks.size] = False
+
+        diff = dict(
+            (kind, resolved[kind][changed]) for kind in TRACK_KINDS
+        )
+        diff["contexts"] = contexts.names[dirty[changed]]
+        diff["tracks"] = tracks.names[dirty_tracks]
+        self.matrix_signals.resolve_matrix.emit(diff)
+
+        return diff
+
+    def resolved_items(self, kind):
+        """ Resolved item of every context for given track kind.
+            args:
+                kind(str): "video", "audio" or "data".
+
+            return: numpy.ndarray of cells, None where nothing is resolved.
+        """
+        index = self.resolved[kind]
+        items = np.empty(index.shape[0], object)
+        has_item = index >= 0
+        items[has_item] = self.matrix[np.flatnonzero(has_item), index[has_item]]
+
+        return items
@@ -0,0 +1,904 @@
+import numpy as np
+
+# Initial number of reserved slots on each axis.
+DEFAULT_CAPACITY = 16
+# Reserved capacity is multiplied by this factor whenever an axis is full.
+GROWTH_FACTOR = 2
+# Removed slots are only compacted once they outnumber this many live slots.
+MIN_COMPACT_SLOTS = 32
+
+
+def _resized(array, shape, default):
+    """ Copy of array with given shape, new entries are filled with default.
+    """
+    resized = np.full(shape, default, array.dtype)
+    region = tuple(slice(0, min(old, new)) for old, new in zip(array.shape, shape))
+    resized[region] = array[region]
+
+    return resized
+
+
+class Axis(object):
+    """ Name and slot bookkeeping for one axis of the storage.
+        Slots are stable, logical order is kept as a permutation of live slots
+        with its inverse, the position of each slot, so moving a slot only
+        touches the permutation. Removed slots are left behind as dead slots
+        until the axis is compacted. Per slot values, like the kind of a track,
+        are kept as columns next to the slots.
+    """
+    def __init__(self, capacity):
+        self.slots = {}
+        self.names = np.empty(capacity, object)
+        self.live = np.zeros(capacity, bool)
+        self.position = np.full(capacity, -1, np.int64)
+        self.permutation = np.zeros(capacity, np.int64)
+        self.permuted = False
+        self.columns = {}
+        self._defaults = {}
+        self.size = 0
+        self.dead = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __contains__(self, name):
+        return name in self.slots
+
+    @property
+    def capacity(self):
+        return self.live.shape[0]
+
+    @property
+    def ordered(self):
+        """ True when logical order is the order of slots.
+        """
+        return not self.dead and not self.permuted
+
+    def _arrays(self):
+        """ Per slot arrays of axis with their default value.
+        """
+        yield "names", None
+        yield "live", False
+        yield "position", -1
+        for name, default in self._defaults.items():
+            yield name, default
+
+    def _get_array(self, name):
+        return self.columns[name] if name in self.columns else getattr(self, name)
+
+    def _set_array(self, name, array):
+        if name in self.columns:
+            self.columns[name] = array
+
+        else:
+            setattr(self, name, array)
+
+    def add_column(self, name, dtype, default):
+        """ Add a per slot value column.
+            args:
+                name(str): column name.
+                dtype(numpy.dtype): type of column values.
+                default: value of new and removed slots.
+        """
+        self.columns[name] = np.full(self.capacity, default, dtype)
+        self._defaults[name] = default
+
+    def grow(self, capacity):
+        """ Reserve capacity for more slots.
+            args:
+                capacity(int): new capacity of axis.
+        """
+        for name, default in list(self._arrays()):
+            self._set_array(
+                name, _resized(self._get_array(name), (capacity,), default)
+            )
+        self.permutation = _resized(self.permutation, (capacity,), 0)
+
+    def clear(self, slot):
+        """ Reset slot to default values.
+        """
+        for name, default in self._arrays():
+            self._get_array(name)[slot] = default
+
+    def relocate(self, target, source):
+        """ Copy slots in source index over slots in target.
+        """
+        for name, _ in self._arrays():
+            array = self._get_array(name)
+            array[target] = array[source]
+
+    def order(self):
+        """ Live slots in logical order.
+        """
+        return self.permutation[:len(self.slots)].copy()
+
+    def logical(self, name):
+        """ Values of a column in logical order.
+            args:
+                name(str): column name.
+        """
+        if self.ordered:
+            return self.columns[name][:self.size]
+
+        return self.columns[name][self.permutation[:len(self.slots)]]
+
+    def slot(self, index):
+        """ Slot at given logical index.
+            args:
+                index(int): logical index.
+        """
+        return int(self.permutation[:len(self.slots)][index])
+
+    def index(self, name):
+        """ Logical index of given name.
+            args:
+                name(str): name of track or context.
+        """
+        return int(self.position[self.slots[name]])
+
+    def move(self, slot, new_index):
+        """ Move a slot to given logical index, slots in between shift by one.
+            args:
+                slot(int): slot to be moved.
+                new_index(int): new logical index of slot.
+        """
+        index = self.position[slot]
+        if new_index > index:
+            span = slice(index, new_index + 1)
+            self.permutation[index:new_index] = self.permutation[index + 1:new_index + 1]
+
+        else:
+            span = slice(new_index, index + 1)
+            self.permutation[new_index + 1:index + 1] = self.permutation[new_index:index]
+
+        self.permutation[new_index] = slot
+        self.position[self.permutation[span]] = np.arange(span.start, span.stop)
+        self.permuted = True
+
+    def needs_compaction(self):
+        return self.dead > max(len(self.slots), MIN_COMPACT_SLOTS)
+
+
+class BaseStorage(object):
+    """ Slot bookkeeping shared by storage backends.
+        Rows are contexts and columns are tracks. Appends are amortized O(1) and
+        removals only mark slots as dead, dead slots are compacted lazily.
+        Backends only implement how cells follow their slots.
+    """
+    def __init__(self, capacity=(DEFAULT_CAPACITY, DEFAULT_CAPACITY)):
+        self.contexts = Axis(capacity[0])
+        self.tracks = Axis(capacity[1])
+        self.states = []
+
+    @property
+    def shape(self):
+        return len(self.contexts), len(self.tracks)
+
+    @property
+    def nbytes(self):
+        """ Estimated memory of storage in bytes, items themselves are not counted.
+        """
+        return sum(
+            axis._get_array(name).nbytes
+            for axis in (self.contexts, self.tracks) for name, _ in axis._arrays()
+        ) + self._cell_nbytes()
+
+    def _cell_nbytes(self):
+        raise NotImplementedError("Must override _cell_nbytes")
+
+    def _grow_cells(self, axis, capacity):
+        raise NotImplementedError("Must override _grow_cells")
+
+    def _clear_cells(self, axis, slot):
+        raise NotImplementedError("Must override _clear_cells")
+
+    def _relocate_cells(self, axis, target, source):
+        raise NotImplementedError("Must override _relocate_cells")
+
+    def add_state(self, name):
+        """ Add a per cell state. State of a cell is the state of its context and
+            of its track, both True by default.
+            args:
+                name(str): state name.
+        """
+        self.contexts.add_column(name, bool, True)
+        self.tracks.add_column(name, bool, True)
+        self.states.append(name)
+
+    def sync_track(self, slot):
+        """ Update cell states of a track after its state or context states changed.
+        """
+
+    def sync_context(self, slot):
+        """ Update cell states of a context after its state or track states changed.
+        """
+
+    def _reserve(self, axis, count):
+        """ Make sure given axis can take count more slots without growing.
+        """
+        capacity = axis.capacity
+        while capacity - axis.size < count:
+            capacity = max(capacity * GROWTH_FACTOR, DEFAULT_CAPACITY)
+
+        if capacity != axis.capacity:
+            self._grow_cells(axis, capacity)
+            axis.grow(capacity)
+
+    def _append(self, axis, name):
+        """ Append a new slot at the end of given axis.
+        """
+        if axis.size == axis.capacity:
+            if axis.dead:
+                self._compact(axis)
+
+            self._reserve(axis, 1)
+
+        slot = axis.size
+        axis.size += 1
+        axis.permutation[len(axis.slots)] = slot
+        axis.position[slot] = len(axis.slots)
+        axis.slots[name] = slot
+        axis.names[slot] = name
+        axis.live[slot] = True
+
+        return slot
+
+    def _clear(self, axis, slot):
+        """ Reset a slot and all its cells to default values.
+        """
+        self._clear_cells(axis, slot)
+        axis.clear(slot)
+
+    def _relocate(self, axis, target, source):
+        """ Copy slots in source index over slots in target.
+        """
+        self._relocate_cells(axis, target, source)
+        axis.relocate(target, source)
+
+    def _remove(self, axis, name):
+        """ Remove a slot from given axis. Slot is only marked as dead.
+        """
+        slot = axis.slots.pop(name)
+        index = axis.position[slot]
+        following = axis.permutation[index + 1:len(axis.slots) + 1]
+        axis.position[following] -= 1
+        axis.permutation[index:len(axis.slots)] = following
+        self._clear(axis, slot)
+
+        if slot == axis.size - 1:
+            axis.size -= 1
+            # Trailing dead slots can be dropped without compaction.
+            while axis.size and not axis.live[axis.size - 1]:
+                axis.size -= 1
+                axis.dead -= 1
+
+        else:
+            axis.dead += 1
+
+        if axis.needs_compaction():
+            self._compact(axis)
+
+    def _compact(self, axis):
+        """ Move live slots of given axis to the front, in logical order.
+        """
+        keep = axis.order()
+        count = keep.shape[0]
+        self._relocate(axis, slice(0, count), keep)
+        self._clear(axis, slice(count, axis.size))
+
+        axis.slots = dict(
+            (name, slot) for slot, name in enumerate(axis.names[:count])
+        )
+        axis.permutation[:count] = np.arange(count)
+        axis.position[:count] = np.arange(count)
+        axis.permuted = False
+        axis.size = count
+        axis.dead = 0
+
+    def _move(self, axis, name, new_index):
+        """ Move a slot to given logical index. Only the logical order changes,
+            cells stay in their slots.
+        """
+        slot = axis.slots[name]
+        new_index = min(max(new_index, 0), len(axis.slots) - 1)
+        if axis.position[slot] == new_index:
+            return
+
+        axis.move(slot, new_index)
+
+    def positions(self, axis, slots):
+        """ Logical index of given slots.
+        """
+        if axis.ordered:
+            return slots
+
+        return axis.position[slots]
+
+    def reserve(self, contexts, tracks):
+        """ Reserve room for given number of new contexts and tracks up front.
+            args:
+                contexts(int): number of contexts to be added.
+                tracks(int): number of tracks to be added.
+        """
+        self._reserve(self.contexts, contexts)
+        self._reserve(self.tracks, tracks)
+
+    def add_context(self, context):
+        return self._append(self.contexts, context)
+
+    def add_track(self, track):
+        return self._append(self.tracks, track)
+
+    def remove_context(self, context):
+        self._remove(self.contexts, context)
+
+    def remove_track(self, track):
+        self._remove(self.tracks, track)
+
+    def move_context(self, context, new_index):
+        self._move(self.contexts, context, new_index)
+
+    def move_track(self, track, new_index):
+        self._move(self.tracks, track, new_index)
+
+    def set_cells(self, contexts, track, cells):
+        """ Set cells of given contexts on a track.
+        """
+        for context, cell in zip(contexts, cells):
+            self.set_cell(context, track, cell)
+
+    def state(self, name, rows, cols):
+        """ State of cells at paired context and track slots.
+            args:
+                name(str): state name.
+                rows(numpy.ndarray): storage slots of contexts.
+                cols(numpy.ndarray): storage slots of tracks.
+        """
+        return self.contexts.columns[name][rows] & self.tracks.columns[name][cols]
+
+    def to_array(self):
+        """ Logical matrix of contexts x tracks.
+        """
+        return self.logical("data")
+
+
+class DenseStorage(BaseStorage):
+    """ Object array with reserved capacity on both axes.
+        Per cell flags are kept in layers, boolean arrays parallel to the data.
+    """
+    def __init__(self, capacity=(DEFAULT_CAPACITY, DEFAULT_CAPACITY)):
+        super(DenseStorage, self).__init__(capacity)
+        self.data = np.empty(capacity, object)
+        self.layers = {"occupied": np.zeros(capacity, bool)}
+        self._layer_defaults = {"occupied": False}
+
+    def _arrays(self):
+        """ Data and layers with their default value.
+        """
+        yield "data", None
+        for name, default in self._layer_defaults.items():
+            yield name, default
+
+    def _get_array(self, name):
+        return self.data if name == "data" else self.layers[name]
+
+    def _cell_nbytes(self):
+        """ Implementation of BaseStorage._cell_nbytes.
+        """
+        return sum(self._get_array(name).nbytes for name, _ in self._arrays())
+
+    def _set_array(self, name, array):
+        if name == "data":
+            self.data = array
+
+        else:
+            self.layers[name] = array
+
+    def _axis_view(self, axis, array):
+        """ Array with given axis as first dimension. Returned array is a view.
+        """
+        return array if axis is self.contexts else array.T
+
+    def add_layer(self, name, default):
+        """ Add a boolean layer parallel to the data.
+            args:
+                name(str): layer name.
+                default(bool): value of empty cells.
+        """
+        self.layers[name] = np.full(self.data.shape, default, bool)
+        self._layer_defaults[name] = default
+
+    def add_state(self, name):
+        """ Implementation of BaseStorage.add_state, state is kept as a layer.
+        """
+        super(DenseStorage, self).add_state(name)
+        self.add_layer(name, True)
+
+    def sync_track(self, slot):
+        """ Implementation of BaseStorage.sync_track
+        """
+        size = self.contexts.size
+        for name in self.states:
+            self.layers[name][:size, slot] = \
+                self.contexts.columns[name][:size] & self.tracks.columns[name][slot]
+
+    def sync_context(self, slot):
+        """ Implementation of BaseStorage.sync_context
+        """
+        size = self.tracks.size
+        for name in self.states:
+            self.layers[name][slot, :size] = \
+                self.tracks.columns[name][:size] & self.contexts.columns[name][slot]
+
+    def _grow_cells(self, axis, capacity):
+        """ Implementation of BaseStorage._grow_cells
+        """
+        rows, cols = self.data.shape
+        if axis is self.contexts:
+            rows = capacity
+        else:
+            cols = capacity
+
+        for name, default in list(self._arrays()):
+            self._set_array(
+                name, _resized(self._get_array(name), (rows, cols), default)
+            )
+
+    def _clear_cells(self, axis, slot):
+        """ Implementation of BaseStorage._clear_cells
+        """
+        for name, default in self._arrays():
+            self._axis_view(axis, self._get_array(name))[slot] = default
+
+    def _relocate_cells(self, axis, target, source):
+        """ Implementation of BaseStorage._relocate_cells
+        """
+        for name, _ in self._arrays():
+            array = self._axis_view(axis, self._get_array(name))
+            array[target] = array[source]
+
+    def set_cell(self, context, track, cell):
+        index = self.contexts.slots[context], self.tracks.slots[track]
+        self.data[index] = cell
+        self.layers["occupied"][index] = cell is not None
+
+    def set_cells(self, contexts, track, cells):
+        """ Set cells of given contexts on a track in one assignment.
+        """
+        rows = [self.contexts.slots[context] for context in contexts]
+        column = np.empty(len(cells), object)
+        for index, cell in enumerate(cells):
+            column[index] = cell
+
+        slot = self.tracks.slots[track]
+        self.data[rows, slot] = column
+        self.layers["occupied"][rows, slot] = np.not_equal(column, None)
+
+    def get_cell(self, context, track):
+        return self.data[self.contexts.slots[context], self.tracks.slots[track]]
+
+    def track_items(self, track):
+        """ Items of given track in context order.
+        """
+        slot = self.tracks.slots[track]
+        if self.contexts.ordered:
+            return self.data[:self.contexts.size, slot]
+
+        return self.data[self.contexts.order(), slot]
+
+    def context_items(self, context):
+        """ Items of given context in track order.
+        """
+        slot = self.contexts.slots[context]
+        if self.tracks.ordered:
+            return self.data[slot, :self.tracks.size]
+
+        return self.data[slot, self.tracks.order()]
+
+    def track_entries(self, slot):
+        """ Occupied cells of a track.
+            args:
+                slot(int): storage slot of track.
+
+            return: context slots, track slots and cells.
+        """
+        rows = np.flatnonzero(self.layers["occupied"][:self.contexts.size, slot])
+        return rows, np.full(rows.shape[0], slot), self.data[rows, slot]
+
+    def context_entries(self, slot):
+        """ Occupied cells of a context.
+            args:
+                slot(int): storage slot of context.
+
+            return: context slots, track slots and cells.
+        """
+        cols = np.flatnonzero(self.layers["occupied"][slot, :self.tracks.size])
+        return np.full(cols.shape[0], slot), cols, self.data[slot, cols]
+
+    def contexts_with_items(self, slots):
+        """ Storage slots of contexts having an item on any of given tracks.
+            args:
+                slots(int or numpy.ndarray): storage slots of tracks.
+        """
+        occupied = self.layers["occupied"][:self.contexts.size, slots]
+        if occupied.ndim == 2:
+            occupied = occupied.any(axis=1)
+
+        return np.flatnonzero(occupied)
+
+    def state(self, name, rows, cols):
+        """ Implementation of BaseStorage.state
+        """
+        return self.layers[name][rows, cols]
+
+    def block(self, name, rows, cols):
+        """ Data or layer over given context slots x track slots.
+            args:
+                name(str): "data" or layer name.
+                rows(numpy.ndarray): storage slots of contexts.
+                cols(numpy.ndarray): storage slots of tracks.
+        """
+        return self._get_array(name)[np.ix_(rows, cols)]
+
+    def logical(self, name):
+        """ Data or layer of logical contexts x tracks.
+            args:
+                name(str): "data" or layer name.
+        """
+        array = self._get_array(name)
+        if self.contexts.ordered and self.tracks.ordered:
+            return array[:self.contexts.size, :self.tracks.size]
+
+        return array[np.ix_(self.contexts.order(), self.tracks.order())]
+
+
+class TrackCells(object):
+    """ Cells of one track of a sparse storage, context slots of its cells in
+        sorted order with the int32 item id of each cell. Both arrays reserve
+        capacity and grow geometrically, so appending a cell after the last
+        context of the track is amortized O(1).
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._rows = np.zeros(capacity, np.int32)
+        self._ids = np.zeros(capacity, np.int32)
+        self.count = 0
+
+    @property
+    def capacity(self):
+        return self._rows.shape[0]
+
+    @property
+    def rows(self):
+        return self._rows[:self.count]
+
+    @property
+    def ids(self):
+        return self._ids[:self.count]
+
+    @property
+    def nbytes(self):
+        return self._rows.nbytes + self._ids.nbytes
+
+    def _reserve(self, count):
+        """ Make sure count cells fit without growing.
+        """
+        capacity = self.capacity
+        while capacity < count:
+            capacity = max(capacity * GROWTH_FACTOR, DEFAULT_CAPACITY)
+
+        if capacity != self.capacity:
+            self._rows = _resized(self._rows, (capacity,), 0)
+            self._ids = _resized(self._ids, (capacity,), 0)
+
+    def find(self, rows):
+        """ Position of given context slots among cells of the track.
+            args:
+                rows(numpy.ndarray): context slots.
+
+            return: position of each slot and mask of slots having a cell.
+        """
+        positions = np.searchsorted(self.rows, rows)
+        found = np.zeros(positions.shape, bool)
+        inside = positions < self.count
+        found[inside] = self._rows[positions[inside]] == np.asarray(rows)[inside]
+
+        return positions, found
+
+    def span(self, start, stop):
+        """ Positions of cells of context slots from start to stop (exclusive).
+        """
+        return slice(*np.searchsorted(self.rows, [start, stop]).tolist())
+
+    def insert(self, position, row, item_id):
+        """ Insert one cell at given position, following cells shift by one.
+        """
+        self._reserve(self.count + 1)
+        for array, value in ((self._rows, row), (self._ids, item_id)):
+            array[position + 1:self.count + 1] = array[position:self.count]
+            array[position] = value
+
+        self.count += 1
+
+    def delete(self, span):
+        """ Delete cells in given position slice, following cells shift back.
+
+            return: item ids of deleted cells.
+        """
+        ids = self._ids[span].copy()
+        tail = slice(span.stop, self.count)
+        for array in (self._rows, self._ids):
+            array[span.start:span.start + tail.stop - tail.start] = array[tail]
+
+        self.count -= ids.shape[0]
+
+        return ids
+
+    def assign(self, rows, ids):
+        """ Replace every cell of the track, rows are sorted here.
+            args:
+                rows(numpy.ndarray): context slots of cells.
+                ids(numpy.ndarray): item ids of cells.
+        """
+        order = np.argsort(rows, kind="stable")
+        self.count = 0
+        self._reserve(order.shape[0])
+        self.count = order.shape[0]
+        self._rows[:self.count] = np.asarray(rows)[order]
+        self._ids[:self.count] = np.asarray(ids)[order]
+
+
+class SparseStorage(BaseStorage):
+    """ Storage keeping occupied cells only, memory and lookups scale with
+        number of cells instead of contexts x tracks. Cells get an int32 item id
+        and each track keeps its cells as sorted arrays of context slots and item
+        ids, see TrackCells. Cell states are derived from context and track
+        states instead of being stored per cell.
+    """
+    def __init__(self, capacity=(DEFAULT_CAPACITY, DEFAULT_CAPACITY)):
+        super(SparseStorage, self).__init__(capacity)
+        self.items = np.empty(DEFAULT_CAPACITY, object)
+        self._free_ids = []
+        self._item_count = 0
+        # Track slot against TrackCells of tracks having cells.
+        self._tracks = {}
+
+    def _new_ids(self, count):
+        """ Free item ids, item array grows geometrically.
+        """
+        reused = self._free_ids[max(len(self._free_ids) - count, 0):] if count else []
+        del self._free_ids[len(self._free_ids) - len(reused):]
+
+        new = count - len(reused)
+        capacity = self.items.shape[0]
+        while capacity < self._item_count + new:
+            capacity *= GROWTH_FACTOR
+
+        if capacity != self.items.shape[0]:
+            self.items = _resized(self.items, (capacity,), None)
+
+        ids = np.r_[
+            np.array(reused, np.int32),
+            np.arange(self._item_count, self._item_count + new, dtype=np.int32)
+        ]
+        self._item_count += new
+
+        return ids
+
+    def _release(self, item_ids):
+        """ Drop cells of given item ids.
+        """
+        self.items[item_ids] = None
+        self._free_ids.extend(np.asarray(item_ids).tolist())
+
+    def _cell_nbytes(self):
+        """ Implementation of BaseStorage._cell_nbytes
+        """
+        return self.items.nbytes + sum(cells.nbytes for cells in self._tracks.values())
+
+    def _grow_cells(self, axis, capacity):
+        """ Implementation of BaseStorage._grow_cells, nothing is reserved per slot.
+        """
+
+    def _clear_cells(self, axis, slot):
+        """ Implementation of BaseStorage._clear_cells
+        """
+        if isinstance(slot, slice):
+            start, stop, _ = slot.indices(axis.capacity)
+        else:
+            start, stop = slot, slot + 1
+
+        if axis is self.tracks:
+            for _slot in [_slot for _slot in self._tracks if start <= _slot < stop]:
+                self._release(self._tracks.pop(_slot).ids)
+
+            return
+
+        # Cells of consecutive context slots are consecutive in each track.
+        for cells in self._tracks.values():
+            self._release(cells.delete(cells.span(start, stop)))
+
+    def _relocate_cells(self, axis, target, source):
+        """ Implementation of BaseStorage._relocate_cells, context slots of cells
+            are remapped and sorted again.
+        """
+        mapping = np.arange(axis.capacity)
+        mapping[source] = np.arange(axis.capacity)[target]
+        if axis is self.tracks:
+            self._tracks = dict(
+                (int(mapping[slot]), cells) for slot, cells in self._tracks.items()
+            )
+            return
+
+        for cells in self._tracks.values():
+            cells.assign(mapping[cells.rows], cells.ids.copy())
+
+    def _track_cells(self, slot):
+        """ TrackCells of given track slot, an empty one for tracks without cells.
+        """
+        cells = self._tracks.get(slot)
+
+        return TrackCells(0) if cells is None else cells
+
+    def set_cell(self, context, track, cell):
+        row, col = self.contexts.slots[context], self.tracks.slots[track]
+        cells = self._tracks.get(col)
+        if cells is None:
+            if cell is None:
+                return
+
+            cells = self._tracks[col] = TrackCells()
+
+        position = int(np.searchsorted(cells.rows, row))
+        if position < cells.count and cells.rows[position] == row:
+            if cell is None:
+                self._release(cells.delete(slice(position, position + 1)))
+
+            else:
+                self.items[cells.ids[position]] = cell
+
+            return
+
+        if cell is not None:
+            item_id = self._new_ids(1)[0]
+            self.items[item_id] = cell
+            cells.insert(position, row, item_id)
+
+    def set_cells(self, contexts, track, cells):
+        """ Set cells of given contexts on a track, merged into the track at once.
+        """
+        col = self.tracks.slots[track]
+        rows = np.array([self.contexts.slots[context] for context in contexts], np.int32)
+        column = np.empty(len(cells), object)
+        for index, cell in enumerate(cells):
+            column[index] = cell
+
+        # Last cell set on a context wins.
+        rows, last = np.unique(rows[::-1], return_index=True)
+        column = column[::-1][last]
+
+        track_cells = self._tracks.setdefault(col, TrackCells())
+        positions, found = track_cells.find(rows)
+        present = np.not_equal(column, None)
+        self.items[track_cells.ids[positions[found & present]]] = column[found & present]
+
+        removed = found & ~present
+        if removed.any():
+            keep = np.ones(track_cells.count, bool)
+            keep[positions[removed]] = False
+            self._release(track_cells.ids[~keep])
+            track_cells.assign(track_cells.rows[keep], track_cells.ids[keep])
+
+        added = ~found & present
+        if added.any():
+            ids = self._new_ids(int(added.sum()))
+            self.items[ids] = column[added]
+            track_cells.assign(
+                np.r_[track_cells.rows, rows[added]], np.r_[track_cells.ids, ids]
+            )
+
+        if not track_cells.count:
+            del self._tracks[col]
+
+    def get_cell(self, context, track):
+        row, col = self.contexts.slots[context], self.tracks.slots[track]
+        cells = self._track_cells(col)
+        position = int(np.searchsorted(cells.rows, row))
+        if position < cells.count and cells.rows[position] == row:
+            return self.items[cells.ids[position]]
+
+        return None
+
+    def track_items(self, track):
+        """ Items of given track in context order.
+        """
+        items = np.empty(len(self.contexts), object)
+        cells = self._track_cells(self.tracks.slots[track])
+        items[self.positions(self.contexts, cells.rows)] = self.items[cells.ids]
+
+        return items
+
+    def context_items(self, context):
+        """ Items of given context in track order.
+        """
+        items = np.empty(len(self.tracks), object)
+        _, cols, cell_items = self.context_entries(self.contexts.slots[context])
+        items[self.positions(self.tracks, cols)] = cell_items
+
+        return items
+
+    def track_entries(self, slot):
+        """ Occupied cells of a track.
+            args:
+                slot(int): storage slot of track.
+
+            return: context slots, track slots and cells.
+        """
+        cells = self._track_cells(slot)
+        return cells.rows.copy(), np.full(cells.count, slot), self.items[cells.ids]
+
+    def context_entries(self, slot):
+        """ Occupied cells of a context.
+            args:
+                slot(int): storage slot of context.
+
+            return: context slots, track slots and cells.
+        """
+        cols, ids = [], []
+        for col, cells in self._tracks.items():
+            positions, found = cells.find(np.array([slot]))
+            if found[0]:
+                cols.append(col)
+                ids.append(cells.ids[positions[0]])
+
+        return (
+            np.full(len(cols), slot), np.array(cols, np.int64),
+            self.items[np.array(ids, np.int64)]
+        )
+
+    def contexts_with_items(self, slots):
+        """ Storage slots of contexts having an item on any of given tracks.
+            args:
+                slots(int or numpy.ndarray): storage slots of tracks.
+        """
+        return np.unique(np.concatenate([np.zeros(0, np.int32)] + [
+            self._track_cells(slot).rows for slot in np.atleast_1d(slots).tolist()
+        ]))
+
+    def block(self, name, rows, cols):
+        """ Data, "occupied" or a state over given context slots x track slots.
+            Each column is gathered with one binary search of rows in its track.
+            args:
+                name(str): "data", "occupied" or state name.
+                rows(numpy.ndarray): storage slots of contexts.
+                cols(numpy.ndarray): storage slots of tracks.
+        """
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        if name in self.states:
+            return np.outer(
+                self.contexts.columns[name][rows], self.tracks.columns[name][cols]
+            )
+
+        if name == "data":
+            block = np.empty((rows.shape[0], cols.shape[0]), object)
+        else:
+            block = np.zeros((rows.shape[0], cols.shape[0]), bool)
+
+        for index, col in enumerate(cols.tolist()):
+            cells = self._tracks.get(col)
+            if cells is None:
+                continue
+
+            positions, found = cells.find(rows)
+            if name == "data":
+                block[found, index] = self.items[cells.ids[positions[found]]]
+            else:
+                block[found, index] = True
+
+        return block
+
+    def logical(self, name):
+        """ Data, "occupied" or a state of logical contexts x tracks.
+            args:
+                name(str): "data", "occupied" or state name.
+        """
+        return self.block(name, self.contexts.order(), self.tracks.order())
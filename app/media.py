@@ -0,0 +1,51 @@
+from urllib.parse import urlparse, unquote
+
+
+def media_path(item):
+    """ Local file path of the media of an otio item.
+        args:
+            item(otio.core.Item): otio item.
+
+        return: path or None when item has no external media.
+    """
+    media_reference = getattr(item, "media_reference", None)
+    target_url = getattr(media_reference, "target_url", None)
+    if not target_url:
+        return None
+
+    parsed = urlparse(target_url)
+    if parsed.scheme == "file":
+        return unquote(parsed.path)
+
+    if parsed.scheme and len(parsed.scheme) > 1:
+        # Remote urls have no local media, single letters are windows drives.
+        return None
+
+    return target_url
+
+
+def media_range(item):
+    """ Frames of an otio item counted from the start of its media.
+        args:
+            item(otio.core.Item): otio item.
+
+        return: frame rate, first frame, frame count and last frame of media,
+                None when item has no source range.
+    """
+    try:
+        source_range = item.trimmed_range()
+        rate = source_range.start_time.rate
+        available_range = item.media_reference.available_range
+        offset = 0
+        last_frame = source_range.end_time_inclusive().value
+        if available_range is not None:
+            offset = available_range.start_time.value_rescaled_to(rate)
+            last_frame = available_range.end_time_inclusive().value_rescaled_to(rate)
+
+    except Exception:
+        return None
+
+    return (
+        rate, source_range.start_time.value - offset,
+        source_range.duration.value, last_frame - offset
+    )
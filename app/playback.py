@@ -0,0 +1,280 @@
+import numpy as np
+from PySide2 import QtCore
+
+from app import matrix
+
+# The clock is checked this many times per frame.
+TICKS_PER_FRAME = 2
+
+
+class FrameTable(object):
+    """ Lookup table from record frame to the context and items under it. It is
+        built once per matrix revision from the interval index of the matrix, the
+        items of every context are resolved up front so a lookup is a table read.
+    """
+    def __init__(self, timeline_matrix):
+        """ Create new frame table.
+            args:
+                timeline_matrix(matrix.Matrix): matrix to look up.
+        """
+        self.timeline_matrix = timeline_matrix
+        self.revision = timeline_matrix.revision
+        storage = timeline_matrix.storage
+        contexts, tracks = storage.contexts, storage.tracks
+        order = contexts.order()
+        # Record range of every context in logical order.
+        self.starts = contexts.columns["record_start"][order]
+        self.ends = contexts.columns["record_end"][order]
+
+        # Record ranges sorted by start with the storage slot of their context.
+        intervals = timeline_matrix.intervals
+        valid = np.flatnonzero(intervals.ends > intervals.starts)
+        starts, ends = intervals.starts[valid], intervals.ends[valid]
+        slots = np.array([contexts.slots[name] for name in intervals.names[valid]], int)
+        indexes = storage.positions(contexts, slots)
+        if valid.shape[0]:
+            self.first = int(np.floor(starts[0]))
+            self.last = int(np.ceil(ends.max()))
+
+        else:
+            self.first = self.last = 0
+
+        # Logical context index of every frame, -1 for frames between contexts.
+        frames = np.arange(self.first, self.last)
+        below = np.searchsorted(starts, frames, "right") - 1
+        inside = (below >= 0) & (frames < ends[np.maximum(below, 0)])
+        self.contexts = np.where(inside, indexes[np.maximum(below, 0)], -1).astype(np.int32)
+
+        self.empty = dict((kind, None) for kind in matrix.TRACK_KINDS)
+        self.empty.update(context=None, items={})
+
+        # Items of every context with a record range, logical context index
+        # against the result matrix.Matrix.items_at gives for that context.
+        self.results = {}
+        track_order = tracks.order()
+        track_names = tracks.names[track_order]
+        cells = storage.block("data", slots, track_order)
+        occupied = storage.block("occupied", slots, track_order)
+        resolved = dict(
+            (kind, contexts.columns[matrix.resolved_column(kind)][slots])
+            for kind in matrix.TRACK_KINDS
+        )
+        for row, index in enumerate(indexes.tolist()):
+            cols = np.flatnonzero(occupied[row])
+            result = dict(self.empty)
+            result.update(
+                context=contexts.names[slots[row]],
+                items=dict(zip(track_names[cols], cells[row, cols]))
+            )
+            for kind in matrix.TRACK_KINDS:
+                if resolved[kind][row] >= 0:
+                    result[kind] = cells[row, resolved[kind][row]]
+
+            self.results[index] = result
+
+    def __len__(self):
+        return self.last - self.first
+
+    def context_index(self, frame):
+        """ Logical index of context under a frame, -1 if there is none.
+            args:
+                frame(int): record frame.
+        """
+        index = frame - self.first
+        if index < 0 or index >= self.contexts.shape[0]:
+            return -1
+
+        return int(self.contexts[index])
+
+    def lookup(self, frame):
+        """ Items under a frame, like matrix.Matrix.items_at.
+            args:
+                frame(int): record frame.
+        """
+        index = self.context_index(frame)
+        if index < 0:
+            result = dict(self.empty)
+
+        else:
+            result = dict(self.results[index])
+
+        result["frame"] = frame
+
+        return result
+
+    def position(self, frame):
+        """ Position of a frame measured in contexts, inverse of matrix.Matrix.frame_at.
+            args:
+                frame(int): record frame.
+
+            return: position or None if there is no context under frame.
+        """
+        index = self.context_index(frame)
+        if index < 0:
+            return None
+
+        start, end = self.starts[index], self.ends[index]
+
+        return index + (frame - start) / (end - start)
+
+
+class PlaybackSignals(QtCore.QObject):
+
+    # Items under the current frame, like matrix.Matrix.items_at.
+    frame_changed = QtCore.Signal(object)
+    # True when playing, False when paused.
+    state_changed = QtCore.Signal(bool)
+
+    def __init__(self):
+        super(PlaybackSignals, self).__init__()
+
+
+class Playback(QtCore.QObject):
+    """ Transport of a timeline matrix. The current frame is derived from the
+        elapsed time and the timeline rate, so the clock does not drift when
+        ticks are late, and frames skipped by late ticks are counted as dropped.
+    """
+    def __init__(self, timeline_matrix, *args, **kwargs):
+        """ Create new playback.
+            args:
+                timeline_matrix(matrix.Matrix): matrix to play.
+        """
+        super(Playback, self).__init__(*args, **kwargs)
+        self.timeline_matrix = timeline_matrix
+        self.playback_signals = PlaybackSignals()
+        self.loop = False
+        self.frame = None
+        self.dropped_frames = 0
+
+        self._table = None
+        self._clock = QtCore.QElapsedTimer()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+        # Frame at clock start and frames elapsed at the previous tick.
+        self._start_frame = 0
+        self._elapsed_frames = 0
+
+    @property
+    def table(self):
+        """ Frame table of the matrix, rebuilt when the matrix changed.
+        """
+        if self._table is None or self._table.revision != self.timeline_matrix.revision:
+            self._table = FrameTable(self.timeline_matrix)
+
+        return self._table
+
+    @property
+    def playing(self):
+        return self._timer.isActive()
+
+    @property
+    def rate(self):
+        return self.timeline_matrix.rate
+
+    def play(self):
+        """ Play from the current frame, from the first frame at the end.
+        """
+        table = self.table
+        if not len(table):
+            return
+
+        if self.frame is None or not table.first <= self.frame < table.last - 1:
+            self.frame = table.first
+
+        self._start_clock()
+        self._timer.start(max(int(1000.0 / (self.rate * TICKS_PER_FRAME)), 1))
+        self._emit(self.frame)
+        self.playback_signals.state_changed.emit(True)
+
+    def pause(self):
+        """ Stop at the current frame.
+        """
+        if not self.playing:
+            return
+
+        self._timer.stop()
+        self.playback_signals.state_changed.emit(False)
+
+    def toggle(self):
+        """ Play when paused, pause when playing.
+        """
+        if self.playing:
+            self.pause()
+
+        else:
+            self.play()
+
+    def step(self, count=1):
+        """ Pause and move by a number of frames.
+            args:
+                count(int): frames to move, negative to move back.
+        """
+        self.pause()
+        self.seek((self.table.first if self.frame is None else self.frame) + count)
+
+    def seek(self, frame):
+        """ Move to a frame, playing continues from there.
+            args:
+                frame(int): record frame, clamped to the timeline.
+        """
+        table = self.table
+        if not len(table):
+            return
+
+        frame = min(max(int(frame), table.first), table.last - 1)
+        if frame == self.frame:
+            return
+
+        self.frame = frame
+        if self.playing:
+            self._start_clock()
+
+        self._emit(frame)
+
+    def follow(self, frame):
+        """ Move to a frame looked up outside playback, like the scrubbed playhead.
+            Nothing is emitted and the frame table is not needed.
+            args:
+                frame(int): record frame.
+        """
+        self.frame = int(frame)
+        if self.playing:
+            self._start_clock()
+
+    def teardown(self):
+        """ Stop playing and drop the frame table, called when the scene closes.
+        """
+        self.pause()
+        self._table = None
+
+    def _start_clock(self):
+        self._start_frame = self.frame
+        self._elapsed_frames = 0
+        self._clock.start()
+
+    def _tick(self):
+        """ Move to the frame due at the elapsed time, called by the timer.
+        """
+        table = self.table
+        elapsed = int(self._clock.nsecsElapsed() * self.rate / 1e9)
+        if elapsed == self._elapsed_frames:
+            return
+
+        self.dropped_frames += max(elapsed - self._elapsed_frames - 1, 0)
+        self._elapsed_frames = elapsed
+        frame = self._start_frame + elapsed
+        if frame >= table.last:
+            if not self.loop or not len(table):
+                self.frame = table.last - 1
+                self._emit(self.frame)
+                self.pause()
+                return
+
+            frame = table.first + (frame - table.first) % len(table)
+
+        self.frame = frame
+        self._emit(frame)
+
+    def _emit(self, frame):
+        self.playback_signals.frame_changed.emit(self.table.lookup(frame))
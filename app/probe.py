@@ -0,0 +1,252 @@
+import json
+import os
+import subprocess
+from concurrent import futures
+from fractions import Fraction
+
+import opentimelineio as otio
+
+from app import cache, video_item, audio_item
+
+# Frame rate of media without a video stream.
+DEFAULT_RATE = 24.0
+# Number of probes running at the same time.
+MAX_PROBES = 8
+# Seconds ffprobe may take for one file.
+FFPROBE_TIMEOUT = 30
+
+
+def _rate(value):
+    """ Frame rate from a ffprobe rate like "24000/1001", None if invalid.
+    """
+    try:
+        rate = float(Fraction(value))
+
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+
+    return rate or None
+
+
+def ffprobe(path):
+    """ Probe a media file with ffprobe.
+        args:
+            path(str): media path.
+
+        return: dict with "kind", "video" or "audio", "frame_rate", "start_frame",
+                "end_frame" (inclusive) and "has_audio".
+    """
+    output = subprocess.run(
+        [
+            "ffprobe", "-v", "error", "-of", "json",
+            "-show_entries",
+            "stream=codec_type,r_frame_rate,avg_frame_rate,nb_frames,start_time,duration"
+            ":format=duration",
+            path
+        ],
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        timeout=FFPROBE_TIMEOUT, check=True
+    ).stdout
+    info = json.loads(output.decode("utf-8"))
+
+    streams = info.get("streams", [])
+    video = next((stream for stream in streams if stream.get("codec_type") == "video"), None)
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), None)
+    stream = video or audio or {}
+    duration = float(stream.get("duration") or info.get("format", {}).get("duration") or 0)
+
+    rate = DEFAULT_RATE
+    if video:
+        rate = _rate(video.get("r_frame_rate")) or _rate(video.get("avg_frame_rate")) or rate
+
+    frames = str(stream.get("nb_frames", ""))
+    frames = int(frames) if video and frames.isdigit() else int(round(duration * rate))
+    start_frame = int(round(float(stream.get("start_time") or 0) * rate))
+
+    return {
+        "kind": "video" if video else "audio" if audio else None,
+        "frame_rate": rate,
+        "start_frame": start_frame,
+        "end_frame": start_frame + max(frames, 1) - 1,
+        "has_audio": audio is not None,
+    }
+
+
+class FakeProber(object):
+    """ Prober returning given results without running ffprobe, for tests and
+        machines without ffmpeg. Probed paths are recorded in calls.
+    """
+    def __init__(self, results=None, default=None):
+        """ Create new fake prober.
+            args:
+                results(dict): path against probe result.
+                default(dict): probe result of paths missing in results, paths
+                               fail to probe when None.
+        """
+        self.results = dict(results or {})
+        self.default = default
+        self.calls = []
+
+    def __call__(self, path):
+        self.calls.append(path)
+        result = self.results.get(path, self.default)
+        if result is None:
+            raise Exception("Sorry, {} could not be probed.".format(path))
+
+        return dict(result)
+
+
+class MediaProber(object):
+    """ Probe batches of media files concurrently. Results are cached on disk by
+        path, size and modification time, so files are only probed once.
+    """
+    def __init__(self, prober=ffprobe, max_workers=MAX_PROBES):
+        """ Create new media prober.
+            args:
+                prober(callable): called with a media path, returns probe result.
+                max_workers(int): number of probes running at the same time.
+        """
+        self.prober = prober
+        self.max_workers = max_workers
+
+    def _cache_path(self, path):
+        key = cache.cache_key(path)
+        return cache.cache_path("probes", key, ".json") if key else None
+
+    def cached(self, path):
+        """ Cached probe result of a media file, None if it was never probed.
+            args:
+                path(str): media path.
+        """
+        cache_path = self._cache_path(path)
+        if not cache_path or not os.path.exists(cache_path):
+            return None
+
+        with open(cache_path) as cache_file:
+            return json.load(cache_file)
+
+    def _store(self, path, result):
+        cache_path = self._cache_path(path)
+        if not cache_path:
+            return
+
+        def write(temporary):
+            with open(temporary, "w") as cache_file:
+                json.dump(result, cache_file)
+
+        cache.write_atomic(cache_path, write)
+
+    def probe(self, paths, progress=None):
+        """ Probe media files, cached files are not probed again. Probes run
+            concurrently, each one is a ffprobe process.
+            args:
+                paths(list): media paths.
+                progress(callable): called with number of files done and total,
+                                    may raise to stop probing.
+
+            return: dict of path against probe result, None for files which
+                    could not be probed.
+        """
+        results = {}
+        missing = []
+        for path in paths:
+            results[path] = self.cached(path)
+            if results[path] is None:
+                missing.append(path)
+
+        done, total = len(paths) - len(missing), len(paths)
+        if progress:
+            progress(done, total)
+
+        if not missing:
+            return results
+
+        executor = futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        jobs = dict((executor.submit(self.prober, path), path) for path in missing)
+        try:
+            for job in futures.as_completed(jobs):
+                path = jobs[job]
+                try:
+                    results[path] = job.result()
+                    self._store(path, results[path])
+
+                except Exception:
+                    results[path] = None
+
+                done += 1
+                if progress:
+                    progress(done, total)
+
+        finally:
+            # Queued probes are dropped when probing stops early.
+            for job in jobs:
+                job.cancel()
+
+            executor.shutdown(wait=False)
+
+        return results
+
+
+def media_items(paths, prober=None, progress=None):
+    """ Video and audio items of media files filled from probe results, files
+        which could not be probed are left out.
+        args:
+            paths(list): media paths.
+            prober(MediaProber): prober to use, a new one when None.
+            progress(callable): called with number of files done and total.
+
+        return: list of video_item.VideoItem and audio_item.AudioItem.
+    """
+    results = (prober or MediaProber()).probe(paths, progress)
+    items = []
+    for path in paths:
+        result = results.get(path)
+        if not result or not result.get("kind"):
+            continue
+
+        if result["kind"] == "video":
+            items.append(video_item.VideoItem(path, result))
+
+        else:
+            items.append(audio_item.AudioItem(path, result))
+
+    return items
+
+
+def timeline_from_items(items, name="Clips"):
+    """ Timeline with one clip per media item, a video track with the videos
+        and an audio track with the audio files, in given order.
+        args:
+            items(list): video_item.VideoItem and audio_item.AudioItem.
+            name(str): timeline name.
+
+        return: otio.schema.Timeline
+    """
+    timeline = otio.schema.Timeline(name=name)
+    video_track = otio.schema.Track(kind=otio.schema.TrackKind.Video)
+    audio_track = otio.schema.Track(kind=otio.schema.TrackKind.Audio)
+    for item in items:
+        available_range = otio.opentime.TimeRange(
+            otio.opentime.RationalTime(item.start_frame, item.frame_rate),
+            otio.opentime.RationalTime(
+                item.end_frame - item.start_frame + 1, item.frame_rate
+            )
+        )
+        clip = otio.schema.Clip(
+            name=item.name,
+            media_reference=otio.schema.ExternalReference(
+                target_url=item.media_reference, available_range=available_range
+            ),
+            source_range=available_range
+        )
+        if isinstance(item, video_item.VideoItem):
+            video_track.append(clip)
+
+        else:
+            audio_track.append(clip)
+
+    for track in (video_track, audio_track):
+        if len(track):
+            timeline.tracks.append(track)
+
+    return timeline
@@ -0,0 +1,37 @@
+import numpy as np
+
+
+def topmost(mask):
+    """ Index of the last True entry of each row, -1 for rows without any.
+        args:
+            mask(numpy.ndarray): boolean array of contexts x tracks.
+
+        return: numpy.ndarray of int32.
+    """
+    contexts, tracks = mask.shape
+    if not tracks:
+        return np.full(contexts, -1, np.int32)
+
+    top = tracks - 1 - np.argmax(mask[:, ::-1], axis=1)
+
+    return np.where(mask.any(axis=1), top, -1).astype(np.int32)
+
+
+def resolve(occupied, enabled, kinds, track_kinds):
+    """ Topmost visible track of each kind for every context. Tracks are in
+        logical order, later tracks are on top of earlier ones.
+        args:
+            occupied(numpy.ndarray): boolean contexts x tracks, True where a cell is present.
+            enabled(numpy.ndarray): boolean contexts x tracks or per track, True where visible.
+            kinds(numpy.ndarray): kind code of each track.
+            track_kinds(tuple): kind names, position in tuple is the kind code.
+
+        return: dict of kind name against int32 array of track index per context,
+                -1 where nothing is resolved.
+    """
+    visible = occupied & enabled
+
+    return dict(
+        (kind, topmost(visible & (kinds == code)))
+        for code, kind in enumerate(track_kinds)
+    )
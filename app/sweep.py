@@ -0,0 +1,60 @@
+import numpy as np
+
+# Record times are rounded to this many decimals before boundaries are compared.
+TIME_DECIMALS = 6
+
+
+def sweep(starts, ends):
+    """ Derive contexts from the union of clip boundaries. Every interval between
+        two neighbouring boundaries which is covered by at least one clip becomes
+        a context.
+        args:
+            starts(numpy.ndarray): record start of every clip.
+            ends(numpy.ndarray): record end (exclusive) of every clip.
+
+        return: context_starts, context_ends, first and last (exclusive) context
+                index of every clip.
+    """
+    starts = np.round(np.asarray(starts, float), TIME_DECIMALS)
+    ends = np.round(np.asarray(ends, float), TIME_DECIMALS)
+    boundaries = np.unique(np.concatenate((starts, ends)))
+    if boundaries.shape[0] < 2:
+        empty = np.zeros(0, float)
+        return empty, empty, np.zeros(starts.shape[0], int), np.zeros(starts.shape[0], int)
+
+    first = np.searchsorted(boundaries, starts)
+    last = np.searchsorted(boundaries, ends)
+
+    # Number of clips covering each interval.
+    count = boundaries.shape[0]
+    cover = np.cumsum(
+        np.bincount(first, minlength=count) - np.bincount(last, minlength=count)
+    )[:-1]
+    covered = cover > 0
+    context_index = np.cumsum(covered) - 1
+
+    spanned = last > first
+    first_context = np.where(spanned, context_index[np.minimum(first, count - 2)], 0)
+    last_context = np.where(spanned, context_index[np.maximum(last, 1) - 1] + 1, 0)
+
+    return (
+        boundaries[:-1][covered],
+        boundaries[1:][covered],
+        first_context,
+        last_context
+    )
+
+
+def expand(first, last):
+    """ Context index of every clip context pair.
+        args:
+            first(numpy.ndarray): first context index of every clip.
+            last(numpy.ndarray): last (exclusive) context index of every clip.
+
+        return: clip index and context index arrays.
+    """
+    spans = last - first
+    clips = np.repeat(np.arange(spans.shape[0]), spans)
+    offsets = np.arange(clips.shape[0]) - np.repeat(np.cumsum(spans) - spans, spans)
+
+    return clips, first[clips] + offsets
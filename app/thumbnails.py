@@ -0,0 +1,155 @@
+import os
+import subprocess
+
+from PySide2 import QtGui, QtCore
+
+from app import cache
+
+THUMBNAIL_WIDTH = 106
+THUMBNAIL_HEIGHT = 80
+# Number of thumbnails generated at the same time.
+MAX_JOBS = max(2, min(4, QtCore.QThread.idealThreadCount()))
+# Number of decoded pixmaps kept in memory.
+PIXMAP_CAPACITY = 512
+# Seconds ffmpeg may take for one thumbnail.
+FFMPEG_TIMEOUT = 30
+
+
+def ffmpeg_thumbnail(path, output):
+    """ Write first frame of a video as png with ffmpeg.
+        args:
+            path(str): video path.
+            output(str): png path.
+    """
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y", "-i", path, "-ss", "00:00:00.000",
+            "-vframes", "1", "-s", "{}x{}".format(THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT),
+            output
+        ],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        timeout=FFMPEG_TIMEOUT, check=True
+    )
+
+
+class ThumbnailJobSignals(QtCore.QObject):
+
+    # Media path, cache key and QtGui.QImage, null image when generation failed.
+    finished = QtCore.Signal(str, str, object)
+
+    def __init__(self):
+        super(ThumbnailJobSignals, self).__init__()
+
+
+class ThumbnailJob(QtCore.QRunnable):
+    """ Generate a thumbnail into the cache, unless it is already there, and
+        decode it on a worker thread.
+    """
+    def __init__(self, path, key, generator, job_signals, cache_name="thumbnails"):
+        super(ThumbnailJob, self).__init__()
+        self.path = path
+        self.key = key
+        self.generator = generator
+        self.job_signals = job_signals
+        self.cache_name = cache_name
+
+    def run(self):
+        """ Overriding run of QtCore.QRunnable.
+        """
+        output = cache.cache_path(self.cache_name, self.key, ".png")
+        image = QtGui.QImage()
+        try:
+            if not os.path.exists(output):
+                cache.write_atomic(output, lambda path: self.generator(self.path, path))
+
+            image = QtGui.QImage(output)
+
+        except Exception:
+            pass
+
+        self.job_signals.finished.emit(self.path, self.key, image)
+
+
+class ThumbnailService(QtCore.QObject):
+    """ Thumbnails of media files. Thumbnails are generated on a bounded thread
+        pool into a cache keyed by path, size and modification time, decoded
+        pixmaps are kept in a LRU. Callers request a thumbnail again until it is
+        available.
+    """
+    def __init__(self, generator=ffmpeg_thumbnail, max_jobs=MAX_JOBS, *args, **kwargs):
+        """ Create new thumbnail service.
+            args:
+                generator(callable): called with media path and output png path.
+                max_jobs(int): number of thumbnails generated at the same time.
+        """
+        super(ThumbnailService, self).__init__(*args, **kwargs)
+        self.generator = generator
+        self.thread_pool = QtCore.QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(max_jobs)
+        self.pixmaps = cache.LRUCache(PIXMAP_CAPACITY)
+        # Media path against cache key, files are only stat'ed once.
+        self._keys = {}
+        self._pending = set()
+        self._failed = set()
+
+        self._job_signals = ThumbnailJobSignals()
+        self._job_signals.finished.connect(self._job_finished)
+
+    def _key(self, path):
+        if path not in self._keys:
+            self._keys[path] = cache.cache_key(
+                path, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT
+            )
+
+        return self._keys[path]
+
+    def request(self, path):
+        """ Thumbnail of a media file. When it is not in memory a job is queued
+            and the thumbnail is returned by a later request once it is done.
+            args:
+                path(str): media path.
+
+            return: QtGui.QPixmap or None if not available yet.
+        """
+        key = self._key(path)
+        if key is None:
+            return None
+
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None or key in self._pending or key in self._failed:
+            return pixmap
+
+        self._pending.add(key)
+        self.thread_pool.start(
+            ThumbnailJob(path, key, self.generator, self._job_signals)
+        )
+
+        return None
+
+    def _job_finished(self, path, key, image):
+        """ Convert decoded image to a pixmap on the GUI thread.
+        """
+        self._pending.discard(key)
+        if image.isNull():
+            self._failed.add(key)
+            return
+
+        self.pixmaps.put(key, QtGui.QPixmap.fromImage(image))
+
+    def wait(self):
+        """ Wait for queued jobs, results are delivered by the event loop.
+        """
+        self.thread_pool.waitForDone()
+
+
+_service = None
+
+
+def thumbnail_service():
+    """ Thumbnail service shared by all scenes, created on first use.
+    """
+    global _service
+    if _service is None:
+        _service = ThumbnailService()
+
+    return _service
@@ -1,27 +1,37 @@
 import os
-import sys
-import subprocess
 
-from app import timeline_base_item
+from app import timeline_base_item, thumbnails
 
 class VideoItem(timeline_base_item.TimelineBaseItem):
-    def __init__(self, media_path):
+    def __init__(self, media_path, probe=None):
+        """ Create new video item.
+            args:
+                media_path(str): video path.
+                probe(dict): probe result of video from probe.MediaProber.
+        """
         super(VideoItem, self).__init__()
         self.media_reference = media_path
         self.name = os.path.basename(
             self.media_reference
         )
-        self.get_thumpnail()
+        self.probe = probe or {}
+        # Requested on first use, items may be created off the GUI thread.
+        self._thumbnail = None
         self.get_start_frame()
         self.get_end_frame()
         self.get_frame_rate()
         self.media_on_disk = True
         self.is_non_vfx = False
-        self.has_audio = False
+        self.has_audio = self.probe.get("has_audio", False)
 
 
     @property
     def thumbnail(self):
+        """ Thumbnail pixmap, None until it is generated in background.
+        """
+        if self._thumbnail is None:
+            self._thumbnail = thumbnails.thumbnail_service().request(self.media_reference)
+
         return self._thumbnail
 
     @thumbnail.setter
@@ -29,23 +39,10 @@ class VideoItem(timeline_base_item.TimelineBaseItem):
         self._thumbnail = value
 
     def get_thumpnail(self):
-        """ Get thumbnail of video.
+        """ Request thumbnail of video. It is generated in background into the
+            thumbnail cache, never next to the media.
         """
-        _thumbnail_path = os.path.join(
-            os.path.dirname(
-                self.media_reference
-            ), 
-            "thumbnail_{}.png".format(
-                os.path.splitext(
-                    os.path.basename(
-                        self.media_reference
-                    )
-                )[0], 
-            )
-        )
-        self.thumbnail = _thumbnail_path
-        if not  os.path.exists(_thumbnail_path):
-            subprocess.call(['ffmpeg', '-i', self.media_reference, '-ss', '00:00:00.000', '-vframes', '1', '-s', '106x80', _thumbnail_path])
+        self.thumbnail = thumbnails.thumbnail_service().request(self.media_reference)
 
     @property
     def frame_rate(self):
@@ -58,8 +55,7 @@ class VideoItem(timeline_base_item.TimelineBaseItem):
     def get_frame_rate(self):
         """ Get framae rate of video.
         """
-        # TODO : Need to implement.
-        self.frame_rate = 24.0
+        self.frame_rate = self.probe.get("frame_rate", 24.0)
 
     @property
     def start_frame(self):
@@ -72,8 +68,7 @@ class VideoItem(timeline_base_item.TimelineBaseItem):
     def get_start_frame(self):
         """ Get start frame of video.
         """
-        # TODO : Need to implement.
-        self.start_frame = 0
+        self.start_frame = self.probe.get("start_frame", 0)
 
     @property
     def end_frame(self):
@@ -86,5 +81,4 @@ class VideoItem(timeline_base_item.TimelineBaseItem):
     def get_end_frame(self):
         """Get end_frame of video.
         """
-        # TODO : Need to implement.
-        self.end_frame = 50
+        self.end_frame = self.probe.get("end_frame", 50)
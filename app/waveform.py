@@ -0,0 +1,358 @@
+import json
+import math
+import os
+import wave
+
+import numpy as np
+from PySide2 import QtCore
+
+from app import cache, thumbnails
+
+# Samples in one peak of level 0.
+BASE_SAMPLES = 128
+# Peaks of a level merged into one peak of the next level.
+LEVEL_FACTOR = 4
+# Levels are added until a level has at most this many peaks.
+MIN_PEAKS = 256
+# Samples read from the audio file at once.
+CHUNK_SAMPLES = BASE_SAMPLES * 4096
+# Number of opened peak files kept in memory.
+PEAKS_CAPACITY = 64
+# Columns of a peak array.
+MIN, MAX, RMS = range(3)
+
+
+def _read_samples(audio, count):
+    """ Read samples of a wave file as float32 between -1 and 1.
+        args:
+            audio(wave.Wave_read): opened wave file.
+            count(int): number of samples to read.
+
+        return: numpy.ndarray of samples x channels.
+    """
+    width = audio.getsampwidth()
+    data = np.frombuffer(audio.readframes(count), np.uint8)
+    if width == 1:
+        samples = (data.astype(np.float32) - 128.0) / 128.0
+
+    elif width == 3:
+        data = data.reshape(-1, 3).astype(np.int32)
+        values = data[:, 0] | (data[:, 1] << 8) | (data[:, 2] << 16)
+        samples = np.where(values & 0x800000, values - 0x1000000, values) / float(1 << 23)
+
+    elif width in (2, 4):
+        dtype = np.dtype("<i{}".format(width))
+        samples = data.view(dtype) / float(1 << (8 * width - 1))
+
+    else:
+        raise Exception("Sorry, {} byte samples are not supported.".format(width))
+
+    return samples.astype(np.float32).reshape(-1, audio.getnchannels())
+
+
+def _reduce(mins, maxs, squares, size):
+    """ Peaks of consecutive blocks of given size, last block may be shorter.
+        args:
+            mins(numpy.ndarray): minimum of each entry.
+            maxs(numpy.ndarray): maximum of each entry.
+            squares(numpy.ndarray): mean square of each entry.
+            size(int): entries in a block.
+
+        return: numpy.ndarray of blocks x (min, max, rms).
+    """
+    edges = np.arange(0, mins.shape[0], size)
+    counts = np.diff(np.append(edges, mins.shape[0]))
+    peaks = np.empty((edges.shape[0], 3), np.float32)
+    peaks[:, MIN] = np.minimum.reduceat(mins, edges)
+    peaks[:, MAX] = np.maximum.reduceat(maxs, edges)
+    peaks[:, RMS] = np.sqrt(np.add.reduceat(squares, edges) / counts)
+
+    return peaks
+
+
+def _level_path(key, level):
+    return cache.cache_path("waveforms", "{}_{}".format(key, level), ".npy")
+
+
+def _info_path(key):
+    return cache.cache_path("waveforms", key, ".json")
+
+
+def level_count(samples):
+    """ Number of levels of an audio file with given number of samples.
+    """
+    peaks = int(math.ceil(samples / float(BASE_SAMPLES)))
+    levels = 1
+    while peaks > MIN_PEAKS:
+        peaks = int(math.ceil(peaks / float(LEVEL_FACTOR)))
+        levels += 1
+
+    return levels
+
+
+def _write_level(path, source):
+    """ Write the level above given peaks, reduced by LEVEL_FACTOR chunk by chunk.
+        args:
+            path(str): output .npy path.
+            source(numpy.ndarray): peaks of the level below, usually memory mapped.
+    """
+    size = int(math.ceil(source.shape[0] / float(LEVEL_FACTOR)))
+    peaks = np.lib.format.open_memmap(path, "w+", np.float32, (size, 3))
+    step = CHUNK_SAMPLES // BASE_SAMPLES * LEVEL_FACTOR
+    for start in range(0, source.shape[0], step):
+        chunk = np.asarray(source[start:start + step])
+        chunk = _reduce(
+            chunk[:, MIN], chunk[:, MAX], np.square(chunk[:, RMS]), LEVEL_FACTOR
+        )
+        peaks[start // LEVEL_FACTOR:start // LEVEL_FACTOR + chunk.shape[0]] = chunk
+
+    peaks.flush()
+    del peaks
+
+
+def compute_peaks(path, key):
+    """ Stream a wave file in chunks and write its peak levels to the cache.
+        Memory use does not depend on the length of the file.
+        args:
+            path(str): wave file path.
+            key(str): cache key of file.
+
+        return: WaveformPeaks
+    """
+    audio = wave.open(path, "rb")
+    try:
+        sample_rate = audio.getframerate()
+        samples = audio.getnframes()
+        count = max(int(math.ceil(samples / float(BASE_SAMPLES))), 1)
+
+        def write_base(temporary):
+            peaks = np.lib.format.open_memmap(temporary, "w+", np.float32, (count, 3))
+            done = 0
+            while True:
+                chunk = _read_samples(audio, CHUNK_SAMPLES)
+                if not chunk.shape[0]:
+                    break
+
+                chunk = _reduce(
+                    chunk.min(axis=1), chunk.max(axis=1),
+                    np.square(chunk).mean(axis=1), BASE_SAMPLES
+                )[:count - done]
+                peaks[done:done + chunk.shape[0]] = chunk
+                done += chunk.shape[0]
+
+            peaks.flush()
+            del peaks
+
+        cache.write_atomic(_level_path(key, 0), write_base)
+
+    finally:
+        audio.close()
+
+    levels = level_count(samples)
+    for level in range(1, levels):
+        source = np.load(_level_path(key, level - 1), mmap_mode="r")
+        cache.write_atomic(
+            _level_path(key, level), lambda temporary: _write_level(temporary, source)
+        )
+
+    def write_info(temporary):
+        with open(temporary, "w") as info_file:
+            json.dump({"sample_rate": sample_rate, "samples": samples, "levels": levels}, info_file)
+
+    # Info is written last, peaks are only used once every level is complete.
+    cache.write_atomic(_info_path(key), write_info)
+
+    return WaveformPeaks.open(key)
+
+
+class WaveformPeaks(object):
+    """ Min, max and RMS peaks of an audio file at several levels, level n has
+        one peak every BASE_SAMPLES * LEVEL_FACTOR ** n samples. Levels are
+        memory mapped, only peaks which are painted are read from disk.
+    """
+    def __init__(self, sample_rate, samples, levels):
+        """ Create new waveform peaks.
+            args:
+                sample_rate(int): samples per second.
+                samples(int): number of samples of audio file.
+                levels(list): numpy.ndarray of peaks x (min, max, rms) of each level.
+        """
+        self.sample_rate = sample_rate
+        self.samples = samples
+        self.levels = levels
+
+    @classmethod
+    def open(cls, key):
+        """ Open cached peaks of an audio file.
+            args:
+                key(str): cache key of file.
+
+            return: WaveformPeaks, None if peaks are not cached.
+        """
+        info_path = _info_path(key)
+        if not os.path.exists(info_path):
+            return None
+
+        with open(info_path) as info_file:
+            info = json.load(info_file)
+
+        levels = [
+            np.load(_level_path(key, level), mmap_mode="r")
+            for level in range(info["levels"])
+        ]
+        return cls(info["sample_rate"], info["samples"], levels)
+
+    def level_for(self, samples_per_pixel):
+        """ Coarsest level which still has a peak for every pixel.
+            args:
+                samples_per_pixel(float): samples in one pixel.
+        """
+        level = 0
+        while (
+            level + 1 < len(self.levels) and
+            BASE_SAMPLES * LEVEL_FACTOR ** (level + 1) <= samples_per_pixel
+        ):
+            level += 1
+
+        return level
+
+    def peaks(self, start, end, count):
+        """ Peaks of a sample range split in equal columns.
+            args:
+                start(float): first sample.
+                end(float): end sample (exclusive).
+                count(int): number of columns.
+
+            return: numpy.ndarray of columns x (min, max, rms), empty when range
+                    is outside audio.
+        """
+        if count <= 0 or end <= start:
+            return np.zeros((0, 3), np.float32)
+
+        level = self.level_for((end - start) / float(count))
+        step = BASE_SAMPLES * LEVEL_FACTOR ** level
+        data = self.levels[level]
+        first = max(int(start // step), 0)
+        last = min(int(math.ceil(end / float(step))), data.shape[0])
+        if first >= last:
+            return np.zeros((0, 3), np.float32)
+
+        chunk = np.asarray(data[first:last])
+        # First peak of each column, columns narrower than a peak repeat it.
+        edges = (start + np.arange(count) * ((end - start) / float(count))) // step
+        edges = np.clip(edges.astype(np.int64) - first, 0, chunk.shape[0] - 1)
+        counts = np.maximum(np.diff(np.append(edges, chunk.shape[0])), 1)
+
+        peaks = np.empty((count, 3), np.float32)
+        peaks[:, MIN] = np.minimum.reduceat(chunk[:, MIN], edges)
+        peaks[:, MAX] = np.maximum.reduceat(chunk[:, MAX], edges)
+        peaks[:, RMS] = np.sqrt(np.add.reduceat(np.square(chunk[:, RMS]), edges) / counts)
+
+        return peaks
+
+
+class WaveformJob(QtCore.QRunnable):
+    """ Compute peaks of an audio file into the cache on a worker thread.
+    """
+    def __init__(self, path, key, job_signals):
+        super(WaveformJob, self).__init__()
+        self.path = path
+        self.key = key
+        self.job_signals = job_signals
+
+    def run(self):
+        """ Overriding run of QtCore.QRunnable.
+        """
+        try:
+            peaks = compute_peaks(self.path, self.key)
+
+        except Exception:
+            peaks = None
+
+        self.job_signals.finished.emit(self.path, self.key, peaks)
+
+
+class WaveformService(QtCore.QObject):
+    """ Waveform peaks of audio files. Peaks are computed on a bounded thread
+        pool into a cache keyed by path, size and modification time, cached
+        peaks are opened without reading the audio again. waveform_ready is
+        emitted when requested peaks are available.
+    """
+    # Media path.
+    waveform_ready = QtCore.Signal(str)
+
+    def __init__(self, max_jobs=thumbnails.MAX_JOBS, *args, **kwargs):
+        """ Create new waveform service.
+            args:
+                max_jobs(int): number of files processed at the same time.
+        """
+        super(WaveformService, self).__init__(*args, **kwargs)
+        self.thread_pool = QtCore.QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(max_jobs)
+        self.opened = cache.LRUCache(PEAKS_CAPACITY)
+        # Media path against cache key, files are only stat'ed once.
+        self._keys = {}
+        self._pending = set()
+        self._failed = set()
+
+        self._job_signals = thumbnails.ThumbnailJobSignals()
+        self._job_signals.finished.connect(self._job_finished)
+
+    def _key(self, path):
+        if path not in self._keys:
+            self._keys[path] = cache.cache_key(path, BASE_SAMPLES, LEVEL_FACTOR)
+
+        return self._keys[path]
+
+    def peaks(self, path):
+        """ Peaks of an audio file. When they are not cached a job is queued
+            and waveform_ready is emitted once it is done.
+            args:
+                path(str): media path.
+
+            return: WaveformPeaks or None if not available yet.
+        """
+        key = self._key(path)
+        if key is None or key in self._pending or key in self._failed:
+            return None
+
+        peaks = self.opened.get(key)
+        if peaks is None:
+            peaks = WaveformPeaks.open(key)
+            if peaks is not None:
+                self.opened.put(key, peaks)
+                return peaks
+
+            self._pending.add(key)
+            self.thread_pool.start(WaveformJob(path, key, self._job_signals))
+
+        return peaks
+
+    def _job_finished(self, path, key, peaks):
+        """ Keep computed peaks, runs on the GUI thread.
+        """
+        self._pending.discard(key)
+        if peaks is None:
+            self._failed.add(key)
+            return
+
+        self.opened.put(key, peaks)
+        self.waveform_ready.emit(path)
+
+    def wait(self):
+        """ Wait for queued jobs, results are delivered by the event loop.
+        """
+        self.thread_pool.waitForDone()
+
+
+_service = None
+
+
+def waveform_service():
+    """ Waveform service shared by all scenes, created on first use.
+    """
+    global _service
+    if _service is None:
+        _service = WaveformService()
+
+    return _service
@@ -0,0 +1,76 @@
+""" Time and peak Python memory of exporting a large conform, memory should stay
+    bounded by one serialized item and not grow with the number of items.
+
+    python benchmarks/export.py [tracks] [clips per track]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import opentimelineio as otio
+
+from app import export, matrix
+
+RationalTime = otio.opentime.RationalTime
+TimeRange = otio.opentime.TimeRange
+
+
+def conform(tracks, clips):
+    """ Stack of tracks alternating video and audio, with clips of varying length.
+    """
+    stack = otio.schema.Stack()
+    for track_index in range(tracks):
+        kind = otio.schema.TrackKind.Video if track_index % 2 == 0 else otio.schema.TrackKind.Audio
+        track = otio.schema.Track(kind=kind)
+        for clip_index in range(clips):
+            name = "clip_{}_{}".format(track_index, clip_index)
+            track.append(otio.schema.Clip(
+                name=name,
+                media_reference=otio.schema.ExternalReference(target_url="/media/{}.mov".format(name)),
+                source_range=TimeRange(
+                    RationalTime(0, 24), RationalTime(10 + (clip_index + track_index) % 7, 24)
+                )
+            ))
+
+        stack.append(track)
+
+    return stack
+
+
+def measure(timeline_matrix, extension, resolved_only=False):
+    """ Seconds, peak traced MB and file MB of one export.
+    """
+    handle, path = tempfile.mkstemp(suffix=extension)
+    os.close(handle)
+    try:
+        tracemalloc.start()
+        start = time.perf_counter()
+        export.export_file(timeline_matrix, path, "benchmark", resolved_only)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return seconds, peak / 2.0 ** 20, os.path.getsize(path) / 2.0 ** 20
+
+    finally:
+        os.remove(path)
+
+
+def main(tracks=20, clips=2000):
+    timeline_matrix = matrix.Matrix.from_stack(conform(tracks, clips))
+    print("{} tracks x {} clips".format(tracks, clips))
+    for name, extension, resolved_only in (
+        ("otio", ".otio", False), ("otio resolved", ".otio", True), ("edl", ".edl", True)
+    ):
+        seconds, peak, size = measure(timeline_matrix, extension, resolved_only)
+        print("{:<14} {:6.2f} s  peak {:6.1f} MB  file {:6.1f} MB".format(
+            name, seconds, peak, size
+        ))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,87 @@
+""" Startup time of the console, from process start to window shown and to
+    timeline ready. Every run is a new process so imports are cold. Lazy startup
+    is compared with an eager baseline, which imports the timeline stack and
+    discovers otio adapters up front and builds the timeline before the window
+    is shown, like the console did before startup was made lazy.
+
+    python benchmarks/startup.py [runs]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a child process, prints milliseconds to window shown and to timeline ready.
+CHILD = """
+import time
+start = time.perf_counter()
+import sys
+sys.path.insert(0, {root!r})
+from PySide2 import QtCore, QtWidgets
+app = QtWidgets.QApplication([])
+import console
+
+if {eager!r}:
+    import timeline
+    timeline.supported_formats()
+
+    class Console(console.TimelineConsole):
+        def setup_ui(self):
+            super(Console, self).setup_ui()
+            self.setup_timeline()
+
+else:
+    Console = console.TimelineConsole
+
+window = Console()
+shown = time.perf_counter()
+
+def ready():
+    print((shown - start) * 1000, (time.perf_counter() - start) * 1000)
+    app.quit()
+
+# Queued after the timeline setup of the console.
+QtCore.QTimer.singleShot(0, ready)
+app.exec_()
+"""
+
+
+def run_once(eager=False):
+    """ Milliseconds to window shown and to timeline ready of one cold start.
+        args:
+            eager(bool): start like the eager baseline.
+    """
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    output = subprocess.check_output(
+        [sys.executable, "-c", CHILD.format(root=ROOT, eager=eager)], env=env, cwd=ROOT
+    )
+    shown, ready = output.split()[-2:]
+
+    return float(shown), float(ready)
+
+
+def _median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def main(runs=5):
+    # Modes alternate so both see the same disk cache and machine load.
+    results = {True: [], False: []}
+    for _ in range(runs):
+        for eager in (True, False):
+            results[eager].append(run_once(eager))
+
+    print("{:<15} {:>14} {:>14} {:>8}".format("median of {}".format(runs), "eager", "lazy", "change"))
+    for name, index in (("window shown", 0), ("timeline ready", 1)):
+        eager, lazy = (
+            _median([result[index] for result in results[mode]]) for mode in (True, False)
+        )
+        print("{:<15} {:>11.1f} ms {:>11.1f} ms {:>7.0f}%".format(
+            name, eager, lazy, (lazy - eager) / eager * 100
+        ))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
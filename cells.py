@@ -1,8 +1,9 @@
-from abc import ABCMeta, abstractmethod
+import math
 
+import numpy as np
 from PySide2 import QtGui, QtCore, QtWidgets
 
-from app import video_item, audio_item, data_item, context_item
+from app import video_item, audio_item, data_item, context_item, filmstrip, media, waveform
 import icon_items
 
 VIDEO_CELL_HEIGHT = 80
@@ -10,6 +11,28 @@ AUDIO_CELL_HEIGHT = 50
 DATA_CELL_HEIGHT = 40
 CONTEXT_CELL_HEIGHT = 40
 CELL_WIDTH = 200
+# Width against height of filmstrip frames.
+FILMSTRIP_ASPECT = filmstrip.FRAME_WIDTH / float(filmstrip.FRAME_HEIGHT)
+
+# Enabled and disabled color of cells of each kind.
+CELL_COLORS = {
+    "video" : ((200, 255, 150, 255), (129, 163, 96, 255)),
+    "audio" : ((175, 215, 255, 255), (108, 135, 161, 255)),
+    "data" : ((170, 170, 170, 255), (190, 190, 190, 255)),
+    "context" : ((170, 170, 170, 255), (190, 190, 190, 255)),
+}
+
+# Brushes shared by all cells, disabled and enabled brush of each kind.
+CELL_BRUSHES = dict(
+    (kind, (QtGui.QBrush(QtGui.QColor(*disabled)), QtGui.QBrush(QtGui.QColor(*enabled))))
+    for kind, (enabled, disabled) in CELL_COLORS.items()
+)
+CELL_PEN = QtGui.QPen()
+CELL_PEN.setCosmetic(True)
+WAVEFORM_PEN = QtGui.QPen(QtGui.QColor(40, 70, 110))
+WAVEFORM_PEN.setCosmetic(True)
+WAVEFORM_RMS_PEN = QtGui.QPen(QtGui.QColor(90, 130, 190))
+WAVEFORM_RMS_PEN.setCosmetic(True)
 
 class AbstractBaseCell(QtWidgets.QGraphicsRectItem):
     """ Abstract class for cells.
@@ -42,142 +65,254 @@ class AbstractBaseCell(QtWidgets.QGraphicsRectItem):
     def active(self, value):
         self._active = value
 
-    @abstractmethod
+    def set_label(self, text):
+        """ Set label text, label is centered vertically.
+            args:
+                text(str): label text.
+        """
+        self.source_name_label.setText(text)
+        self.source_name_label.setX(20)
+        self.source_name_label.setY(
+            (self.rect().height() -
+              self.source_name_label.boundingRect().height()) / 2.0
+        )
+
+    def set_item(self, item):
+        """ Show given item in cell, cells are reused for other items while scrolling.
+            args:
+                item(otio.core.Item): otio item.
+        """
+        self.item = item
+        self.set_label(item.name)
+
+    def set_state(self, enable, active):
+        """ Set state without repainting. Used to restyle many cells at once, the
+            caller updates the region of all of them with a single scene update.
+            args:
+                enable(bool): enable state.
+                active(bool): active state.
+        """
+        self._enable = enable
+        self._active = active
+
+    def style_brush(self):
+        """ Shared brush of cell kind and enable state.
+        """
+        return CELL_BRUSHES[self.kind][self._enable]
+
     def disabled_style(self):
-        raise NotImplementedError("Must override disabled_style")
+        """ Repaint cell with disabled brush.
+        """
+        self.update()
 
-    @abstractmethod
     def enabled_style(self):
-        raise NotImplementedError("Must override enabled_style")
+        """ Repaint cell with enabled brush.
+        """
+        self.update()
+
+    def paint(self, painter, option, widget=None):
+        """ Overriding paint of QtWidgets.QGraphicsRectItem. Brush is looked up by
+            state at paint time, so restyling does not allocate or set a brush.
+        """
+        painter.setPen(CELL_PEN)
+        painter.setBrush(self.style_brush())
+        painter.drawRect(self.rect())
+
+    def exposed_rect(self, painter, option, rect):
+        """ Part of rect to paint. Exposed rect may be the whole item, only the
+            part on the device is painted.
+            args:
+                painter(QtGui.QPainter): painter of paint.
+                option(QtWidgets.QStyleOptionGraphicsItem): option of paint.
+                rect(QtCore.QRectF): rect in item coordinates.
+        """
+        exposed = option.exposedRect.intersected(rect)
+        inverse, invertible = painter.worldTransform().inverted()
+        if invertible:
+            device = painter.device()
+            exposed = exposed.intersected(
+                inverse.mapRect(QtCore.QRectF(0, 0, device.width(), device.height()))
+            )
 
+        return exposed
 
 
 class AudioCell(AbstractBaseCell):
     """ Class for audio item.
     """
+    kind = "audio"
+
     def __init__(self, item, *args, **kwargs):
         rect = QtCore.QRectF(0, 0, CELL_WIDTH, AUDIO_CELL_HEIGHT)
         super(AudioCell, self).__init__(rect, *args, **kwargs)
-        self.item = item
         self.enabled_style()
-        self.source_name_label.setText(self.item.name)
-        self.source_name_label.setX(20)
-        self.source_name_label.setY(
-            (rect.height() -
-              self.source_name_label.boundingRect().height()) / 2.0
-        )
+        self.set_item(item)
 
-    def disabled_style(self):
-        """ Implementation of AbstractBaseCell.disabled_style
+    def set_item(self, item):
+        """ Overriding AbstractBaseCell.set_item, waveform source is taken from item.
+            args:
+                item(otio.core.Item): otio item.
         """
-        self.setBrush(
-            QtGui.QBrush(
-                QtGui.QColor(108, 135, 161, 255)
-            )
-        )
-
-    def enabled_style(self):
-        """ Implementation of AbstractBaseCell.enabled_style
+        super(AudioCell, self).set_item(item)
+        # Media path, frame rate, first frame and frame count of item from media
+        # start and last frame of media.
+        self.waveform_source = None
+        path = media.media_path(item)
+        frames = media.media_range(item)
+        if path and frames:
+            self.waveform_source = (path,) + frames
+
+    def paint(self, painter, option, widget=None):
+        """ Overriding AbstractBaseCell.paint, waveform of the item is painted
+            with one peak per pixel from the level matching current zoom.
         """
-        self.setBrush(
-            QtGui.QBrush(
-                QtGui.QColor(175, 215, 255, 255)
-            )
+        super(AudioCell, self).paint(painter, option, widget)
+        if self.waveform_source is None:
+            return
+
+        path, rate, first_frame, frames = self.waveform_source[:4]
+        peaks = waveform.waveform_service().peaks(path)
+        rect = self.rect().adjusted(1, 2, -1, -2)
+        scale = abs(painter.worldTransform().m11())
+        if peaks is None or not scale or frames <= 0:
+            return
+
+        exposed = self.exposed_rect(painter, option, rect)
+        if exposed.isEmpty():
+            return
+
+        # Samples of item per scene unit, one column per pixel.
+        start = first_frame / float(rate) * peaks.sample_rate
+        samples = frames / float(rate) * peaks.sample_rate / rect.width()
+        low = int((exposed.left() - rect.left()) * scale)
+        high = int(math.ceil((exposed.right() - rect.left()) * scale))
+        columns = peaks.peaks(
+            start + low / scale * samples, start + high / scale * samples, high - low
         )
+        if not columns.shape[0]:
+            return
+
+        x = (rect.left() + (np.arange(columns.shape[0]) + low + 0.5) / scale).tolist()
+        center = rect.center().y()
+        half = rect.height() / 2.0
+        tops = (center - columns[:, waveform.MAX] * half).tolist()
+        bottoms = (center - columns[:, waveform.MIN] * half).tolist()
+        rms = (columns[:, waveform.RMS] * half).tolist()
+
+        painter.setPen(WAVEFORM_PEN)
+        painter.drawLines([
+            QtCore.QLineF(_x, top, _x, bottom) for _x, top, bottom in zip(x, tops, bottoms)
+        ])
+        painter.setPen(WAVEFORM_RMS_PEN)
+        painter.drawLines([
+            QtCore.QLineF(_x, center - _rms, _x, center + _rms) for _x, _rms in zip(x, rms)
+        ])
 
 
 class VideoCell(AbstractBaseCell):
     """ Class for video item.
     """
+    kind = "video"
+
     def __init__(self, item, *args, **kwargs):
         rect = QtCore.QRectF( 0, 0, CELL_WIDTH, VIDEO_CELL_HEIGHT)
         super(VideoCell, self).__init__(rect, *args, **kwargs)
-        self.item = item
         self.enabled_style()
-        self.source_name_label.setText(self.item.name)
-        self.source_name_label.setX(20)
-        self.source_name_label.setY(
-            (rect.height() -
-              self.source_name_label.boundingRect().height()) / 2.0
-        )
+        self.set_item(item)
 
-    def disabled_style(self):
-        """ Implementation of AbstractBaseCell.disabled_style
+    def set_item(self, item):
+        """ Overriding AbstractBaseCell.set_item, filmstrip source is taken from item.
+            args:
+                item(otio.core.Item): otio item.
         """
-        self.setBrush(
-            QtGui.QBrush(
-                QtGui.QColor(129, 163, 96, 255)
-            )
-        )
-
-    def enabled_style(self):
-        """ Implementation of AbstractBaseCell.enabled_style
+        super(VideoCell, self).set_item(item)
+        # Media path, frame rate, first frame and frame count of item from media
+        # start and last frame of media.
+        self.filmstrip_source = None
+        path = media.media_path(item)
+        frames = media.media_range(item)
+        if path and frames:
+            self.filmstrip_source = (path,) + frames
+
+    def paint(self, painter, option, widget=None):
+        """ Overriding AbstractBaseCell.paint, a filmstrip of the item is painted
+            with as many frames as fit on screen at current zoom.
         """
-        self.setBrush(
-            QtGui.QBrush(
-                QtGui.QColor(200, 255, 150, 255)
+        super(VideoCell, self).paint(painter, option, widget)
+        if self.filmstrip_source is None:
+            return
+
+        path, rate, first_frame, frames, last_frame = self.filmstrip_source
+        rect = self.rect().adjusted(1, 1, -1, -1)
+        transform = painter.worldTransform()
+        device_height = rect.height() * abs(transform.m22())
+        if device_height < 1 or not transform.m11() or frames <= 0:
+            return
+
+        # Frames keep their aspect on screen, scene width of one frame.
+        slot = device_height * FILMSTRIP_ASPECT / abs(transform.m11())
+        count = int(math.ceil(rect.width() / slot))
+        # Media frames between neighbouring frames on screen.
+        step = frames * slot / rect.width()
+
+        exposed = self.exposed_rect(painter, option, rect)
+        if exposed.isEmpty():
+            return
+
+        low = max(int((exposed.left() - rect.left()) / slot), 0)
+        high = min(int(math.ceil((exposed.right() - rect.left()) / slot)), count)
+        service = filmstrip.filmstrip_service()
+        painter.save()
+        painter.setClipRect(rect)
+        for index in range(low, high):
+            frame = first_frame + (index + 0.5) * step
+            level, tile, column = filmstrip.locate(frame, step)
+            pixmap = service.tile(path, rate, last_frame, level, tile)
+            if pixmap is None:
+                continue
+
+            painter.drawPixmap(
+                QtCore.QRectF(rect.left() + index * slot, rect.top(), slot, rect.height()),
+                pixmap,
+                QtCore.QRectF(
+                    column * filmstrip.FRAME_WIDTH, 0,
+                    filmstrip.FRAME_WIDTH, filmstrip.FRAME_HEIGHT
+                )
             )
-        )
+
+        painter.restore()
 
 
 class DataCell(AbstractBaseCell):
     """ Class for data item.
     """
-    def __init__(self, *args, **kwargs):
+    kind = "data"
+
+    def __init__(self, item, *args, **kwargs):
         rect = QtCore.QRectF(0, 0, CELL_WIDTH, DATA_CELL_HEIGHT)
         super(DataCell, self).__init__(rect, *args, **kwargs)
         self.enabled_style()
-    
-    def disabled_style(self):
-        """ Implementation of AbstractBaseCell.disabled_style
-        """
-        self.setBrush(
-            QtGui.QBrush(
-                QtGui.QColor(190, 190, 190, 255)
-            )
-        )
-
-    def enabled_style(self):
-        """ Implementation of AbstractBaseCell.enabled_style
-        """
-        self.setBrush(
-            QtGui.QBrush(
-                QtGui.QColor(170, 170, 170, 255)
-            )
-        )
+        self.set_item(item)
 
 
 class ContextCell(AbstractBaseCell):
     """ Class for contect item.
     """
+    kind = "context"
+
     def __init__(self, name, *args, **kwargs):
         rect = QtCore.QRectF(0, 0, CELL_WIDTH, CONTEXT_CELL_HEIGHT)
         super(ContextCell, self).__init__(rect, *args, **kwargs)
         self.enabled_style()
-        self.source_name_label.setText(name)
-        self.source_name_label.setX(20)
-        self.source_name_label.setY(
-            (rect.height() -
-              self.source_name_label.boundingRect().height()) / 2.0
-        )
+        self.set_item(name)
 
-    def disabled_style(self):
-        """ Implementation of AbstractBaseCell.disabled_style
+    def set_item(self, name):
+        """ Overriding AbstractBaseCell.set_item, context cells show the context name.
+            args:
+                name(str): context name.
         """
-        self.setBrush(
-            QtGui.QBrush(
-                QtGui.QColor(190, 190, 190, 255)
-            )
-        )
-
-    def enabled_style(self):
-        """ Implementation of AbstractBaseCell.enabled_style
-        """
-        self.setBrush(
-            QtGui.QBrush(
-                QtGui.QColor(170, 170, 170, 255)
-            )
-        )
+        self.item = name
+        self.set_label(name)
 
 class TrackHeaderCell(AbstractBaseCell):
     """ Class for header cell item.
@@ -185,7 +320,6 @@ class TrackHeaderCell(AbstractBaseCell):
     def __init__(self, parent, rect, *args, **kwargs):
         super(TrackHeaderCell, self).__init__(rect, *args, **kwargs)
         self.parent = parent
-        self.rect = rect
         self._track_name = parent.track_name
         self.kind = parent.kind
         self.track_name = "{} Track".format(self._track_name)
@@ -199,7 +333,7 @@ class TrackHeaderCell(AbstractBaseCell):
         self.source_name_label.setText(self.track_name)
         self.source_name_label.setX(20)
         self.source_name_label.setY(
-            (self.rect.height() -
+            (self.rect().height() -
               self.source_name_label.boundingRect().height()) / 2.0
         )
 
@@ -215,7 +349,7 @@ class TrackHeaderCell(AbstractBaseCell):
             mute_icon.connet_to(self.parent.toggle_disable_or_enable_track)
             mute_icon.setX(130)
             mute_icon.setY(
-                (self.rect.height() -
+                (self.rect().height() -
                 self.source_name_label.boundingRect().height()) / 2.0
             )
             mute_icon.show()
@@ -226,7 +360,7 @@ class TrackHeaderCell(AbstractBaseCell):
             hide_icon.connet_to(self.parent.toggle_disable_or_enable_track)
             hide_icon.setX(130)
             hide_icon.setY(
-                (self.rect.height() -
+                (self.rect().height() -
                 self.source_name_label.boundingRect().height()) / 2.0
             )
             hide_icon.show()
@@ -235,7 +369,7 @@ class TrackHeaderCell(AbstractBaseCell):
         lock_icon.connet_to(self.parent.toggle_lock_track)
         lock_icon.setX(150)
         lock_icon.setY(
-            (self.rect.height() -
+            (self.rect().height() -
               self.source_name_label.boundingRect().height()) / 2.0
         )
         lock_icon.show()
@@ -244,20 +378,60 @@ class TrackHeaderCell(AbstractBaseCell):
         delete_icon.connet_to(self.parent.remove_track)
         delete_icon.setX(170)
         delete_icon.setY(
-            (self.rect.height() -
+            (self.rect().height() -
               self.source_name_label.boundingRect().height()) / 2.0
         )
         delete_icon.show()
 
-    def disabled_style(self):
-        """ Implementation of AbstractBaseCell.disabled_style
+    def style_brush(self):
+        """ Overriding AbstractBaseCell.style_brush, header cells use the brush
+            of their track and are never disabled.
         """
-        # No need to implement here. Disable option is not applicable for header items
-        return
+        return self.parent.header_brush
 
-    def enabled_style(self):
-        """ Implementation of AbstractBaseCell.enabled_style
+
+# Cell class of each track kind.
+CELL_TYPES = {
+    "video" : VideoCell,
+    "audio" : AudioCell,
+    "data" : DataCell,
+    "context" : ContextCell,
+}
+
+
+class CellPool(object):
+    """ Cells which are off screen, kept by kind to be reused for other items.
+    """
+    def __init__(self):
+        self._free = dict((kind, []) for kind in CELL_TYPES)
+
+    def __len__(self):
+        return sum(len(free) for free in self._free.values())
+
+    def acquire(self, kind, item):
+        """ Cell of given kind showing given item, a free cell is reused when
+            there is one.
+            args:
+                kind(str): "video", "audio", "data" or "context".
+                item: otio item or context name.
+        """
+        free = self._free[kind]
+        if free:
+            cell = free.pop()
+            cell.set_item(item)
+            return cell
+
+        return CELL_TYPES[kind](item)
+
+    def release(self, cell):
+        """ Give back a cell which is no longer shown.
+            args:
+                cell(AbstractBaseCell): cell removed from scene.
+        """
+        self._free[cell.kind].append(cell)
+
+    def clear(self):
+        """ Drop free cells, along with the items they last showed.
         """
-        self.setBrush(
-            self.parent.header_brush
-        )
\ No newline at end of file
+        for free in self._free.values():
+            del free[:]
@@ -2,7 +2,7 @@ import os
 import sys
 from PySide2 import QtGui, QtCore, QtWidgets
 
-import timeline
+STYLESHEET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stylesheet.css")
 
 class TimelineConsole(QtWidgets.QMainWindow):
     """ Timeline panel main window.
@@ -10,6 +10,7 @@ class TimelineConsole(QtWidgets.QMainWindow):
     def __init__(self):
         super(TimelineConsole, self).__init__()
         self._current_file = None
+        self.timeline = None
 
         self.setup_ui()
         self.show()
@@ -18,17 +19,29 @@ class TimelineConsole(QtWidgets.QMainWindow):
         """ UI setup
         """
         self.setWindowTitle('OpenTimelineIO Viewer')
-        self.setStyleSheet(open('stylesheet.css').read())
+        self.setStyleSheet(open(STYLESHEET).read())
         self.setup_menubar()
 
+        root = QtWidgets.QWidget(parent=self)
+        self._root_layout = QtWidgets.QVBoxLayout(root)
+        self.setCentralWidget(root)
+
+        # Timeline pulls in numpy and opentimelineio, it is created once the
+        # window is shown so that startup does not wait for them.
+        QtCore.QTimer.singleShot(0, self.setup_timeline)
+
+    def setup_timeline(self):
+        """ Timeline widget setup.
+        """
+        if self.timeline is not None:
+            return
+
+        import timeline
+
         self.timeline = timeline.Timeline(
             parent=self
         )
-
-        root = QtWidgets.QWidget(parent=self)
-        layout = QtWidgets.QVBoxLayout(root)
-        layout.addWidget(self.timeline)
-        self.setCentralWidget(root)
+        self._root_layout.addWidget(self.timeline)
 
     def setup_menubar(self):
         """ Menubar setup.
@@ -42,11 +55,19 @@ class TimelineConsole(QtWidgets.QMainWindow):
 
         from_clip_action = QtWidgets.QAction('From Clip', create_new_menu)
         from_clip_action.triggered.connect(self.load_timeline_from_clip)
-        from_clip_action.setEnabled(False)
 
         create_new_menu.addAction(from_file_action)
         create_new_menu.addAction(from_clip_action)
 
+        export_action = QtWidgets.QAction('&Export', file_menu)
+        export_action.triggered.connect(lambda: self.export_timeline())
+
+        export_resolved_action = QtWidgets.QAction('Export &Resolved', file_menu)
+        export_resolved_action.triggered.connect(lambda: self.export_timeline(True))
+
+        file_menu.addAction(export_action)
+        file_menu.addAction(export_resolved_action)
+
         exit_action = QtWidgets.QAction('&Exit', menubar)
         exit_action.setShortcut(QtGui.QKeySequence.Quit)
         exit_action.triggered.connect(self.close)
@@ -61,7 +82,10 @@ class TimelineConsole(QtWidgets.QMainWindow):
         if self._current_file is not None:
             start_folder = os.path.dirname(self._current_file)
 
-        extensions = timeline.supported_formats
+        import timeline
+
+        self.setup_timeline()
+        extensions = timeline.supported_formats()
 
         extensions_string = ' '.join('*.{}'.format(x) for x in extensions)
 
@@ -72,9 +96,41 @@ class TimelineConsole(QtWidgets.QMainWindow):
                 'OTIO ({extensions})'.format(extensions=extensions_string)
             )[0]
 
+        if not path:
+            return
+
         self.timeline.load_timeline(path)
         self._current_file = path
 
+    def export_timeline(self, resolved_only=False):
+        """ Open file browser and export current timeline to an otio or edl file.
+            args:
+                resolved_only(bool): export topmost items only.
+        """
+        if self.timeline is None:
+            return
+
+        start_folder = "/home/{user}".format(user=os.getenv("USER"))
+
+        if self._current_file is not None:
+            start_folder = os.path.dirname(self._current_file)
+
+        path = QtWidgets.QFileDialog.getSaveFileName(
+                self,
+                'Export Timeline',
+                start_folder,
+                'OTIO (*.otio);;EDL (*.edl)'
+            )[0]
+
+        if not path:
+            return
+
+        try:
+            self.timeline.export_timeline(path, resolved_only)
+
+        except Exception as error:
+            QtWidgets.QMessageBox.warning(self, 'Export Timeline', str(error))
+
     def load_timeline_from_clip(self):
         """ Open file browser and load timeline from selected clip(s).
         """
@@ -83,17 +139,23 @@ class TimelineConsole(QtWidgets.QMainWindow):
         if self._current_file is not None:
             start_folder = os.path.dirname(self._current_file)
 
+        self.setup_timeline()
+
         # TODO: Need to handle video_extensions in configuration.
         video_extensions = ("mov", "mp4")
         video_extensions_string = " ".join('*.{}'.format(x) for x in video_extensions)
 
-        _path = QtWidgets.QFileDialog.getOpenFileNames(
+        paths = QtWidgets.QFileDialog.getOpenFileNames(
                 self,
                 'Open Clips',
                 start_folder,
                 'Videos ({video_extensions})'.format(video_extensions=video_extensions_string)
             )[0]
-        return
+        if not paths:
+            return
+
+        self.timeline.load_clips(paths)
+        self._current_file = paths[0]
 
 
 if __name__ == "__main__":
@@ -1,7 +1,63 @@
+import os
 from abc import ABCMeta, abstractmethod
 
 from PySide2 import QtGui, QtCore, QtWidgets
 
+# Icon images live next to this file, so icons load from any working directory.
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+ICON_NAMES = ("audio", "bin", "hide", "lock", "mute", "show", "unlock")
+
+
+class IconAtlas(object):
+    """ Pixmaps of every icon, decoded once per device pixel ratio and shared by
+        all icon items. Toggling an icon swaps shared pixmaps, nothing is read
+        from disk after the first load.
+    """
+    def __init__(self, directory=IMAGES_DIR):
+        self.directory = directory
+        self._pixmaps = {}
+
+    def _load(self, ratio):
+        """ Decode all icons for given device pixel ratio. An "@2x" image is used
+            when present, otherwise the image is scaled to the ratio.
+        """
+        for name in ICON_NAMES:
+            path = os.path.join(self.directory, "{}@2x.png".format(name))
+            if ratio <= 1 or not os.path.exists(path):
+                path = os.path.join(self.directory, "{}.png".format(name))
+
+            image = QtGui.QImage(path)
+            if ratio != 1:
+                size = image.size()
+                if path.endswith("@2x.png"):
+                    size /= 2
+
+                image = image.scaled(
+                    size * ratio,
+                    QtCore.Qt.KeepAspectRatio,
+                    QtCore.Qt.SmoothTransformation
+                )
+                image.setDevicePixelRatio(ratio)
+
+            self._pixmaps[(name, ratio)] = QtGui.QPixmap.fromImage(image)
+
+    def pixmap(self, name, ratio=None):
+        """ Shared pixmap of an icon.
+            args:
+                name(str): icon name, one of ICON_NAMES.
+                ratio(float): device pixel ratio, ratio of application when None.
+        """
+        if ratio is None:
+            ratio = QtGui.QGuiApplication.instance().devicePixelRatio()
+
+        if (name, ratio) not in self._pixmaps:
+            self._load(ratio)
+
+        return self._pixmaps[(name, ratio)]
+
+
+ICON_ATLAS = IconAtlas()
+
 
 class BaseIconItem(QtWidgets.QGraphicsPixmapItem):
     def __init__(self, parent, icon_pixmap, alt=None):
@@ -44,7 +100,9 @@ class HideIconItem(BaseIconItem):
     """ Implementation of Hide/show icon
     """
     def __init__(self, parent):
-        super(HideIconItem, self).__init__(parent, "images/hide.png", "images/show.png")
+        super(HideIconItem, self).__init__(
+            parent, ICON_ATLAS.pixmap("hide"), ICON_ATLAS.pixmap("show")
+        )
 
     def execute_connection(self):
         """ Implimentation of BaseIconItem.execute_connection.
@@ -58,7 +116,9 @@ class MuteIconItem(BaseIconItem):
     """ Implementation of mute/audio icon
     """
     def __init__(self, parent):
-        super(MuteIconItem, self).__init__(parent, "images/mute.png", "images/audio.png")
+        super(MuteIconItem, self).__init__(
+            parent, ICON_ATLAS.pixmap("mute"), ICON_ATLAS.pixmap("audio")
+        )
 
     def execute_connection(self):
         """ Implimentation of BaseIconItem.execute_connection.
@@ -72,7 +132,9 @@ class LockIconItem(BaseIconItem):
     """ Implementation of Lock/unlock icon
     """
     def __init__(self, parent):
-        super(LockIconItem, self).__init__(parent, "images/unlock.png", "images/lock.png")
+        super(LockIconItem, self).__init__(
+            parent, ICON_ATLAS.pixmap("unlock"), ICON_ATLAS.pixmap("lock")
+        )
 
     def execute_connection(self):
         """ Implimentation of BaseIconItem.execute_connection.
@@ -86,7 +148,7 @@ class DeleteIconItem(BaseIconItem):
     """ Implementation of bin icon
     """
     def __init__(self, parent):
-        super(DeleteIconItem, self).__init__(parent, "images/bin.png")
+        super(DeleteIconItem, self).__init__(parent, ICON_ATLAS.pixmap("bin"))
 
     def execute_connection(self):
         """ Implimentation of BaseIconItem.execute_connection.
@@ -4,9 +4,18 @@ SLIDER_HEIGHT = 20
 SLIDER_START = 200
 MARKER_SIZE = 10
 
+class SliderSignals(QtCore.QObject):
+
+    # Playhead position from slider start in pixels.
+    scrub = QtCore.Signal(float)
+
+    def __init__(self):
+        super(SliderSignals, self).__init__()
+
 class Slider(QtWidgets.QGraphicsRectItem):
     def __init__(self, *args, **kwargs):
         super(Slider, self).__init__(*args, **kwargs)
+        self.slider_signals = SliderSignals()
         self.setBrush(QtGui.QBrush(QtGui.QColor(255, 255, 100, 255)))
         pen = QtGui.QPen()
         pen.setWidth(1)
@@ -26,6 +35,7 @@ class Slider(QtWidgets.QGraphicsRectItem):
         # Limiting playhead movement
         if pos.x() >= SLIDER_START and pos.x() <= self.slider_width:
             self._playhead.setX(pos.x() - SLIDER_START)
+            self.slider_signals.scrub.emit(self._playhead.x())
 
     @property
     def slider_width(self):
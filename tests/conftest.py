@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Scenes and views are created without a display.
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """ QApplication shared by every test creating widgets.
+    """
+    from PySide2 import QtWidgets
+
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
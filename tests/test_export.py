@@ -0,0 +1,88 @@
+import io
+
+import opentimelineio as otio
+import pytest
+
+from app import export, matrix
+
+RationalTime = otio.opentime.RationalTime
+TimeRange = otio.opentime.TimeRange
+
+
+def _clip(name, start, duration):
+    return otio.schema.Clip(
+        name=name,
+        media_reference=otio.schema.ExternalReference(target_url="/media/{}.mov".format(name)),
+        source_range=TimeRange(RationalTime(start, 24), RationalTime(duration, 24))
+    )
+
+
+def _gap(duration):
+    return otio.schema.Gap(source_range=TimeRange(RationalTime(0, 24), RationalTime(duration, 24)))
+
+
+def _matrix_with_unranged_context():
+    """ Matrix with a context added by hand, it has no record range.
+    """
+    video = otio.schema.Track(name="V1", kind=otio.schema.TrackKind.Video)
+    video.extend([_clip("a", 100, 10), _gap(5), _clip("b", 0, 20), _gap(5), _clip("c", 50, 10)])
+    timeline_matrix = matrix.Matrix.from_stack(otio.schema.Stack(children=[video]))
+
+    timeline_matrix.add_new_context("by_hand")
+    timeline_matrix.add_cell(_clip("loose", 0, 10), "by_hand", "V1")
+    timeline_matrix.swap_context("by_hand", 1)
+
+    return timeline_matrix
+
+
+def _children(track):
+    return [
+        (type(child).__name__, child.name, child.duration().value) for child in track
+    ]
+
+
+def test_export_otio_skips_contexts_without_range():
+    stream = io.StringIO()
+    export.export_otio(_matrix_with_unranged_context(), stream, "out")
+    exported = otio.adapters.read_from_string(stream.getvalue())
+
+    assert _children(exported.tracks[0]) == [
+        ("Clip", "a", 10), ("Gap", "", 5), ("Clip", "b", 20),
+        ("Gap", "", 5), ("Clip", "c", 10),
+    ]
+
+
+def test_export_resolved_skips_contexts_without_range():
+    stream = io.StringIO()
+    export.export_otio(_matrix_with_unranged_context(), stream, "out", resolved_only=True)
+    exported = otio.adapters.read_from_string(stream.getvalue())
+
+    assert [name for _, name, _ in _children(exported.tracks[0])] == ["a", "", "b", "", "c"]
+
+
+def test_export_edl_skips_contexts_without_range():
+    stream = io.StringIO()
+    export.export_edl(_matrix_with_unranged_context(), stream, "out")
+    events = [line for line in stream.getvalue().splitlines() if line[:3].isdigit()]
+
+    assert len(events) == 3
+    assert "loose" not in stream.getvalue()
+
+
+def test_export_edl_truncates_reel_names():
+    video = otio.schema.Track(name="V1", kind=otio.schema.TrackKind.Video)
+    video.extend([_clip("a_very_long_reel", 0, 10), _clip("short", 0, 10)])
+    stream = io.StringIO()
+    export.export_edl(matrix.Matrix.from_stack(otio.schema.Stack(children=[video])), stream)
+    events = [line for line in stream.getvalue().splitlines() if line[:3].isdigit()]
+
+    assert [event.split()[1] for event in events] == ["a_very_l", "short"]
+    assert len(set(len(event) for event in events)) == 1
+
+
+def test_export_rejects_tracks_of_unknown_kind():
+    timeline_matrix = _matrix_with_unranged_context()
+    timeline_matrix.add_new_track("X1")
+
+    with pytest.raises(Exception, match="unknown kind"):
+        export.export_otio(timeline_matrix, io.StringIO())
@@ -0,0 +1,104 @@
+import opentimelineio as otio
+from PySide2 import QtCore
+
+from app import loader, matrix
+import timeline
+
+
+class ManualLoader(loader.TimelineLoader):
+    """ Loader run on the calling thread when the test asks for it.
+    """
+    def start(self, thread_pool=None):
+        pass
+
+
+def _deleted(widget):
+    deleted = []
+    widget.destroyed.connect(lambda *args: deleted.append(True))
+
+    return deleted
+
+
+def _delete_later():
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+
+
+def test_close_failed_loading_tab(qapp, tmp_path):
+    timeline_widget = timeline.Timeline()
+    timeline_loader = timeline_widget._start_loader(
+        ManualLoader(str(tmp_path / "missing.otio")), "missing"
+    )
+    loading_widget = timeline_widget.currentWidget()
+    deleted = _deleted(loading_widget)
+
+    timeline_loader.run()
+    assert loading_widget.failed
+
+    count = timeline_widget.count()
+    timeline_widget._close_tab(timeline_widget.indexOf(loading_widget))
+    assert timeline_widget.count() == count - 1
+    _delete_later()
+    assert deleted
+
+
+def test_failure_after_loading_tab_closed(qapp, tmp_path):
+    timeline_widget = timeline.Timeline()
+    timeline_loader = timeline_widget._start_loader(
+        ManualLoader(str(tmp_path / "missing.otio")), "missing"
+    )
+    loading_widget = timeline_widget.currentWidget()
+    deleted = _deleted(loading_widget)
+
+    timeline_widget._close_tab(timeline_widget.indexOf(loading_widget))
+    # Read fails before the worker gets to check for cancellation.
+    timeline_loader.run()
+    _delete_later()
+    assert deleted
+
+
+def test_loader_fills_storage(qapp, tmp_path):
+    reel = otio.schema.Timeline(name="reel")
+    for kind in (otio.schema.TrackKind.Video, otio.schema.TrackKind.Audio):
+        track = otio.schema.Track(kind=kind)
+        for index in range(6):
+            track.append(otio.schema.Clip(
+                name="clip_{}".format(index),
+                source_range=otio.opentime.TimeRange(
+                    otio.opentime.RationalTime(0, 24), otio.opentime.RationalTime(4 + index, 24)
+                )
+            ))
+
+        reel.tracks.append(track)
+
+    path = str(tmp_path / "reel.otio")
+    otio.adapters.write_to_file(reel, path)
+    timeline_loader = ManualLoader(path)
+    loaded = []
+    timeline_loader.loader_signals.finished.connect(lambda *args: loaded.append(args))
+    timeline_loader.run()
+    file_contents, layout = loaded[0]
+    storage = layout.storage
+    assert storage is not None
+
+    # Populating only swaps the storage filled by the loader in, once.
+    timeline_matrix = matrix.Matrix()
+    populated = []
+    timeline_matrix.matrix_signals.populated.connect(populated.append)
+    timeline_matrix.populate(file_contents.tracks, layout=layout)
+    assert timeline_matrix.storage is storage
+    assert layout.storage is None
+    assert populated[0][0] == ["V1", "A1"]
+
+    expected = matrix.Matrix.from_stack(file_contents.tracks)
+    assert list(timeline_matrix.get_contexts()) == list(expected.get_contexts())
+    assert list(timeline_matrix.get_tracks()) == list(expected.get_tracks())
+    for track in expected.get_tracks():
+        assert [
+            item and item.name for item in timeline_matrix.get_track_items(track)
+        ] == [item and item.name for item in expected.get_track_items(track)]
+
+    for kind in matrix.TRACK_KINDS:
+        assert (timeline_matrix.resolved[kind] == expected.resolved[kind]).all()
+
+    assert timeline_matrix.items_at(7)["context"] == expected.items_at(7)["context"]
+    assert timeline_matrix.new_track_name("video") == "V2"
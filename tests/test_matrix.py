@@ -0,0 +1,363 @@
+import numpy as np
+import opentimelineio as otio
+import pytest
+
+from app import interval_index, matrix, matrix_storage, resolver, sweep
+
+
+def _fill(storage, contexts, tracks, cells):
+    storage.add_state("enabled")
+    for index in range(contexts):
+        storage.add_context("context_{}".format(index))
+
+    for index in range(tracks):
+        storage.add_track("track_{}".format(index))
+
+    for context, track in cells:
+        storage.set_cell(
+            "context_{}".format(context), "track_{}".format(track), (context, track)
+        )
+
+
+def test_sparse_block_matches_dense():
+    rng = np.random.default_rng(0)
+    cells = list(zip(rng.integers(0, 300, 1500).tolist(), rng.integers(0, 12, 1500).tolist()))
+    dense, sparse = matrix_storage.DenseStorage(), matrix_storage.SparseStorage()
+    for storage in (dense, sparse):
+        _fill(storage, 300, 12, cells)
+
+    rows = rng.choice(300, 40, replace=False)
+    cols = rng.choice(12, 7, replace=False)
+    for name in ("data", "occupied", "enabled"):
+        assert (dense.block(name, rows, cols) == sparse.block(name, rows, cols)).all()
+        assert (dense.logical(name) == sparse.logical(name)).all()
+
+    assert sparse.block("data", rows, np.array([], int)).shape == (40, 0)
+
+    # Removed slots are compacted, moved slots only change logical order.
+    for storage in (dense, sparse):
+        for index in range(300):
+            if index % 3:
+                storage.remove_context("context_{}".format(index))
+
+        storage.remove_track("track_4")
+        storage.move_context("context_297", 0)
+        storage.move_track("track_11", 0)
+
+    assert sparse.contexts.size < 200
+    for name in ("data", "occupied"):
+        assert (dense.logical(name) == sparse.logical(name)).all()
+
+
+def test_sparse_cells_are_sorted_arrays():
+    storage = matrix_storage.SparseStorage()
+    _fill(storage, 0, 1, [])
+    capacities = set()
+    for index in range(4096):
+        storage.add_context("context_{}".format(index))
+        storage.set_cell("context_{}".format(index), "track_0", index)
+        capacities.add(storage._tracks[0].capacity)
+
+    # Appending after the last context of a track only grows its arrays
+    # geometrically, no cell is moved or visited.
+    assert len(capacities) <= np.log2(4096) - np.log2(matrix_storage.DEFAULT_CAPACITY) + 1
+
+    storage.set_cell("context_10", "track_0", None)
+    storage.set_cell("context_10", "track_0", "back")
+    cells = storage._tracks[0]
+    assert cells.rows.dtype == cells.ids.dtype == np.int32
+    assert (np.diff(cells.rows) > 0).all()
+    assert storage.get_cell("context_10", "track_0") == "back"
+
+
+def test_sparse_memory_follows_cells():
+    """ Three cells per context on 32 tracks, like a conform.
+    """
+    rng = np.random.default_rng(0)
+    cells = [
+        (context, track) for context in range(2000)
+        for track in rng.choice(32, 3, replace=False).tolist()
+    ]
+    dense, sparse = matrix_storage.DenseStorage(), matrix_storage.SparseStorage()
+    for storage in (dense, sparse):
+        _fill(storage, 2000, 32, cells)
+
+    assert sparse.nbytes * 4 < dense.nbytes
+    assert sum(track_cells.count for track_cells in sparse._tracks.values()) == len(cells)
+
+
+def _random_matrix(seed, sparse=False, contexts=60, tracks=9, cells=250):
+    """ Matrix with random cells on tracks of every kind.
+    """
+    rng = np.random.default_rng(seed)
+    timeline_matrix = matrix.Matrix(sparse)
+    with timeline_matrix.batch():
+        for index in range(tracks):
+            kind = matrix.TRACK_KINDS[index % len(matrix.TRACK_KINDS)]
+            timeline_matrix.add_new_track(timeline_matrix.new_track_name(kind))
+
+        for index in range(contexts):
+            timeline_matrix.add_new_context("context_{}".format(index))
+
+        track_names = timeline_matrix.get_tracks()
+        for row, col in zip(rng.integers(0, contexts, cells), rng.integers(0, tracks, cells)):
+            timeline_matrix.add_cell((row, col), "context_{}".format(row), track_names[col])
+
+    return timeline_matrix
+
+
+def _brute_resolved(timeline_matrix):
+    """ Topmost enabled track of each kind per context, cell by cell.
+    """
+    cells = timeline_matrix.matrix
+    tracks = list(timeline_matrix.get_tracks())
+    resolved = dict((kind, []) for kind in matrix.TRACK_KINDS)
+    for row in range(cells.shape[0]):
+        for kind in matrix.TRACK_KINDS:
+            top = -1
+            for col, track in enumerate(tracks):
+                if matrix.kind_from_name(track) != kind or cells[row, col] is None:
+                    continue
+
+                if timeline_matrix.cell_states(track, [row])[0][0]:
+                    top = col
+
+            resolved[kind].append(top)
+
+    return resolved
+
+
+def test_topmost():
+    mask = np.array([
+        [True, False, True, False],
+        [False, False, False, False],
+        [False, True, False, False],
+    ])
+    assert resolver.topmost(mask).tolist() == [2, -1, 1]
+    assert resolver.topmost(mask[:, :0]).tolist() == [-1, -1, -1]
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_resolve_matches_brute_force(sparse):
+    timeline_matrix = _random_matrix(0, sparse)
+    tracks, contexts = timeline_matrix.get_tracks(), timeline_matrix.get_contexts()
+    timeline_matrix.disable_track(tracks[4])
+    timeline_matrix.disable_track(tracks[6])
+    timeline_matrix.lock_track(tracks[7])
+    for context in contexts[::7]:
+        timeline_matrix.disable_context(context)
+
+    resolved = timeline_matrix.resolved
+    assert all(resolved[kind].dtype == np.int32 for kind in matrix.TRACK_KINDS)
+    # Locked cells are still resolved, disabled ones are not.
+    expected = _brute_resolved(timeline_matrix)
+    for kind in matrix.TRACK_KINDS:
+        assert resolved[kind].tolist() == expected[kind]
+
+    diff = timeline_matrix.resolve_matrix(full=True)
+    assert not diff["contexts"].shape[0]
+
+
+def test_resolve_only_dirty_contexts(monkeypatch):
+    timeline_matrix = _random_matrix(1)
+    resolved_rows = []
+    resolve = resolver.resolve
+
+    def counting_resolve(occupied, *args):
+        resolved_rows.append(occupied.shape[0])
+        return resolve(occupied, *args)
+
+    monkeypatch.setattr(resolver, "resolve", counting_resolve)
+    track = timeline_matrix.get_tracks()[3]
+    diffs = []
+    timeline_matrix.matrix_signals.resolve_matrix.connect(diffs.append)
+    before = dict((kind, index.copy()) for kind, index in timeline_matrix.resolved.items())
+
+    # Only contexts with an item on the hidden track are resolved again.
+    timeline_matrix.disable_track(track)
+    with_items = sum(item is not None for item in timeline_matrix.get_track_items(track))
+    assert resolved_rows == [with_items] and with_items < len(timeline_matrix.get_contexts())
+
+    after = timeline_matrix.resolved
+    changed = np.zeros(len(timeline_matrix.get_contexts()), bool)
+    for kind in matrix.TRACK_KINDS:
+        changed |= before[kind] != after[kind]
+
+    contexts = timeline_matrix.get_contexts()
+    assert changed.any()
+    assert sorted(diffs[-1]["contexts"]) == sorted(contexts[changed])
+    assert list(diffs[-1]["tracks"]) == [track]
+
+    # Locking and moving contexts do not change resolution.
+    timeline_matrix.lock_track(track)
+    timeline_matrix.swap_context(contexts[0], 5)
+    assert len(resolved_rows) == 1
+
+    timeline_matrix.add_cell("item", contexts[2], timeline_matrix.get_tracks()[0])
+    assert resolved_rows[-1] == 1
+
+
+def test_sweep_matches_brute_force():
+    rng = np.random.default_rng(2)
+    starts = rng.integers(0, 200, 300).astype(float)
+    ends = starts + rng.integers(0, 12, 300)
+    context_starts, context_ends, first, last = sweep.sweep(starts, ends)
+
+    # Every interval between neighbouring boundaries covered by a clip.
+    boundaries = sorted(set(starts) | set(ends))
+    expected = [
+        (start, end) for start, end in zip(boundaries, boundaries[1:])
+        if ((starts <= start) & (ends >= end)).any()
+    ]
+    assert list(zip(context_starts, context_ends)) == expected
+    for start, end, _first, _last in zip(starts, ends, first, last):
+        spanned = [
+            index for index, (_start, _end) in enumerate(expected)
+            if start <= _start and _end <= end
+        ]
+        assert list(range(_first, _last)) == spanned
+
+    clips, context_index = sweep.expand(first, last)
+    assert clips.shape[0] == (last - first).sum()
+    assert ((context_index >= first[clips]) & (context_index < last[clips])).all()
+
+
+def test_contexts_follow_record_time():
+    stack = otio.schema.Stack()
+    for kind, durations in (("Video", (10, 10)), ("Audio", (15,)), ("Video", (None, 5, 30))):
+        track = otio.schema.Track(kind=kind)
+        for duration in durations:
+            source_range = otio.opentime.TimeRange(
+                otio.opentime.RationalTime(0, 24), otio.opentime.RationalTime(duration or 25, 24)
+            )
+            if duration is None:
+                track.append(otio.schema.Gap(source_range=source_range))
+
+            else:
+                track.append(otio.schema.Clip(name="clip", source_range=source_range))
+
+        stack.append(track)
+
+    timeline_matrix = matrix.Matrix.from_stack(stack)
+    contexts = timeline_matrix.storage.contexts
+    # Nothing covers frames 20 to 25, they are left out.
+    assert contexts.logical("record_start").tolist() == [0, 10, 15, 25, 30]
+    assert contexts.logical("record_end").tolist() == [10, 15, 20, 30, 60]
+    # Clips on different tracks only share the contexts they overlap in.
+    assert [item is not None for item in timeline_matrix.get_track_items("A1")] == [
+        True, True, False, False, False
+    ]
+    assert [item is not None for item in timeline_matrix.get_track_items("V2")] == [
+        False, False, False, True, True
+    ]
+
+
+def test_interval_index_lookup():
+    index = interval_index.IntervalIndex()
+    index.insert(["c", "a", "none"], [20, 0, np.nan], [30, 10, 5])
+    index.insert(["b"], [10], [15])
+    assert len(index) == 3
+    assert [index.find(frame) for frame in (-1, 0, 9.5, 10, 14, 15, 20, 29, 30)] == [
+        None, "a", "a", "b", "b", None, "c", "c", None
+    ]
+
+    # Ranges are removed in place, other ranges keep answering.
+    index.remove("b", 10)
+    index.remove("b", 10)
+    assert index.find(12) is None and index.find(25) == "c"
+    assert index.names.tolist() == ["a", "c"]
+
+
+def test_matrix_keeps_interval_index():
+    timeline_matrix = _random_matrix(3, contexts=4, tracks=3, cells=12)
+    for index, context in enumerate(timeline_matrix.get_contexts()):
+        timeline_matrix.set_context_range(context, index * 10, index * 10 + 10)
+
+    result = timeline_matrix.items_at(25)
+    tracks = timeline_matrix.get_tracks()
+    assert result["context"] == "context_2"
+    assert result["items"] == dict(
+        (track, item) for track, item in zip(tracks, timeline_matrix.matrix[2])
+        if item is not None
+    )
+
+    # Moved, removed and re-timed contexts update the index.
+    timeline_matrix.swap_context("context_2", 0)
+    assert timeline_matrix.items_at(25)["context"] == "context_2"
+    timeline_matrix.set_context_range("context_2", 100, 110)
+    assert timeline_matrix.items_at(25)["context"] is None
+    assert timeline_matrix.items_at(105)["context"] == "context_2"
+    timeline_matrix.remove_context("context_1")
+    assert timeline_matrix.items_at(15)["context"] is None
+    assert len(timeline_matrix.intervals) == 3
+
+
+def test_reorder_moves_no_cells():
+    timeline_matrix = _random_matrix(4)
+    storage = timeline_matrix.storage
+    data, cells = storage.data, storage.data.copy()
+    tracks, contexts = list(timeline_matrix.get_tracks()), list(timeline_matrix.get_contexts())
+    rows = dict(zip(contexts, timeline_matrix.matrix.tolist()))
+
+    timeline_matrix.swap_track(tracks[0], 8)
+    timeline_matrix.swap_context("context_5", 0)
+    tracks.append(tracks.pop(0))
+    contexts.insert(0, contexts.pop(5))
+
+    # Only the permutation changed, cells stay in their slots.
+    assert storage.data is data
+    assert (storage.data == cells).all()
+    assert list(timeline_matrix.get_tracks()) == tracks
+    assert list(timeline_matrix.get_contexts()) == contexts
+    assert [storage.tracks.index(track) for track in tracks] == list(range(len(tracks)))
+
+    # Removing most contexts compacts slots in logical order.
+    for context in contexts[1::3] + contexts[2::3]:
+        timeline_matrix.remove_context(context)
+
+    assert storage.contexts.size < len(contexts) - storage.contexts.dead
+    contexts = contexts[::3]
+    assert list(timeline_matrix.get_contexts()) == contexts
+    assert [storage.contexts.index(context) for context in contexts] == list(range(len(contexts)))
+    for context, row in zip(contexts, timeline_matrix.matrix.tolist()):
+        assert row == rows[context][1:] + rows[context][:1]
+
+
+def test_batch_emits_one_change_set():
+    timeline_matrix = _random_matrix(5, contexts=10, tracks=3, cells=10)
+    signals = timeline_matrix.matrix_signals
+    emitted = []
+    for name in (
+        "add_new_track", "add_new_context", "remove_track", "swap_context",
+        "add_cell", "state_changed", "resolve_matrix", "changed"
+    ):
+        getattr(signals, name).connect(lambda *args, name=name: emitted.append((name, args)))
+
+    resolved = timeline_matrix.resolved["video"].copy()
+    with timeline_matrix.batch() as changes:
+        timeline_matrix.add_new_track("V9")
+        timeline_matrix.add_new_context("context_new")
+        for context in timeline_matrix.get_contexts():
+            timeline_matrix.add_cell("item", context, "V9")
+
+        with timeline_matrix.batch():
+            timeline_matrix.disable_track("V9")
+            timeline_matrix.swap_context("context_new", 0)
+
+        timeline_matrix.remove_track("A1")
+        # Nothing is emitted or resolved inside the batch.
+        assert not emitted
+        assert (timeline_matrix.resolved["video"][1:] == resolved).all()
+
+    # One resolution and one change set once the outermost batch is done.
+    assert [name for name, _ in emitted] == ["resolve_matrix", "changed"]
+    assert emitted[-1][1][0] is changes
+    assert changes.added_tracks == ["V9"] and changes.removed_tracks == ["A1"]
+    assert changes.added_contexts == changes.moved_contexts == ["context_new"]
+    assert len(changes.cells) == 11
+    items, enabled, active, tracks, contexts = changes.state_entries()
+    assert items.shape[0] == 11 and not enabled.any() and active.all()
+    assert set(tracks) == {"V9"}
+    assert (timeline_matrix.resolved["video"] == np.where(
+        np.not_equal(timeline_matrix.get_track_items("V1"), None), 0, -1
+    )).all()
@@ -0,0 +1,61 @@
+import opentimelineio as otio
+import pytest
+
+from app import matrix, playback
+
+RationalTime = otio.opentime.RationalTime
+TimeRange = otio.opentime.TimeRange
+
+
+def _stack():
+    stack = otio.schema.Stack()
+    for track_index in range(3):
+        track = otio.schema.Track(
+            kind=otio.schema.TrackKind.Audio if track_index == 2 else otio.schema.TrackKind.Video
+        )
+        for clip_index in range(6):
+            if (clip_index + track_index) % 4 == 0:
+                track.append(otio.schema.Gap(
+                    source_range=TimeRange(RationalTime(0, 24), RationalTime(7, 24))
+                ))
+                continue
+
+            track.append(otio.schema.Clip(
+                name="clip_{}_{}".format(track_index, clip_index),
+                source_range=TimeRange(RationalTime(0, 24), RationalTime(5 + track_index * 3, 24))
+            ))
+
+        stack.append(track)
+
+    return stack
+
+
+class CountingMatrix(matrix.Matrix):
+
+    def __init__(self, *args, **kwargs):
+        super(CountingMatrix, self).__init__(*args, **kwargs)
+        self.lookups = 0
+
+    def items_at(self, frame):
+        self.lookups += 1
+
+        return super(CountingMatrix, self).items_at(frame)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_frame_table_is_precomputed(sparse):
+    timeline_matrix = CountingMatrix.from_stack(_stack(), sparse=sparse)
+    tracks = timeline_matrix.get_tracks()
+    timeline_matrix.swap_context(timeline_matrix.get_contexts()[-1], 0)
+    timeline_matrix.disable_track(tracks[0])
+    timeline_matrix.resolve_matrix()
+
+    table = playback.FrameTable(timeline_matrix)
+    assert len(table.results) == len(timeline_matrix.intervals)
+    assert len(table) > 0
+
+    # Every frame is read from the table, the matrix is never asked.
+    for frame in range(table.first - 2, table.last + 2):
+        result = table.lookup(frame)
+        assert timeline_matrix.lookups == 0
+        assert result == matrix.Matrix.items_at(timeline_matrix, frame)
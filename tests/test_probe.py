@@ -0,0 +1,87 @@
+from PySide2 import QtWidgets
+
+from app import audio_item, cache, loader, probe, video_item
+
+VIDEO = {
+    "kind": "video", "frame_rate": 25.0, "start_frame": 10, "end_frame": 109,
+    "has_audio": True,
+}
+AUDIO = {
+    "kind": "audio", "frame_rate": 24.0, "start_frame": 0, "end_frame": 47,
+    "has_audio": True,
+}
+
+
+def _media(tmp_path, monkeypatch, *names):
+    monkeypatch.setattr(cache, "CACHE_ROOT", str(tmp_path / "cache"))
+    paths = []
+    for name in names:
+        path = tmp_path / name
+        path.write_bytes(name.encode("utf-8"))
+        paths.append(str(path))
+
+    return paths
+
+
+def test_media_items_from_fake_prober(tmp_path, monkeypatch):
+    video, audio, broken = _media(tmp_path, monkeypatch, "a.mov", "b.wav", "c.mov")
+    fake = probe.FakeProber({video: VIDEO, audio: AUDIO})
+
+    items = probe.media_items(
+        [video, audio, broken], probe.MediaProber(fake, max_workers=2)
+    )
+
+    assert sorted(fake.calls) == sorted([video, audio, broken])
+    assert [type(item) for item in items] == [video_item.VideoItem, audio_item.AudioItem]
+    assert (items[0].frame_rate, items[0].start_frame, items[0].end_frame) == (25.0, 10, 109)
+
+    timeline = probe.timeline_from_items(items, "clips")
+    assert [len(track) for track in timeline.tracks] == [1, 1]
+    clip = timeline.tracks[0][0]
+    assert clip.source_range.duration.value == 100
+
+
+def test_probe_results_are_cached(tmp_path, monkeypatch):
+    video, = _media(tmp_path, monkeypatch, "a.mov")
+    probe.MediaProber(probe.FakeProber({video: VIDEO})).probe([video])
+
+    fake = probe.FakeProber()
+    results = probe.MediaProber(fake).probe([video])
+
+    assert fake.calls == []
+    assert results[video] == VIDEO
+
+
+def test_clips_loader_uses_given_prober(tmp_path, monkeypatch):
+    paths = _media(tmp_path, monkeypatch, "a.mov", "b.mov")
+    clips_loader = loader.ClipsLoader(
+        paths, "clips", probe.MediaProber(probe.FakeProber(default=VIDEO))
+    )
+    loaded = []
+    clips_loader.loader_signals.finished.connect(
+        lambda contents, layout: loaded.append(contents)
+    )
+
+    clips_loader.run()
+
+    assert len(loaded) == 1
+    assert len(loaded[0].tracks[0]) == 2
+
+
+def test_load_from_clip_before_timeline_setup(qapp, tmp_path, monkeypatch):
+    import console
+    import timeline
+
+    loaded = []
+    monkeypatch.setattr(
+        QtWidgets.QFileDialog, "getOpenFileNames",
+        lambda *args: ([str(tmp_path / "a.mov")], "")
+    )
+    monkeypatch.setattr(timeline.Timeline, "load_clips", lambda self, paths: loaded.append(paths))
+
+    # Timeline is created from a timer, menu actions may run before it fires.
+    timeline_console = console.TimelineConsole()
+    timeline_console.load_timeline_from_clip()
+
+    assert timeline_console.timeline is not None
+    assert loaded == [[str(tmp_path / "a.mov")]]
@@ -0,0 +1,284 @@
+import gc
+import os
+import weakref
+
+import opentimelineio as otio
+from PySide2 import QtCore
+
+import timeline
+
+RationalTime = otio.opentime.RationalTime
+TimeRange = otio.opentime.TimeRange
+
+
+def _reel(name, tracks=2, clips=5):
+    reel = otio.schema.Timeline(name=name)
+    for track_index in range(tracks):
+        track = otio.schema.Track(
+            kind=otio.schema.TrackKind.Video if track_index % 2 == 0 else otio.schema.TrackKind.Audio
+        )
+        for clip_index in range(clips):
+            track.append(otio.schema.Clip(
+                name="clip_{}".format(clip_index),
+                source_range=TimeRange(RationalTime(0, 24), RationalTime(10 + track_index, 24))
+            ))
+
+        reel.tracks.append(track)
+
+    return reel
+
+
+def _collection_tabs(timeline_widget, count):
+    collection = otio.schema.SerializableCollection(
+        name="bin", children=[_reel("reel_{}".format(index)) for index in range(count)]
+    )
+    timeline_widget._set_collection(collection, timeline_widget.count())
+
+    return [
+        timeline_widget.widget(index) for index in range(timeline_widget.count())
+        if isinstance(timeline_widget.widget(index), timeline.LazyTimelineTab)
+    ]
+
+
+def test_lazy_tab_edited(qapp):
+    timeline_widget = timeline.Timeline()
+    tab, = _collection_tabs(timeline_widget, 1)
+    timeline_matrix = tab._matrix()
+    assert not tab.edited
+
+    # A state set back is not an edit.
+    timeline_matrix.disable_track("V1")
+    timeline_matrix.enable_track("V1")
+    assert not tab.edited
+
+    timeline_matrix.lock_track("A1")
+    assert tab.edited
+
+    timeline_matrix.unlock_track("A1")
+    assert not tab.edited
+
+    timeline_matrix.add_new_context("by_hand")
+    assert tab.edited
+
+
+def test_locked_tab_is_not_evicted(qapp):
+    timeline_widget = timeline.Timeline()
+    tabs = _collection_tabs(timeline_widget, 4)
+    timeline_widget.scene_budget = tabs[0].cost() + 1
+
+    tabs[0]._matrix().lock_track("V1")
+    for tab in tabs[1:]:
+        timeline_widget.setCurrentWidget(tab)
+
+    assert tabs[0].built
+    assert [tab.built for tab in tabs[1:]] == [False, False, True]
+
+
+def test_tabs_over_budget_are_evicted(qapp):
+    timeline_widget = timeline.Timeline()
+    tabs = _collection_tabs(timeline_widget, 4)
+    scene = tabs[0]._scene()
+    # Graphics items of the scene are counted, not only its storage.
+    assert tabs[0].cost() >= (
+        scene.timeline_matrix.storage.nbytes + len(scene.items()) * timeline.SCENE_ITEM_BYTES
+    )
+
+    timeline_widget.scene_budget = int(tabs[0].cost() * 2.5)
+    timeline_widget.setCurrentWidget(tabs[1])
+    assert [tab.built for tab in tabs] == [True, True, False, False]
+
+    timeline_widget.setCurrentWidget(tabs[2])
+    assert [tab.built for tab in tabs] == [False, True, True, False]
+
+    timeline_widget.setCurrentWidget(tabs[0])
+    assert [tab.built for tab in tabs] == [True, False, True, False]
+
+
+def _scene(timeline_widget, index):
+    view = timeline_widget.widget(index).findChild(timeline.TimelineCompositionView)
+
+    return view.composition_scene
+
+
+def test_layout_transaction_lays_out_once(qapp, monkeypatch):
+    passes = []
+    update_track_position = timeline.CompositionScene.update_track_position
+
+    def counting_update(scene):
+        passes.append(scene)
+        update_track_position(scene)
+
+    monkeypatch.setattr(timeline.CompositionScene, "update_track_position", counting_update)
+    timeline_widget = timeline.Timeline()
+    timeline_widget._set_timeline(_reel("reel", tracks=6, clips=5))
+    scene = _scene(timeline_widget, 1)
+    # Loading six tracks costs one layout pass.
+    assert passes.count(scene) == 1
+
+    with scene.layout_transaction():
+        with scene.layout_transaction():
+            added = [scene.add_track(kind) for kind in ("video", "audio", "video")]
+
+        assert passes.count(scene) == 1
+
+    assert passes.count(scene) == 2
+    scene.timeline_matrix.remove_track(added[1])
+    assert passes.count(scene) == 3
+
+    # Tracks are stacked upwards in track order, the scene holds all of them.
+    heights = [scene.track_dict[track].y() for track in scene.track_list]
+    assert heights == sorted(heights, reverse=True)
+    assert scene.sceneRect().top() <= min(heights)
+
+
+def test_scene_applies_batch_once(qapp, monkeypatch):
+    timeline_widget = timeline.Timeline()
+    timeline_widget._set_timeline(_reel("reel", tracks=2, clips=5))
+    scene = _scene(timeline_widget, 1)
+    timeline_matrix = scene.timeline_matrix
+    refreshes = []
+    refresh_cells = timeline.CompositionScene._refresh_cells
+    monkeypatch.setattr(
+        timeline.CompositionScene, "_refresh_cells",
+        lambda scene: refreshes.append(scene) or refresh_cells(scene)
+    )
+
+    with timeline_matrix.batch():
+        added = [scene.add_track(kind) for kind in ("video", "audio")]
+        for track in added:
+            for context in timeline_matrix.get_contexts():
+                timeline_matrix.add_cell(otio.schema.Clip(name="clip"), context, track)
+
+        timeline_matrix.disable_track(added[0])
+        assert not set(added) & set(scene.track_dict)
+
+    # Tracks, cells and states of the batch are shown with one refresh.
+    assert refreshes == [scene]
+    assert scene.track_list == ["Context"] + list(timeline_matrix.get_tracks())
+    assert set(added) <= set(scene.track_dict)
+
+
+def test_large_timelines_use_painted_tracks(qapp, monkeypatch):
+    monkeypatch.setattr(timeline, "PAINTED_TRACKS_ITEMS", 10)
+    timeline_widget = timeline.Timeline()
+    timeline_widget._set_timeline(_reel("small", tracks=2, clips=5))
+    timeline_widget._set_timeline(_reel("large", tracks=2, clips=6))
+
+    assert [_scene(timeline_widget, index).painted_tracks for index in range(3)] == [
+        False, False, True
+    ]
+
+
+def test_painted_state_restyles_changed_cells(qapp):
+    timeline_widget = timeline.Timeline(painted_tracks=True)
+    timeline_widget._set_timeline(_reel("reel", tracks=2, clips=5))
+    scene = _scene(timeline_widget, 1)
+    timeline_matrix = scene.timeline_matrix
+    video, audio = (scene.track_dict[name].painted_cells for name in ("V1", "A1"))
+    audio_enabled = audio.enabled
+
+    timeline_matrix.disable_track("V1")
+    assert not video.enabled.any()
+    assert audio.enabled is audio_enabled and audio.enabled.all()
+
+    timeline_matrix.enable_track("V1")
+    context = timeline_matrix.get_contexts()[3]
+    timeline_matrix.disable_context(context)
+    for name, painted_cells in (("V1", video), ("A1", audio)):
+        _, starts, _ = timeline_matrix.get_track_spans(name)
+        assert (painted_cells.enabled == (starts != 3)).all()
+        assert (painted_cells.enabled == timeline_matrix.cell_states(name, starts)[0]).all()
+
+
+def test_scrub_looks_up_interval_index(qapp):
+    timeline_widget = timeline.Timeline()
+    timeline_widget._set_timeline(_reel("reel", tracks=2, clips=5))
+    scene = _scene(timeline_widget, 1)
+    timeline_matrix = scene.timeline_matrix
+    results = []
+    timeline_matrix.matrix_signals.seek.connect(results.append)
+
+    for index in range(len(timeline_matrix.get_contexts())):
+        scene._scrub((index + 0.5) * timeline.tracks.CELL_WIDTH)
+        frame = int(timeline_matrix.frame_at(index + 0.5))
+        assert results[-1]["context"] == timeline_matrix.get_contexts()[index]
+        assert results[-1] == timeline_matrix.items_at(frame)
+        assert scene.playback.frame == frame
+
+    # Scrubbing the same frame again looks nothing up, playback builds no table.
+    count = len(results)
+    scene._scrub((index + 0.5) * timeline.tracks.CELL_WIDTH)
+    assert len(results) == count
+    assert scene.playback._table is None
+
+
+def _rss():
+    """ Resident memory of the process in MB, None where it can not be read.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2.0 ** 20
+
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _collect():
+    QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.DeferredDelete)
+    gc.collect()
+
+
+def _open_and_close(timeline_widget, reel):
+    """ Open a tab of given timeline and close it.
+
+        return: weak references to scene and matrix of the tab.
+    """
+    timeline_widget._set_timeline(reel)
+    index = timeline_widget.count() - 1
+    scene = timeline_widget.widget(index).findChild(
+        timeline.TimelineCompositionView
+    ).composition_scene
+    references = [weakref.ref(scene), weakref.ref(scene.timeline_matrix)]
+
+    del scene
+    timeline_widget._close_tab(index)
+    _collect()
+
+    return references
+
+
+def test_closing_tabs_releases_memory(qapp):
+    timeline_widget = timeline.Timeline()
+    views = len(timeline_widget.findChildren(timeline.TimelineCompositionView))
+
+    # First tabs warm up caches and pools shared by all scenes.
+    for _ in range(2):
+        _open_and_close(timeline_widget, _reel("reel", tracks=4, clips=1000))
+
+    before = _rss()
+    for _ in range(4):
+        # A new timeline every time, like opening files, a leaked tab keeps its
+        # otio items too.
+        references = _open_and_close(timeline_widget, _reel("reel", tracks=4, clips=1000))
+        assert [reference() for reference in references] == [None, None]
+
+    assert len(timeline_widget.findChildren(timeline.TimelineCompositionView)) == views
+
+    after = _rss()
+    if before is not None:
+        # Tabs closed without teardown grow RSS by about 6 MB each here.
+        assert after - before < 8
+
+
+def test_closing_lazy_tab_releases_scene(qapp):
+    timeline_widget = timeline.Timeline()
+    tab, = _collection_tabs(timeline_widget, 1)
+    scene = tab.content.findChild(timeline.TimelineCompositionView).composition_scene
+    references = [weakref.ref(tab), weakref.ref(scene), weakref.ref(scene.timeline_matrix)]
+
+    del tab, scene
+    timeline_widget._close_tab(timeline_widget.count() - 1)
+    _collect()
+
+    assert not timeline_widget._recent_tabs
+    assert [reference() for reference in references] == [None, None, None]
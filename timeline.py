@@ -1,16 +1,67 @@
+import os
 import sys
 import re
+import contextlib
 
+import numpy as np
 import opentimelineio as otio
 from PySide2 import QtGui, QtCore, QtWidgets
 
-from app import matrix
+from app import export, loader, matrix, filmstrip, playback, waveform
 import tracks, cells, slider
 
 
-supported_formats = otio.adapters.suffixes_with_defined_adapters(read=True)
+# Suffixes readable by otio adapters, discovered on first use.
+_supported_formats = None
+
+
+def supported_formats():
+    """ File suffixes readable by otio adapters. Adapter discovery loads the otio
+        plugin manifests, so it is done once, the first time it is needed.
+    """
+    global _supported_formats
+    if _supported_formats is None:
+        _supported_formats = otio.adapters.suffixes_with_defined_adapters(read=True)
+
+    return _supported_formats
+
+
 regex = re.compile(r'(\d+|\s+)')
 
+# Contexts kept alive on each side of the viewport while scrolling.
+CELL_MARGIN = 2
+# Zoom step of one mouse wheel notch.
+ZOOM_STEP = 1.25
+# Smallest horizontal zoom when every cell is an item, painted tracks can zoom
+# out until the whole composition fits the view.
+MIN_ITEM_ZOOM = 0.1
+# Timelines with more items than this are drawn with painted tracks, unless the
+# renderer is chosen explicitly.
+PAINTED_TRACKS_ITEMS = 5000
+# Memory in bytes the scenes of lazy collection tabs may use before scenes of
+# tabs not shown recently are evicted, TIMELINE_SCENE_BUDGET_MB overrides it.
+SCENE_BUDGET = int(float(os.environ.get("TIMELINE_SCENE_BUDGET_MB", 256)) * 2 ** 20)
+# Estimated bytes of one graphics item of a scene with its Python wrapper.
+SCENE_ITEM_BYTES = 3 * 2 ** 10
+# Estimated bytes kept for each context besides storage arrays: its name, slot
+# mappings, interval index entry and cached spans.
+CONTEXT_BYTES = 300
+
+def item_count(composition, layout=None):
+    """ Number of items of a stack, gaps included.
+        args:
+            composition(otio.schema.Stack): stack, may be None.
+            layout(matrix.StackLayout): layout computed by a loader, if any.
+    """
+    if layout is not None:
+        return sum(len(items) for _, items, _, _ in layout.tracks)
+
+    if isinstance(composition, otio.schema.Stack):
+        return sum(len(track) for track in composition)
+
+    return 0
+
+
 class CompositionSceneSignals(QtCore.QObject):
 
     remove_track = QtCore.Signal(str)
@@ -26,8 +77,14 @@ class CompositionSceneSignals(QtCore.QObject):
 class CompositionScene(QtWidgets.QGraphicsScene):
     """ Composition scene widget.
     """
-    def __init__(self, composition, *args, **kwargs):
+    def __init__(self, composition, layout=None, painted_tracks=None, *args, **kwargs):
         super(CompositionScene, self).__init__(*args, **kwargs)
+        # Paint cells of each track in one item instead of one item per cell,
+        # None picks painted tracks for timelines above PAINTED_TRACKS_ITEMS.
+        if painted_tracks is None:
+            painted_tracks = item_count(composition, layout) > PAINTED_TRACKS_ITEMS
+
+        self.painted_tracks = painted_tracks
         self.DEFAULT_SCENE_HEIGHT = 200
         self.DEFAULT_SCENE_WIDTH = 1000
 
@@ -66,10 +123,13 @@ class CompositionScene(QtWidgets.QGraphicsScene):
 
         self.playhead = slider.PlayHead(self._current_y_pos)
         self.playhead.setParentItem(self.slider)
+        # Last frame looked up under playhead.
+        self._playhead_frame = None
+        self.slider.slider_signals.scrub.connect(self._scrub)
+        # Transport, moves the playhead while playing.
+        self.playback = playback.Playback(self.timeline_matrix, self)
+        self.playback.playback_signals.frame_changed.connect(self._playback_frame)
 
-        self._video_tracks_index = 0
-        self._audio_tracks_index = 0
-        self._data_tracks_index = 0
 
         self.track_mapping = {
             "V" : 'video',
@@ -85,11 +145,30 @@ class CompositionScene(QtWidgets.QGraphicsScene):
         # self.track_dict will store track object againest tack name for future reference.
         self.track_dict = {}
 
-        # Adding Context track
-        self.add_track("Context")
-
-        if composition:
-            self.populate_compsition(composition)
+        # Only cells in viewport are in the scene, the matrix holds the items.
+        # Cells leaving the viewport go back to the pool and are reused.
+        self.cell_pool = cells.CellPool()
+        # Track name against {(context index, span): cell} of cells in scene.
+        self._live_cells = {}
+        # Track name against items, first context index and end context index.
+        self._span_cache = {}
+        self._viewport_rect = self.sceneRect()
+        # Track layout is deferred while a layout transaction is open.
+        self._layout_depth = 0
+        self._layout_pending = False
+        # Filmstrip tiles are generated in background and shown once ready.
+        self.filmstrip_service = filmstrip.filmstrip_service()
+        self.filmstrip_service.tile_ready.connect(self._filmstrip_ready)
+        self.waveform_service = waveform.waveform_service()
+        self.waveform_service.waveform_ready.connect(self._waveform_ready)
+
+        # Context track and loaded tracks are laid out once.
+        with self.layout_transaction():
+            # Adding Context track
+            self.add_track("Context")
+
+            if composition:
+                self.populate_compsition(composition, layout)
 
     def connect_signals(self):
         """ Connecting timeline matrix signals.
@@ -103,76 +182,334 @@ class CompositionScene(QtWidgets.QGraphicsScene):
 
         #conneting matrix_signals
         self.timeline_matrix.matrix_signals.add_new_track.connect(self._add_track)
+        self.timeline_matrix.matrix_signals.add_new_context.connect(self._new_context)
         self.timeline_matrix.matrix_signals.remove_track.connect(self._remove_track)
         self.timeline_matrix.matrix_signals.remove_context.connect(self._remove_context)
         self.timeline_matrix.matrix_signals.swap_track.connect(self._swap_track)
         self.timeline_matrix.matrix_signals.swap_context.connect(self._swap_context)
         self.timeline_matrix.matrix_signals.add_cell.connect(self._add_item_in_track)
+        self.timeline_matrix.matrix_signals.populated.connect(self._populate)
+        self.timeline_matrix.matrix_signals.state_changed.connect(self._update_cell_state)
+        self.timeline_matrix.matrix_signals.changed.connect(self._apply_changes)
         
-    def populate_compsition(self, composition):
+    def populate_compsition(self, composition, layout=None):
         """ Loading composition.
+            args:
+                composition(otio.schema.Stack): composition to be loaded.
+                layout(matrix.StackLayout): layout computed by a loader, if any.
         """
 
         if isinstance(composition, otio.schema.Stack):
-            for _track in composition:
-                if _track.kind == otio.schema.TrackKind.Video and list(_track):
-                    video_track = self.add_track("video")
-                    
-                    for index, item in enumerate(_track):
-                        video_cell = cells.VideoCell(item)
-                        context_name = "context_{}".format(index)
-                        if not context_name in self.context_list:
-                            self.add_context(context_name)
-                        
-                        self.add_item_in_track(video_cell,context_name, video_track)
-
-                elif _track.kind == otio.schema.TrackKind.Audio and list(_track):
-                    audio_track = self.add_track("audio")
-                        
-                    for index, item in enumerate(_track):
-                        audio_cell = cells.AudioCell(item)
-                        context_name = "context_{}".format(index)
-                        if not context_name in self.context_list:
-                            self.add_context(context_name)
-
-                        self.add_item_in_track(audio_cell,context_name, audio_track)
-
-                elif (
-                    _track.kind not in (
-                        otio.schema.TrackKind.Video,
-                        otio.schema.TrackKind.Audio
-                    ) and
-                    list(_track)
-                ):
-                    data_track = self.add_track("data")
-                    
-                    for index, item in enumerate(_track):
-                        data_cell = cells.DataCell(item)
-                        context_name = "context_{}".format(index)
-                        if not context_name in self.context_list:
-                            self.add_context(context_name)
-
-                        self.add_item_in_track(data_cell, context_name, data_track)
+            self.timeline_matrix.populate(composition, layout=layout)
+
+    def _populate(self, arg_list):
+        """ Private function to add tracks and contexts of a populated matrix to
+            scene. Tracks are laid out once at the end, which adds the cells in
+            viewport.
+            args:
+                arg_list(list): [track_names(list), context_names(list)]
+        """
+        track_names, context_names = arg_list
+        with self.layout_transaction():
+            for context_name in context_names:
+                self._add_context(context_name)
+
+            for track_name in track_names:
+                self._create_track(track_name)
+
+            self._span_cache.clear()
+            self._request_layout()
+
+    def update_viewport(self, rect):
+        """ Show cells in given scene rect, called by the view on scroll and resize.
+            args:
+                rect(QtCore.QRectF): visible scene rect.
+        """
+        self._viewport_rect = rect
+        # Tiles queued for the previous range or zoom are no longer needed.
+        self.filmstrip_service.clear_queue()
+        self._refresh_cells()
+
+    def _track_spans(self, track_name):
+        """ Items of a track with first and last (exclusive) context index, sorted
+            by first context. Cached until the track changes.
+            args:
+                track_name(str): track name.
+        """
+        if not track_name in self._span_cache:
+            if track_name == "Context":
+                items = self.timeline_matrix.get_contexts()
+                starts = np.arange(items.shape[0])
+                ends = starts + 1
+
+            else:
+                items, starts, spans = self.timeline_matrix.get_track_spans(track_name)
+                ends = starts + spans
+
+            self._span_cache[track_name] = (items, starts, ends)
+
+        return self._span_cache[track_name]
+
+    def _invalidate_cells(self, track_name=None):
+        """ Drop cached spans of a track, or of all tracks, and refresh cells.
+            args:
+                track_name(str): track name, None for all tracks.
+        """
+        if track_name is None:
+            self._span_cache.clear()
+
+        else:
+            self._span_cache.pop(track_name, None)
+
+        self._refresh_cells()
+
+    def _visible_contexts(self):
+        """ First and last (exclusive) context index in viewport with margin.
+        """
+        first = int(self._viewport_rect.left() // tracks.CELL_WIDTH) - 1 - CELL_MARGIN
+        last = int(self._viewport_rect.right() // tracks.CELL_WIDTH) + CELL_MARGIN
+
+        return max(first, 0), max(last, 0)
+
+    def _is_track_visible(self, _track):
+        """ True if given track is vertically inside viewport.
+        """
+        top = _track.y()
+        bottom = top + _track.rect().height()
+
+        return bottom >= self._viewport_rect.top() and top <= self._viewport_rect.bottom()
+
+    def teardown(self):
+        """ Release everything the scene holds, called when its tab is closed.
+            Shared services stop notifying the scene, cells are deleted and the
+            matrix is cleared, so otio items are no longer referenced.
+        """
+        self.playback.teardown()
+        self.filmstrip_service.tile_ready.disconnect(self._filmstrip_ready)
+        self.waveform_service.waveform_ready.disconnect(self._waveform_ready)
+
+        self.cell_pool.clear()
+        self._live_cells.clear()
+        self._span_cache.clear()
+        self.track_dict.clear()
+        self.track_list = []
+        self.context_list = []
+        self.clear()
+        self.timeline_matrix.clear()
+
+    def memory_cost(self):
+        """ Estimated memory of scene in bytes: matrix storage, bookkeeping of
+            contexts, graphics items in scene or pooled and arrays of painted
+            tracks. Filmstrip tiles and waveforms are in caches shared by all
+            scenes, which are bounded on their own and not counted here.
+        """
+        painted = sum(
+            _track.painted_cells.nbytes for _track in self.track_dict.values()
+            if _track.painted_cells is not None
+        )
+
+        return (
+            self.timeline_matrix.storage.nbytes + painted +
+            len(self.context_list) * CONTEXT_BYTES +
+            (len(self.items()) + len(self.cell_pool)) * SCENE_ITEM_BYTES
+        )
+
+    def _release_cell(self, cell_item):
+        """ Remove cell from scene and give it back to the pool.
+        """
+        cell_item.setParentItem(None)
+        self.removeItem(cell_item)
+        self.cell_pool.release(cell_item)
+
+    def _refresh_cells(self):
+        """ Add cells entering the viewport and release cells leaving it.
+        """
+        first, last = self._visible_contexts()
+        for track_name in self.track_list:
+            self._refresh_track_cells(track_name, first, last)
+
+    def _refresh_track_cells(self, track_name, first, last):
+        """ Match cells of a track to its items between given context indexes.
+            args:
+                track_name(str): track name.
+                first(int): first context index.
+                last(int): last context index (exclusive).
+        """
+        if self.painted_tracks:
+            self._refresh_painted_track(track_name)
+            return
+
+        _track = self.track_dict[track_name]
+        live = self._live_cells.setdefault(track_name, {})
+        wanted = {}
+        if self._is_track_visible(_track):
+            items, starts, ends = self._track_spans(track_name)
+            # Items of a track do not overlap, so ends are sorted like starts.
+            low = np.searchsorted(ends, first, "right")
+            high = np.searchsorted(starts, last, "left")
+            for item, start, end in zip(
+                items[low:high], starts[low:high].tolist(), ends[low:high].tolist()
+            ):
+                wanted[(start, end - start)] = item
+
+        for key in list(live):
+            if key not in wanted or live[key].item is not wanted[key]:
+                self._release_cell(live.pop(key))
+
+        new_keys = [key for key in wanted if key not in live]
+        if not new_keys:
+            return
+
+        if track_name == "Context":
+            enabled = active = [True] * len(new_keys)
+
+        else:
+            enabled, active = self.timeline_matrix.cell_states(
+                track_name, [index for index, _ in new_keys]
+            )
+
+        for key, _enabled, _active in zip(new_keys, list(enabled), list(active)):
+            cell_item = self.cell_pool.acquire(_track.kind, wanted[key])
+            # New cells are painted anyway, no need to restyle them one by one.
+            cell_item.set_state(bool(_enabled), bool(_active))
+            _track.add_cell_item(cell_item, key[0], key[1])
+            live[key] = cell_item
+
+    def _filmstrip_ready(self, path):
+        """ Repaint video cells in scene with that media, a tile of it was generated.
+            args:
+                path(str): media path.
+        """
+        for track_name, track_cells in self._live_cells.items():
+            if self.track_dict[track_name].kind != "video":
+                continue
+
+            for cell_item in track_cells.values():
+                source = cell_item.filmstrip_source
+                if source is not None and source[0] == path:
+                    cell_item.update()
+
+    def _waveform_ready(self, path):
+        """ Repaint audio cells in scene with that media, its peaks were computed.
+            args:
+                path(str): media path.
+        """
+        for track_name, track_cells in self._live_cells.items():
+            if self.track_dict[track_name].kind != "audio":
+                continue
+
+            for cell_item in track_cells.values():
+                source = cell_item.waveform_source
+                if source is not None and source[0] == path:
+                    cell_item.update()
+
+    def _scrub(self, position):
+        """ Look up the frame under playhead in the interval index of timeline
+            matrix, which emits seek signal with the items there. Playback only
+            follows the frame, its frame table is not built for scrubbing.
+            Nothing is looked up while the frame stays the same.
+            args:
+                position(float): playhead position from slider start in pixels.
+        """
+        frame = self.timeline_matrix.frame_at(position / tracks.CELL_WIDTH)
+        if frame is None:
+            return
+
+        frame = int(frame)
+        if frame == self._playhead_frame:
+            return
+
+        self._playhead_frame = frame
+        self.playback.follow(frame)
+        self.timeline_matrix.seek(frame)
+
+    def _playback_frame(self, result):
+        """ Move playhead to the current playback frame and emit seek signal of
+            timeline matrix with the items there.
+            args:
+                result(dict): items under frame, like matrix.Matrix.items_at.
+        """
+        frame = result["frame"]
+        position = self.playback.table.position(frame)
+        if position is not None:
+            self.playhead.setX(position * tracks.CELL_WIDTH)
+
+        self._playhead_frame = frame
+        self.timeline_matrix.matrix_signals.seek.emit(result)
+
+    def _refresh_painted_track(self, track_name):
+        """ Hand spans and states of a track to its painted cells when they changed.
+            args:
+                track_name(str): track name.
+        """
+        _track = self.track_dict[track_name]
+        if _track.painted_cells is not None and track_name in self._span_cache:
+            return
+
+        items, starts, ends = self._track_spans(track_name)
+        if track_name == "Context":
+            labels = items.tolist()
+            enabled = np.ones(starts.shape[0], bool)
+
+        else:
+            labels = [item.name for item in items]
+            enabled, _ = self.timeline_matrix.cell_states(track_name, starts)
+
+        _track.set_painted_cells(labels, starts, ends, enabled)
 
     def _adjust_scene_size(self):
         """ Adjust scene size according to number of tracks and contexts.
         """
-        # TODO : Need to impliment.
+        # Scene width follows contexts, so the view can scroll to the last one.
+        rect = self.sceneRect()
+        rect.setWidth(
+            max(self.DEFAULT_SCENE_WIDTH, tracks.CELL_WIDTH * (len(self.context_list) + 2))
+        )
+        # Tracks are stacked upwards from the slider at the bottom, scene grows
+        # upwards so the view can scroll to the last one.
+        rect.setTop(min(0, self.DEFAULT_SCENE_HEIGHT - self._current_y_pos))
+        self.setSceneRect(rect)
+
+    @contextlib.contextmanager
+    def layout_transaction(self):
+        """ Defer track layout until the outermost transaction is done, adding or
+            removing any number of tracks in it costs one layout pass.
+
+            with composition_scene.layout_transaction():
+                for _ in range(10):
+                    composition_scene.add_track("video")
+        """
+        self._layout_depth += 1
+        try:
+            yield
+
+        finally:
+            self._layout_depth -= 1
+            if not self._layout_depth and self._layout_pending:
+                self.update_track_position()
+
+    def _request_layout(self):
+        """ Lay out tracks now, or once the open layout transaction is done.
+        """
+        if self._layout_depth:
+            self._layout_pending = True
+
+        else:
+            self.update_track_position()
 
     def update_track_position(self):
-        """ Rearange track position after delete a track.
+        """ Rearange track positions and scene size after tracks changed.
         """
+        self._layout_pending = False
         self._current_y_pos = slider.SLIDER_HEIGHT
-        for index, track_name in enumerate(self.track_list):
-            self.timeline_matrix.track_dict[track_name] = index - 1
+        for track_name in self.track_list:
             _track = self.track_dict[track_name]
+            self._current_y_pos += tracks.get_track_height(_track.kind) + 1
+            _track.setPos(0, self.DEFAULT_SCENE_HEIGHT - self._current_y_pos)
 
-            track_type = self.track_mapping[regex.split(track_name)[0]]
-            _tarck_height = tracks.get_track_height(track_type)
-            self._current_y_pos += _tarck_height + 1
-            _track.setPos(0, self.sceneRect().height() - self._current_y_pos)
-
+        self._adjust_scene_size()
         self.playhead.update_playhead(self._current_y_pos)
+        self._refresh_cells()
 
     def add_track(self, track_name):
         """ Public method to create new track and add to scene.
@@ -181,17 +518,8 @@ class CompositionScene(QtWidgets.QGraphicsScene):
             
             return: None
         """
-        if track_name == "video":
-            self._video_tracks_index += 1
-            track_name = "V{}".format(self._video_tracks_index)
-
-        elif track_name == "audio":
-            self._audio_tracks_index += 1
-            track_name = "A{}".format(self._audio_tracks_index)
-
-        elif track_name == "data":
-            self._data_tracks_index += 1
-            track_name = "D{}".format(self._data_tracks_index)
+        if track_name in matrix.TRACK_PREFIXES:
+            track_name = self.timeline_matrix.new_track_name(track_name)
 
         elif track_name == "Context":
             self._add_track(track_name)
@@ -208,9 +536,21 @@ class CompositionScene(QtWidgets.QGraphicsScene):
             
             return: _track(QtWidgets.QGraphicsRectItem)
         """
+        _track = self._create_track(track_name)
+        self._request_layout()
+
+        return _track
+
+    def _create_track(self, track_name):
+        """ Create new track and add to scene without updating track positions.
+            args:
+                track_name(str): name of track.
+            
+            return: _track(QtWidgets.QGraphicsRectItem)
+        """
         track_type = self.track_mapping[regex.split(track_name)[0]]
 
-        track_rect = self.sceneRect()
+        track_rect = QtCore.QRectF()
 
         if track_type == "video":
             track_rect.setWidth(tracks.CELL_WIDTH * 2)
@@ -240,12 +580,14 @@ class CompositionScene(QtWidgets.QGraphicsScene):
                 track_name, track_rect, self
             )
 
-        _track.setPos(0, self.sceneRect().height() - self._current_y_pos)
+        _track.setPos(0, self.DEFAULT_SCENE_HEIGHT - self._current_y_pos)
         self.addItem(_track)
         self.track_list.append(track_name)
 
         self.track_dict[track_name] =  _track
-        self.update_track_position()
+
+        return _track
+
 
     def add_context(self, context_name):
         """ Public function to add context.
@@ -253,19 +595,28 @@ class CompositionScene(QtWidgets.QGraphicsScene):
                 context_name(str): context name
         """
         self.timeline_matrix.add_new_context(context_name)
+
+    def _new_context(self, context_name):
+        """ Private function to show a context added to timeline matrix.
+            args:
+                context_name(str): context name
+        """
         self._add_context(context_name)
+        self._adjust_scene_size()
+        self._invalidate_cells("Context")
 
     def _add_context(self, context_name):
         """ Private function to add context. Slider also updating when a new context added.
             args:
                 context_name(str): context name
         """
-        context_item = cells.ContextCell(context_name)
-        self.track_dict["Context"].add_cell_item(context_item)
         self.context_list.append(context_name)
+        self._update_slider_width()
 
-        # Updating slider width.
-        self.slider_rect.setWidth(self.slider_rect.width() + tracks.CELL_WIDTH)
+    def _update_slider_width(self):
+        """ Slider spans its header and every context.
+        """
+        self.slider_rect.setWidth(tracks.CELL_WIDTH * (len(self.context_list) + 1))
         self.slider.setRect(self.slider_rect)
         # Setting slider width to limit playhead movement.
         self.slider.slider_width = self.slider_rect.width()
@@ -283,11 +634,15 @@ class CompositionScene(QtWidgets.QGraphicsScene):
                 track_name(str): track name
         """
         _track = self.track_dict[track_name]
+        for cell_item in self._live_cells.pop(track_name, {}).values():
+            self._release_cell(cell_item)
+
+        self._span_cache.pop(track_name, None)
         self.removeItem(_track)
         del self.track_dict[track_name]
         self.track_list.pop(self.track_list.index(track_name))
 
-        self.update_track_position()
+        self._request_layout()
 
     def lock_track(self, track_name):
         """ Locking the selected track.
@@ -317,53 +672,412 @@ class CompositionScene(QtWidgets.QGraphicsScene):
         """
         self.timeline_matrix.enable_track(track_name)
 
-    def _remove_context(self):
-        return
+    def _update_cell_state(self, arg_list):
+        """ Private function to restyle cells after a track or context wide state
+            change. Only cells of changed tracks whose enable state changed are
+            restyled, other cells take their state from the matrix when they are
+            shown.
+            args:
+                arg_list(list): [items(numpy.ndarray), enabled(numpy.ndarray),
+                                 active(numpy.ndarray), tracks(numpy.ndarray),
+                                 contexts(numpy.ndarray)], track name and context
+                                 index of each item.
+        """
+        items, enabled, active, track_names, contexts = arg_list
+        changed_tracks = set(track_names.tolist())
+        if self.painted_tracks:
+            for track_name in changed_tracks:
+                self._update_painted_state(track_name, contexts[track_names == track_name])
+            return
+
+        live = dict(
+            (id(cell_item.item), cell_item)
+            for track_name in changed_tracks
+            for cell_item in self._live_cells.get(track_name, {}).values()
+        )
+        region = QtCore.QRectF()
+        for item, _enabled, _active in zip(items, enabled.tolist(), active.tolist()):
+            cell_item = live.get(id(item))
+            if cell_item is None:
+                continue
+
+            if cell_item.enable != _enabled:
+                region = region.united(cell_item.sceneBoundingRect())
+
+            cell_item.set_state(_enabled, _active)
+
+        # Cells take their brush from the style table at paint time, one update
+        # of the region of restyled cells repaints all of them.
+        if not region.isEmpty():
+            self.update(region)
+
+    def _update_painted_state(self, track_name, contexts):
+        """ Restyle painted cells of a track starting at given contexts, only
+            their region is repainted.
+            args:
+                track_name(str): track name.
+                contexts(numpy.ndarray): indexes of contexts whose cells changed.
+        """
+        _track = self.track_dict.get(track_name)
+        if _track is None or _track.painted_cells is None:
+            return
+
+        _, starts, _ = self._track_spans(track_name)
+        indexes = np.searchsorted(starts, contexts)
+        indexes = np.unique(indexes[indexes < starts.shape[0]])
+        indexes = indexes[np.isin(starts[indexes], contexts)]
+        if indexes.shape[0]:
+            _track.painted_cells.set_enabled(
+                self.timeline_matrix.cell_states(track_name, starts[indexes])[0], indexes
+            )
 
-    def _swap_track(self):
-        return
+    def _remove_context(self, context_name):
+        """ Private function to remove context.
+            args:
+                context_name(str): context name
+        """
+        self.context_list.remove(context_name)
+        self._update_slider_width()
+        self._invalidate_cells()
 
-    def _swap_context(self):
-        return
+    def _swap_track(self, track_name, new_index):
+        """ Move a track to its new position, cells are children of the track
+            and move along with it.
+            args:
+                track_name(str): track name.
+                new_index(int): index of track in timeline matrix.
+        """
+        self.track_list.remove(track_name)
+        # Context track is always first, matrix tracks follow it.
+        self.track_list.insert(new_index + 1, track_name)
+        self._request_layout()
+
+    def _swap_context(self, context_name, new_index):
+        """ Move a context to its new position, cells of every track are laid
+            out again.
+            args:
+                context_name(str): context name.
+                new_index(int): index of context in timeline matrix.
+        """
+        self.context_list.remove(context_name)
+        self.context_list.insert(new_index, context_name)
+        self._invalidate_cells()
 
-    def add_item_in_track(self, cell_item, context, track):
-        """ Public function to add cell item to given track.
+    def add_item_in_track(self, item, context, track):
+        """ Public function to add item to given context and track.
             args:
-                arg_list(list): [item(QtWidgets.QGraphicsRectItem), track(str)]
+                item(otio.core.Item): item to be added.
+                context(str): context name.
+                track(str): track name.
         """
-        self.timeline_matrix.add_cell(cell_item, context, track)
+        self.timeline_matrix.add_cell(item, context, track)
 
     def _add_item_in_track(self, arg_list):
-        """ Private function to add cell item to given track.
+        """ Private function to show an item added to given track.
             args:
-                arg_list(list): [item(QtWidgets.QGraphicsRectItem), track(str)]
+                arg_list(list): [item(otio.core.Item), context(str), track(str)]
         """
-        cell_item, track = arg_list
-        self.track_dict[track].add_cell_item(cell_item)
+        _, _, track = arg_list
+        self._invalidate_cells(track)
+
+    def _apply_changes(self, changes):
+        """ Private function to show changes of a timeline matrix batch in one pass,
+            tracks are laid out and cells refreshed once.
+            args:
+                changes(matrix.ChangeSet): changes made in the batch.
+        """
+        track_dict = self.timeline_matrix.track_dict
+        with self.layout_transaction():
+            for track_name in changes.removed_tracks:
+                if track_name in self.track_dict:
+                    self._remove_track(track_name)
+
+            for track_name in changes.added_tracks:
+                if track_name in track_dict and track_name not in self.track_dict:
+                    self._create_track(track_name)
+
+            if changes.tracks_changed():
+                # Context track is always first, matrix tracks follow it.
+                self.track_list = ["Context"] + self.timeline_matrix.get_tracks().tolist()
+                self._request_layout()
+
+            if changes.contexts_changed():
+                self.context_list = self.timeline_matrix.get_contexts().tolist()
+                self._update_slider_width()
+                self._adjust_scene_size()
+                self._span_cache.clear()
+
+            for _, _, track_name in changes.cells:
+                self._span_cache.pop(track_name, None)
+
+        if not changes.tracks_changed() and (changes.contexts_changed() or changes.cells):
+            self._refresh_cells()
+
+        state_entries = changes.state_entries()
+        if state_entries is not None:
+            self._update_cell_state(state_entries)
 
 
 class TimelineCompositionView(QtWidgets.QGraphicsView):
     """ Individual view for composition.
     """
-    def __init__(self, composition, *args, **kwargs):
+    def __init__(self, composition, layout=None, painted_tracks=None, *args, **kwargs):
         """ Create new composition view and add a new tab.
             args:
                 composition: opentimelineio._otio.Stack
+                layout(matrix.StackLayout): layout computed by a loader, if any.
+                painted_tracks(bool): paint cells of each track in one item, None
+                                      picks it from the number of items.
         """
         super(TimelineCompositionView, self).__init__(*args, **kwargs)
         self.setAlignment((QtCore.Qt.AlignLeft | QtCore.Qt.AlignBottom))
-        self.composition_scene = CompositionScene(composition, parent=self)
+        self.composition_scene = CompositionScene(
+            composition, layout, painted_tracks, parent=self
+        )
         self.setScene(self.composition_scene)
 
+        self.horizontalScrollBar().valueChanged.connect(self.update_viewport)
+        self.verticalScrollBar().valueChanged.connect(self.update_viewport)
+        self._shown = False
+
+    def teardown(self):
+        """ Tear down scene of view and delete it, called when its tab is closed.
+        """
+        self.horizontalScrollBar().valueChanged.disconnect(self.update_viewport)
+        self.verticalScrollBar().valueChanged.disconnect(self.update_viewport)
+        self.composition_scene.teardown()
+        self.setScene(None)
+        self.composition_scene.deleteLater()
+
+    def update_viewport(self, *args):
+        """ Tell scene which rect is visible, scene only keeps cells in it.
+        """
+        self.composition_scene.update_viewport(
+            self.mapToScene(self.viewport().rect()).boundingRect()
+        )
+
+    def resizeEvent(self, event):
+        """ Overriding resizeEvent of QtWidgets.QGraphicsView.
+        """
+        super(TimelineCompositionView, self).resizeEvent(event)
+        self.update_viewport()
+
+    def showEvent(self, event):
+        """ Overriding showEvent of QtWidgets.QGraphicsView, scene grows upwards
+            with tracks so view starts at the bottom, on the slider.
+        """
+        super(TimelineCompositionView, self).showEvent(event)
+        if not self._shown:
+            self._shown = True
+            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+
+    def min_zoom(self):
+        """ Smallest horizontal zoom allowed.
+        """
+        if not self.composition_scene.painted_tracks:
+            return MIN_ITEM_ZOOM
+
+        width = self.composition_scene.sceneRect().width()
+        return min(1.0, self.viewport().width() / width) if width else 1.0
+
+    def zoom(self, factor):
+        """ Zoom horizontally by given factor, between min_zoom and 1.
+            args:
+                factor(float): zoom factor.
+        """
+        current = self.transform().m11()
+        zoom = min(max(current * factor, self.min_zoom()), 1.0)
+        self.scale(zoom / current, 1.0)
+        self.update_viewport()
+
+    def wheelEvent(self, event):
+        """ Overriding wheelEvent of QtWidgets.QGraphicsView, Ctrl + wheel zooms.
+        """
+        if not event.modifiers() & QtCore.Qt.ControlModifier:
+            super(TimelineCompositionView, self).wheelEvent(event)
+            return
+
+        self.zoom(ZOOM_STEP ** (event.angleDelta().y() / 120.0))
+
+    def keyPressEvent(self, event):
+        """ Overriding keyPressEvent of QtWidgets.QGraphicsView, space plays and
+            pauses, left and right arrows step by a frame.
+        """
+        _playback = self.composition_scene.playback
+        if event.key() == QtCore.Qt.Key_Space:
+            _playback.toggle()
+
+        elif event.key() == QtCore.Qt.Key_Left:
+            _playback.step(-1)
+
+        elif event.key() == QtCore.Qt.Key_Right:
+            _playback.step(1)
+
+        else:
+            super(TimelineCompositionView, self).keyPressEvent(event)
+
+
+def teardown_widget(widget):
+    """ Tear down composition views in a widget and delete it. Removing a tab
+        only detaches its widget, which would keep its scene alive.
+        args:
+            widget(QtWidgets.QWidget): tab widget.
+    """
+    for composition_view in widget.findChildren(TimelineCompositionView):
+        composition_view.teardown()
+
+    widget.deleteLater()
+
+
+def collection_timelines(collection):
+    """ Timelines of a collection, nested collections included, in order.
+        args:
+            collection(otio.schema.SerializableCollection): otio collection.
+    """
+    compositions = []
+    for child in collection:
+        if isinstance(child, otio.schema.Timeline):
+            compositions.append(child)
+
+        elif isinstance(child, otio.schema.SerializableCollection):
+            compositions.extend(collection_timelines(child))
+
+    return compositions
+
+
+class LazyTimelineTab(QtWidgets.QWidget):
+    """ Tab of a timeline of a collection. Its scene is built when the tab is
+        first shown and can be evicted to free memory, it is built again from
+        the timeline when the tab is shown next.
+    """
+    def __init__(self, composition, *args, **kwargs):
+        """ Create new lazy tab.
+            args:
+                composition: opentimelineio._otio.Timeline
+        """
+        super(LazyTimelineTab, self).__init__(*args, **kwargs)
+        self.composition = composition
+        self.content = None
+        self._edit_state = None
+        QtWidgets.QVBoxLayout(self).setContentsMargins(0, 0, 0, 0)
+
+    @property
+    def built(self):
+        return self.content is not None
+
+    def _scene(self):
+        return self.content.findChild(TimelineCompositionView).composition_scene
+
+    def _matrix(self):
+        return self._scene().timeline_matrix
+
+    @property
+    def edited(self):
+        """ True when the timeline was changed since the scene was built, edits
+            would be lost by evicting it.
+        """
+        return self.built and self._matrix().edit_state() != self._edit_state
+
+    def build(self, timeline_widget):
+        """ Build scene of tab.
+            args:
+                timeline_widget(callable): called with timeline, layout and parent,
+                                           returns the widget of the timeline.
+        """
+        self.content = timeline_widget(self.composition, None, self)
+        self.layout().addWidget(self.content)
+        self._edit_state = self._matrix().edit_state()
+
+    def cost(self):
+        """ Estimated memory of the scene in bytes, 0 when it is not built.
+        """
+        return self._scene().memory_cost() if self.built else 0
+
+    def evict(self):
+        """ Drop scene of tab, the timeline is kept.
+        """
+        if not self.built:
+            return
+
+        self.layout().removeWidget(self.content)
+        # Detached now, deletion is deferred and closing the tab meanwhile
+        # must not find the old views again.
+        self.content.setParent(None)
+        teardown_widget(self.content)
+        self.content = None
+
+
+class LoadingWidget(QtWidgets.QWidget):
+    """ Placeholder tab shown while a timeline loads on a worker thread.
+    """
+    def __init__(self, timeline_loader, *args, **kwargs):
+        """ Create new loading widget.
+            args:
+                timeline_loader(loader.TimelineLoader): loader of the tab.
+        """
+        super(LoadingWidget, self).__init__(*args, **kwargs)
+        self.timeline_loader = timeline_loader
+        # Set once loading failed, the loader stopped without finishing.
+        self.failed = False
+
+        vertical_layout = QtWidgets.QVBoxLayout(self)
+        self.status_label = QtWidgets.QLabel(
+            "Loading {}".format(timeline_loader.path), self
+        )
+        self.progress_bar = QtWidgets.QProgressBar(self)
+        self.progress_bar.setRange(0, 0)
+        self.cancel_button = QtWidgets.QPushButton("Cancel", self)
+        self.cancel_button.clicked.connect(self.cancel)
+
+        vertical_layout.addStretch()
+        vertical_layout.addWidget(self.status_label)
+        vertical_layout.addWidget(self.progress_bar)
+        vertical_layout.addWidget(self.cancel_button)
+        vertical_layout.addStretch()
+        self.setLayout(vertical_layout)
+
+        timeline_loader.loader_signals.progress.connect(self.update_progress)
+        timeline_loader.loader_signals.failed.connect(self.show_error)
+
+    def update_progress(self, done, total):
+        """ Update progress bar, a total of 0 shows a busy indicator.
+        """
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def show_error(self, message):
+        """ Show why loading failed.
+        """
+        self.failed = True
+        self.status_label.setText(message)
+        self.progress_bar.hide()
+        self.cancel_button.hide()
+
+    def cancel(self):
+        """ Cancel loading.
+        """
+        self.timeline_loader.cancel()
+        self.status_label.setText("Cancelling...")
+        self.cancel_button.setEnabled(False)
+
 
 class Timeline(QtWidgets.QTabWidget):
     def __init__(self, *args, **kwargs):
         """ Create new timeline widget.
         """
+        # Paint cells of each track in one item instead of one item per cell,
+        # None picks it for each timeline from its number of items.
+        self.painted_tracks = kwargs.pop("painted_tracks", None)
+        # Memory in bytes the scenes of lazy tabs may use.
+        self.scene_budget = kwargs.pop("scene_budget", SCENE_BUDGET)
         super(Timeline, self).__init__(*args, **kwargs)
 
+        # Lazy tabs, most recently shown first.
+        self._recent_tabs = []
+
         self.setTabsClosable(True)
-        self.tabCloseRequested.connect(lambda index: self.removeTab(index))
+        self.tabCloseRequested.connect(self._close_tab)
+        self.currentChanged.connect(self._tab_activated)
 
         self._set_timeline()
 
@@ -375,31 +1089,81 @@ class Timeline(QtWidgets.QTabWidget):
         tool_widget_horizontal_layout = QtWidgets.QHBoxLayout(tool_widget)
 
         self.add_track_button = QtWidgets.QPushButton("Add new track", tool_widget)
+        self.play_button = QtWidgets.QPushButton("Play", tool_widget)
+        self.loop_button = QtWidgets.QPushButton("Loop", tool_widget)
+        self.loop_button.setCheckable(True)
 
         spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
 
         tool_widget_horizontal_layout.addWidget(self.add_track_button)
+        tool_widget_horizontal_layout.addWidget(self.play_button)
+        tool_widget_horizontal_layout.addWidget(self.loop_button)
         tool_widget_horizontal_layout.addItem(spacerItem)
 
         tool_widget.setLayout(tool_widget_horizontal_layout)
 
         return tool_widget
 
-    def _set_timeline(self, composition=None):
+    def _close_tab(self, index):
+        """ Close tab at given index, cancelling its load if it is still loading.
+            args:
+                index(int): tab index.
+        """
+        widget = self.widget(index)
+        if isinstance(widget, LoadingWidget):
+            if widget.failed:
+                # Loader already stopped, no signal is left to delete the tab.
+                self._remove_loading_tab(widget)
+                return
+
+            # Loading tab is deleted once the loader stops.
+            widget.timeline_loader.cancel()
+            self.removeTab(index)
+            return
+
+        if widget in self._recent_tabs:
+            self._recent_tabs.remove(widget)
+
+        self.removeTab(index)
+        teardown_widget(widget)
+
+    def _set_timeline(self, composition=None, layout=None, index=None):
         """ Create new composition view and add a new tab.
             args:
                 composition: opentimelineio._otio.Timeline
+                layout(matrix.StackLayout): layout computed by a loader, if any.
+                index(int): insert tab at this index instead of adding it at the end.
         """
         tab_name = composition.name if composition else "New"
+        new_tab = self._timeline_widget(composition, layout, self)
+        if index is None:
+            index = self.addTab(new_tab, tab_name)
+
+        else:
+            index = self.insertTab(index, new_tab, tab_name)
+
+        self.setCurrentIndex(index)
+
+    def _timeline_widget(self, composition=None, layout=None, parent=None):
+        """ Create composition view of a timeline with its tool buttons.
+            args:
+                composition: opentimelineio._otio.Timeline
+                layout(matrix.StackLayout): layout computed by a loader, if any.
+                parent(QtWidgets.QWidget): parent of widget.
+
+            return: QtWidgets.QWidget
+        """
         stack = composition.tracks if composition else None
-        new_tab = QtWidgets.QWidget(self)
+        new_tab = QtWidgets.QWidget(parent)
         vertical_layout = QtWidgets.QVBoxLayout(new_tab)
 
-        composition_view = TimelineCompositionView(stack, parent=self)
+        composition_view = TimelineCompositionView(
+            stack, layout, self.painted_tracks, parent=self
+        )
         tool_widget = self.setup_tool_widget()
 
         # Connecting actions in "add_track_button" to add_track functionality in CompositionScene.
-        add_track_menu = QtWidgets.QMenu(self)
+        add_track_menu = QtWidgets.QMenu(tool_widget)
 
         add_track_menu.addAction('Video Track', lambda : composition_view.composition_scene.add_track("video"))
         add_track_menu.addAction('Audio Track', lambda : composition_view.composition_scene.add_track("audio"))
@@ -407,28 +1171,182 @@ class Timeline(QtWidgets.QTabWidget):
 
         self.add_track_button.setMenu(add_track_menu)
 
+        # Connecting transport buttons to playback of CompositionScene.
+        _playback = composition_view.composition_scene.playback
+        play_button = self.play_button
+        play_button.clicked.connect(_playback.toggle)
+        _playback.playback_signals.state_changed.connect(
+            lambda playing: play_button.setText("Pause" if playing else "Play")
+        )
+        self.loop_button.toggled.connect(lambda checked: setattr(_playback, "loop", checked))
+
         vertical_layout.addWidget(tool_widget)
         vertical_layout.addWidget(composition_view)
 
         new_tab.setLayout(vertical_layout)
-        index = self.addTab(new_tab, tab_name)
-        self.setCurrentIndex(index)
+
+        return new_tab
+
+    def export_timeline(self, path, resolved_only=False):
+        """ Export timeline of current tab to an otio or edl file.
+            args:
+                path(str): output path, ".edl" for an edl, otio json otherwise.
+                resolved_only(bool): export topmost items only.
+        """
+        widget = self.currentWidget()
+        composition_view = widget.findChild(TimelineCompositionView) if widget else None
+        if composition_view is None:
+            raise Exception("Sorry, there is no timeline to export.")
+
+        export.export_file(
+            composition_view.composition_scene.timeline_matrix, path,
+            self.tabText(self.currentIndex()), resolved_only
+        )
 
     def load_timeline(self, path):
-        """ Load timeline.
+        """ Load timeline on a worker thread. A tab showing progress is added right
+            away and replaced by the timeline once it is loaded.
             args:
                 path: str
+
+            return: loader.TimelineLoader
+        """
+        return self._start_loader(loader.TimelineLoader(path), os.path.basename(path))
+
+    def load_clips(self, paths):
+        """ Build timeline from media clips on a worker thread, clips are probed
+            in parallel while a tab shows progress.
+            args:
+                paths(list): media paths.
+
+            return: loader.ClipsLoader
+        """
+        timeline_loader = loader.ClipsLoader(paths)
+
+        return self._start_loader(timeline_loader, timeline_loader.path)
+
+    def _start_loader(self, timeline_loader, tab_name):
+        """ Add a tab showing progress of loader and start it.
+            args:
+                timeline_loader(loader.TimelineLoader): loader to start.
+                tab_name(str): name of tab.
+
+            return: loader.TimelineLoader
         """
+        loading_widget = LoadingWidget(timeline_loader, self)
+        index = self.addTab(loading_widget, tab_name)
+        self.setCurrentIndex(index)
 
-        file_contents = otio.adapters.read_from_file(
-            path
+        timeline_loader.loader_signals.finished.connect(
+            lambda file_contents, layout: self._loaded(loading_widget, file_contents, layout)
         )
+        timeline_loader.loader_signals.cancelled.connect(
+            lambda: self._remove_loading_tab(loading_widget)
+        )
+        timeline_loader.loader_signals.failed.connect(
+            lambda message: self._load_failed(loading_widget)
+        )
+        timeline_loader.start()
+
+        return timeline_loader
+
+    def _remove_loading_tab(self, loading_widget):
+        """ Remove loading tab if it is still open.
+            args:
+                loading_widget(LoadingWidget): placeholder tab.
+
+            return: index of removed tab, -1 if it was already closed.
+        """
+        index = self.indexOf(loading_widget)
+        if index != -1:
+            self.removeTab(index)
+
+        loading_widget.deleteLater()
+
+        return index
+
+    def _load_failed(self, loading_widget):
+        """ Delete loading tab of a failed load if it was closed while loading,
+            an open tab keeps showing the error until it is closed.
+            args:
+                loading_widget(LoadingWidget): placeholder tab.
+        """
+        if loading_widget.timeline_loader.cancelled:
+            self._remove_loading_tab(loading_widget)
+
+    def _loaded(self, loading_widget, file_contents, layout):
+        """ Replace loading tab with loaded timeline, runs on the GUI thread.
+            args:
+                loading_widget(LoadingWidget): placeholder tab.
+                file_contents: contents of loaded file.
+                layout(matrix.StackLayout): layout of timeline tracks.
+        """
+        if loading_widget.timeline_loader.cancelled:
+            self._remove_loading_tab(loading_widget)
+            return
+
+        index = self._remove_loading_tab(loading_widget)
+        if index == -1:
+            return
+
         if isinstance(file_contents, otio.schema.Timeline):
-            self._set_timeline(file_contents)
+            self._set_timeline(file_contents, layout, index)
 
         elif isinstance(file_contents, otio.schema.SerializableCollection):
-            # TODO: Need to implement this functionality.
-            pass
+            self._set_collection(file_contents, index)
+
+    def _set_collection(self, collection, index):
+        """ Add a tab for every timeline of a collection. Scenes are only built
+            when their tab is shown, so adding the tabs costs little.
+            args:
+                collection(otio.schema.SerializableCollection): loaded collection.
+                index(int): insert first tab at this index.
+        """
+        compositions = collection_timelines(collection)
+        for offset, composition in enumerate(compositions):
+            self.insertTab(
+                index + offset, LazyTimelineTab(composition, self), composition.name
+            )
+
+        if compositions:
+            self.setCurrentIndex(index)
+            # Current index may not change when tabs are inserted before it.
+            self._tab_activated(index)
+
+    def _tab_activated(self, index):
+        """ Build scene of a lazy tab when it is shown and evict scenes of tabs
+            not shown recently above the scene budget.
+            args:
+                index(int): index of current tab.
+        """
+        widget = self.widget(index)
+        if not isinstance(widget, LazyTimelineTab):
+            return
+
+        if not widget.built:
+            widget.build(self._timeline_widget)
+
+        if widget in self._recent_tabs:
+            self._recent_tabs.remove(widget)
+
+        self._recent_tabs.insert(0, widget)
+        self._evict_tabs()
+
+    def _evict_tabs(self):
+        """ Evict scenes of least recently shown tabs while built tabs use more
+            than the scene budget. Current tab and edited tabs are kept.
+        """
+        built = [tab for tab in self._recent_tabs if tab.built]
+        total = sum(tab.cost() for tab in built)
+        for tab in reversed(built[1:]):
+            if total <= self.scene_budget:
+                break
+
+            if tab.edited:
+                continue
+
+            total -= tab.cost()
+            tab.evict()
 
 
 
@@ -1,3 +1,6 @@
+import sys
+
+import numpy as np
 from PySide2 import QtGui, QtCore, QtWidgets
 
 import opentimelineio as otio
@@ -11,6 +14,13 @@ DATA_TRACK_HEIGHT = cells.DATA_CELL_HEIGHT
 CONTEXT_TRACK_HEIGHT = cells.CONTEXT_CELL_HEIGHT
 CELL_WIDTH = cells.CELL_WIDTH
 
+# Painted cells narrower than this many pixels are merged with their neighbours.
+MERGE_PIXELS = 4.0
+# Labels are painted only on cells at least this many pixels wide.
+LABEL_PIXELS = 60.0
+# Distance of label from left edge of cell.
+LABEL_OFFSET = 20
+
 def get_track_height(track_type):
     if track_type == "video": return VIDEO_TRACK_HEIGHT
     elif track_type == "audio": return AUDIO_TRACK_HEIGHT
@@ -28,6 +38,48 @@ class AbstractBaseTrack(QtWidgets.QGraphicsRectItem):
         self.scene = parent
         self.acvtive = True
         self.enable = True
+        self.cell_start_position = 0
+        self.painted_cells = None
+
+    def set_painted_cells(self, labels, starts, ends, enabled):
+        """ Paint cells of track from arrays instead of adding one item per cell.
+            args:
+                labels(list): label of each cell.
+                starts(numpy.ndarray): first context index of each cell, sorted.
+                ends(numpy.ndarray): last context index (exclusive) of each cell.
+                enabled(numpy.ndarray): enable state of each cell.
+        """
+        if self.painted_cells is None:
+            self.painted_cells = PaintedCells(self.kind, get_track_height(self.kind), self)
+            self.painted_cells.setPos(CELL_WIDTH, 0)
+
+        self.painted_cells.set_cells(labels, starts, ends, enabled)
+
+    def add_cell_item(self, cell_item, index=None, span=1):
+        """ Base function to add a cell to track.
+            args:
+                cell_item(cells.AbstractBaseCell): cell to be added.
+                index(int): index of first context of cell, cell is added after
+                            the last cell when None.
+                span(int): number of contexts covered by cell.
+        """
+        if index is None:
+            self.cell_start_position += CELL_WIDTH
+            position = self.cell_start_position
+
+        else:
+            position = CELL_WIDTH * (index + 1)
+            self.cell_start_position = max(
+                self.cell_start_position, CELL_WIDTH * (index + span)
+            )
+
+        # Cells are reused, so width is set even for single context cells.
+        rect = cell_item.rect()
+        rect.setWidth(CELL_WIDTH * span)
+        cell_item.setRect(rect)
+
+        cell_item.setPos(position, 0)
+        cell_item.setParentItem(self)
 
     def remove_track(self):
         """ Base function to delete a track.
@@ -72,12 +124,6 @@ class AudioTrack(AbstractBaseTrack):
             )
         self.header_cell = cells.TrackHeaderCell(self, rect)
         self.header_cell.setParentItem(self)
-        self.cell_start_position = 0
-    
-    def add_cell_item(self, audio_cell):
-        self.cell_start_position += 200
-        audio_cell.setPos(self.cell_start_position, 0)
-        audio_cell.setParentItem(self)
 
 
 class VideoTrack(AbstractBaseTrack):
@@ -94,12 +140,6 @@ class VideoTrack(AbstractBaseTrack):
             )
         self.header_cell = cells.TrackHeaderCell(self, rect)
         self.header_cell.setParentItem(self)
-        self.cell_start_position = 0
-
-    def add_cell_item(self, video_cell):
-        self.cell_start_position += 200
-        video_cell.setPos(self.cell_start_position, 0)
-        video_cell.setParentItem(self)
 
 
 class DataTrack(AbstractBaseTrack):
@@ -132,9 +172,173 @@ class ContextTrack(AbstractBaseTrack):
             )    
         header_cell = cells.TrackHeaderCell(self, rect)
         header_cell.setParentItem(self)
-        self.cell_start_position = 0
 
-    def add_cell_item(self, context_cell):
-        self.cell_start_position += 200
-        context_cell.setPos(self.cell_start_position, 0)
-        context_cell.setParentItem(self)
+
+class PaintedCells(QtWidgets.QGraphicsItem):
+    """ All cells of a track painted in one call from arrays of cell boundaries,
+        states and labels. Only cells in the exposed rect are painted, labels are
+        left out and sub-pixel cells are merged when zoomed out.
+    """
+    def __init__(self, kind, height, parent=None):
+        """ Create painted cells.
+            args:
+                kind(str): track kind.
+                height(int): cell height.
+                parent(QtWidgets.QGraphicsItem): track item.
+        """
+        super(PaintedCells, self).__init__(parent)
+        self.kind = kind
+        self.height = height
+        self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.setAcceptHoverEvents(True)
+
+        # Disabled and enabled brush, shared with cell items.
+        self.brushes = cells.CELL_BRUSHES[kind]
+        self.pen = cells.CELL_PEN
+
+        self.labels = []
+        self.starts = np.zeros(0, float)
+        self.ends = np.zeros(0, float)
+        self.enabled = np.zeros(0, bool)
+
+    def set_cells(self, labels, starts, ends, enabled):
+        """ Replace painted cells.
+            args:
+                labels(list): label of each cell.
+                starts(numpy.ndarray): first context index of each cell, sorted.
+                ends(numpy.ndarray): last context index (exclusive) of each cell.
+                enabled(numpy.ndarray): enable state of each cell.
+        """
+        self.prepareGeometryChange()
+        self.labels = labels
+        self.starts = np.asarray(starts, float) * CELL_WIDTH
+        self.ends = np.asarray(ends, float) * CELL_WIDTH
+        self.enabled = np.asarray(enabled, bool)
+        self.update()
+
+    @property
+    def nbytes(self):
+        """ Estimated memory of cell arrays and labels in bytes.
+        """
+        return (
+            self.starts.nbytes + self.ends.nbytes + self.enabled.nbytes +
+            sum(sys.getsizeof(label) for label in self.labels)
+        )
+
+    def set_enabled(self, enabled, indexes=None):
+        """ Update enable state of cells, updated cells are repainted once.
+            args:
+                enabled(numpy.ndarray): enable state of each cell, or of cells
+                                        at indexes.
+                indexes(numpy.ndarray): indexes of updated cells, None for all.
+        """
+        if indexes is None:
+            self.enabled = np.asarray(enabled, bool)
+            self.update()
+            return
+
+        self.enabled[indexes] = enabled
+        if indexes.shape[0]:
+            left = self.starts[indexes].min()
+            self.update(QtCore.QRectF(
+                left, 0, self.ends[indexes].max() - left, self.height
+            ))
+
+    def boundingRect(self):
+        """ Overriding boundingRect of QtWidgets.QGraphicsItem.
+        """
+        width = self.ends[-1] if self.ends.shape[0] else 0
+        return QtCore.QRectF(0, 0, width, self.height)
+
+    def index_at(self, x):
+        """ Index of cell at given x, -1 between cells. Cells do not overlap so
+            the cell is found with a binary search over cell boundaries.
+            args:
+                x(float): x in item coordinates.
+        """
+        index = int(np.searchsorted(self.starts, x, "right")) - 1
+        if index < 0 or x >= self.ends[index]:
+            return -1
+
+        return index
+
+    def hoverMoveEvent(self, event):
+        """ Overriding hoverMoveEvent of QtWidgets.QGraphicsItem, shows label of
+            hovered cell as tooltip since labels are left out when zoomed out.
+        """
+        index = self.index_at(event.pos().x())
+        self.setToolTip(self.labels[index] if index >= 0 else "")
+
+    def paint(self, painter, option, widget=None):
+        """ Overriding paint of QtWidgets.QGraphicsItem.
+        """
+        # Exposed rect may be the whole item, only the part on the device is painted.
+        exposed = option.exposedRect
+        inverse, invertible = painter.worldTransform().inverted()
+        if invertible:
+            device = painter.device()
+            exposed = exposed.intersected(
+                inverse.mapRect(QtCore.QRectF(0, 0, device.width(), device.height()))
+            )
+
+        first = np.searchsorted(self.ends, exposed.left(), "right")
+        last = np.searchsorted(self.starts, exposed.right(), "left")
+        if first >= last:
+            return
+
+        indexes = np.arange(first, last)
+        starts, ends = self.starts[first:last], self.ends[first:last]
+        enabled = self.enabled[first:last]
+        # Number of cells in each painted rect.
+        counts = np.ones(indexes.shape[0], int)
+
+        # Pixels per scene unit along x.
+        scale = abs(painter.worldTransform().m11()) or 1.0
+        small = (ends - starts) * scale < MERGE_PIXELS
+        if small.any():
+            # Touching sub-pixel cells with the same state are painted as one rect.
+            merged = (
+                small[1:] & small[:-1] &
+                ((starts[1:] - ends[:-1]) * scale < 1.0) &
+                (enabled[1:] == enabled[:-1])
+            )
+            run_starts = np.flatnonzero(np.r_[True, ~merged])
+            run_ends = np.r_[run_starts[1:], starts.shape[0]] - 1
+            indexes = indexes[run_starts]
+            counts = run_ends - run_starts + 1
+            starts, ends = starts[run_starts], ends[run_ends]
+            enabled = enabled[run_starts]
+
+        # Merged rects are painted without outline, outlines would fill them black.
+        for state in (False, True):
+            for outlined in (False, True):
+                selected = (enabled == state) & ((counts == 1) == outlined)
+                rects = [
+                    QtCore.QRectF(start, 0, end - start, self.height)
+                    for start, end in zip(starts[selected].tolist(), ends[selected].tolist())
+                ]
+                if rects:
+                    painter.setPen(self.pen if outlined else QtCore.Qt.NoPen)
+                    painter.setBrush(self.brushes[state])
+                    painter.drawRects(rects)
+
+        labelled = np.flatnonzero(((ends - starts) * scale >= LABEL_PIXELS) & (counts == 1))
+        if not labelled.shape[0]:
+            return
+
+        # Labels are drawn in device coordinates so zoom does not stretch them.
+        transform = painter.worldTransform()
+        painter.save()
+        painter.setWorldTransform(QtGui.QTransform())
+        painter.setPen(self.pen)
+        for index in labelled.tolist():
+            rect = transform.mapRect(
+                QtCore.QRectF(starts[index], 0, ends[index] - starts[index], self.height)
+            )
+            painter.drawText(
+                rect.adjusted(LABEL_OFFSET, 0, 0, 0),
+                QtCore.Qt.AlignVCenter | QtCore.Qt.AlignLeft,
+                self.labels[indexes[index]]
+            )
+
+        painter.restore()